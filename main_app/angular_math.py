@@ -0,0 +1,101 @@
+import numpy as np
+
+from .constants import ASPECTS, ASPECT_POINTS, PARALLEL_ORB_DEGREES
+
+
+def angular_separation(lon_a, lon_b):
+    """
+    Distância angular mínima (0 a 180 graus) entre longitudes.
+    Aceita escalares ou arrays NumPy com broadcasting.
+    """
+    diff = np.abs(np.asarray(lon_a, dtype=float) - np.asarray(lon_b, dtype=float)) % 360
+    return np.where(diff > 180, 360 - diff, diff)
+
+
+def separation_matrix(lons_a, lons_b):
+    """
+    Matriz de separações N×M entre dois conjuntos de longitudes.
+    Dimensões iniciais extras (lote de mapas) são preservadas: (..., N) × (..., M) -> (..., N, M).
+    """
+    lons_a = np.asarray(lons_a, dtype=float)
+    lons_b = np.asarray(lons_b, dtype=float)
+    return angular_separation(lons_a[..., :, None], lons_b[..., None, :])
+
+
+def signed_difference(lon_to, lon_from):
+    """Diferença angular com sinal, no intervalo [-180, 180), de `lon_from` para `lon_to`."""
+    return (np.asarray(lon_to, dtype=float) - np.asarray(lon_from, dtype=float) + 180) % 360 - 180
+
+
+def circular_midpoint(lon_a, lon_b):
+    """
+    Ponto médio pelo arco mais curto entre duas longitudes (0 a 360), vetorizado.
+    Trata corretamente o cruzamento de 0/360 (ex.: 350° e 10° -> 0°).
+    """
+    return (np.asarray(lon_a, dtype=float) + signed_difference(lon_b, lon_a) / 2) % 360
+
+
+def geographic_midpoint(lon_a, lon_b):
+    """Ponto médio de longitudes geográficas (-180 a 180) pelo arco mais curto."""
+    return (circular_midpoint(np.asarray(lon_a, dtype=float) % 360, np.asarray(lon_b, dtype=float) % 360) + 180) % 360 - 180
+
+
+def house_positions(lons, cusps):
+    """
+    Casa (0 a 11) de cada longitude, dadas as 12 cúspides de cada mapa.
+    `lons` tem formato (..., P) e `cusps` (..., 12); retorna inteiros (..., P).
+    Cúspides NaN (sistema indefinido na latitude) resultam em -1.
+    """
+    lons = np.asarray(lons, dtype=float)
+    cusps = np.asarray(cusps, dtype=float)
+    starts = cusps[..., None, :]
+    widths = (np.roll(cusps, -1, axis=-1) - cusps)[..., None, :] % 360
+    offsets = (lons[..., :, None] - starts) % 360
+
+    inside = offsets < widths
+    houses = np.where(inside.any(axis=-1), inside.argmax(axis=-1), -1)
+    return np.where(np.isnan(cusps).any(axis=-1)[..., None], -1, houses)
+
+
+def match_aspects(separations, orb, aspects=ASPECTS):
+    """
+    Classifica cada separação no primeiro aspecto (na ordem de `aspects`) dentro do orbe.
+    Retorna (índice do aspecto, orbe exato); índice -1 quando não há aspecto.
+    """
+    angles = np.array([angle for angle, _ in aspects.values()], dtype=float)
+    deviations = np.abs(np.asarray(separations, dtype=float)[..., None] - angles)
+    within_orb = deviations <= orb
+
+    aspect_index = np.where(within_orb.any(axis=-1), within_orb.argmax(axis=-1), -1)
+    exact_orb = np.take_along_axis(deviations, np.maximum(aspect_index, 0)[..., None], axis=-1)[..., 0]
+    return aspect_index, exact_orb
+
+
+def match_parallels(decs_a, decs_b, orb=PARALLEL_ORB_DEGREES):
+    """
+    Paralelos e contraparalelos de declinação, no mesmo formato de
+    `separation_matrix` + `match_aspects`: (..., N) × (..., M) -> (..., N, M).
+    Paralelo: declinações iguais; contraparalelo: iguais e de sinais opostos.
+    Retorna (tipo: 0 paralelo, 1 contraparalelo, -1 nenhum; orbe exato).
+    Quando os dois cabem no orbe (declinações perto de zero), vale o mais exato.
+    """
+    decs_a = np.asarray(decs_a, dtype=float)[..., :, None]
+    decs_b = np.asarray(decs_b, dtype=float)[..., None, :]
+    deviations = np.stack([np.abs(decs_a - decs_b), np.abs(decs_a + decs_b)], axis=-1)
+    kind = deviations.argmin(axis=-1)
+    exact_orb = np.take_along_axis(deviations, kind[..., None], axis=-1)[..., 0]
+    return np.where(exact_orb <= orb, kind, -1), exact_orb
+
+
+def out_of_bounds(decs, obliquity):
+    """
+    Pontos fora dos limites: declinação (em módulo) maior que a obliquidade.
+    `decs` (..., P) e `obliquity` escalar ou (...,), ex.: um lote de mapas.
+    """
+    return np.abs(np.asarray(decs, dtype=float)) > np.asarray(obliquity, dtype=float)[..., None]
+
+
+def longitudes_array(point_positions, names=ASPECT_POINTS):
+    """Extrai as longitudes de `point_positions` na ordem de `names` (NaN se ausente)."""
+    lon_map = {p['name']: p['lon'] for p in point_positions}
+    return np.array([lon_map.get(name, np.nan) for name in names], dtype=float)
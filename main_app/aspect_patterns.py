@@ -0,0 +1,182 @@
+import numpy as np
+
+from .constants import (
+    ASPECTS, ASPECT_POINTS, DEFAULT_ASPECT_ORB, ASPECT_PATTERNS, QUINCUNX_ANGLE,
+    QUINCUNX_ORB_DEGREES, STELLIUM_MIN_POINTS
+)
+from .angular_math import separation_matrix, match_aspects, signed_difference, longitudes_array
+
+MAX_PATTERN_POINTS = 64 # Um bit por ponto num uint64
+_ONE = np.uint64(1)
+_ZERO = np.uint64(0)
+_PATTERN_INDEX = {name: k for k, name in enumerate(ASPECT_PATTERNS)}
+
+
+def _bit(i):
+    return _ONE << np.uint64(i)
+
+
+def _above(i, n_points):
+    """Máscara dos pontos de índice maior que `i` (evita contar a mesma figura duas vezes)."""
+    return np.uint64(((1 << n_points) - 1) & ~((1 << (i + 1)) - 1))
+
+
+def _has(masks, i):
+    """Booleano: o bit `i` está presente em cada máscara."""
+    return ((masks >> np.uint64(i)) & _ONE).astype(bool)
+
+
+def _unpack(masks, n_points):
+    """(N,) máscaras -> (N, P) booleanos."""
+    return ((masks[:, None] >> np.arange(n_points, dtype=np.uint64)) & _ONE).astype(bool)
+
+
+def _pack(adjacency):
+    """(..., P, P) booleanos -> (..., P) máscaras: bit j da linha i se i e j estão ligados."""
+    n_points = adjacency.shape[-1]
+    bits = _ONE << np.arange(n_points, dtype=np.uint64)
+    return np.bitwise_or.reduce(np.where(adjacency, bits, _ZERO), axis=-1)
+
+
+def aspect_bitsets(lons, orb=DEFAULT_ASPECT_ORB, quincunx_orb=QUINCUNX_ORB_DEGREES):
+    """
+    Grafo de aspectos em bitsets: para cada aspecto de ASPECTS (e o
+    quincunce, calculado aqui só para o Yod), um array (N, P) de uint64 em
+    que o bit j da posição i indica o aspecto entre os pontos i e j.
+    `lons` (N, P) ou (P,), com NaN para pontos ausentes; no máximo 64 pontos.
+    """
+    lons = np.atleast_2d(np.asarray(lons, dtype=float))
+    n_points = lons.shape[-1]
+    if n_points > MAX_PATTERN_POINTS:
+        raise ValueError(f"No máximo {MAX_PATTERN_POINTS} pontos por mapa (recebidos {n_points}).")
+
+    separations = separation_matrix(lons, lons)
+    aspect_index, _ = match_aspects(separations, orb)
+    off_diagonal = ~np.eye(n_points, dtype=bool)
+    bitsets = {name: _pack((aspect_index == k) & off_diagonal) for k, name in enumerate(ASPECTS)}
+    bitsets['Quincunce'] = _pack((np.abs(separations - QUINCUNX_ANGLE) <= quincunx_orb) & off_diagonal)
+    return bitsets
+
+
+class _PatternHits:
+    """Acumula as figuras encontradas como arrays paralelos (mapa, figura, membros, ápice)."""
+
+    def __init__(self):
+        self.charts, self.patterns, self.members, self.apexes = [], [], [], []
+
+    def add(self, pattern, charts, members, apex=-1):
+        if not len(charts):
+            return
+        self.charts.append(charts)
+        self.patterns.append(np.full(len(charts), _PATTERN_INDEX[pattern]))
+        self.members.append(np.asarray(members, dtype=np.uint64))
+        self.apexes.append(np.broadcast_to(np.asarray(apex), charts.shape))
+
+    def result(self, n_charts):
+        if not self.charts:
+            charts = patterns = apexes = np.array([], dtype=int)
+            members = np.array([], dtype=np.uint64)
+        else:
+            charts, patterns, members, apexes = (np.concatenate(values) for values in
+                                                 (self.charts, self.patterns, self.members, self.apexes))
+            order = np.lexsort((members, patterns, charts))
+            charts, patterns, members, apexes = charts[order], patterns[order], members[order], apexes[order]
+        counts = np.zeros((n_charts, len(ASPECT_PATTERNS)), dtype=np.int64)
+        np.add.at(counts, (charts, patterns), 1)
+        return {'chart': charts, 'pattern': patterns, 'members': members, 'apex': apexes, 'counts': counts}
+
+
+def find_patterns(lons, orb=DEFAULT_ASPECT_ORB, quincunx_orb=QUINCUNX_ORB_DEGREES,
+                  min_stellium=STELLIUM_MIN_POINTS):
+    """
+    Configurações de aspectos (ASPECT_PATTERNS) em um lote de mapas.
+    A busca percorre os pares de pontos em Python, mas cada passo é uma
+    interseção de bitsets vetorizada sobre todos os mapas do lote, então o
+    custo cresce com P² (pontos) e não com o número de mapas em Python.
+    Cada figura é contada uma vez, a partir do seu ponto de menor índice.
+    Retorna arrays paralelos 'chart', 'pattern' (índice em ASPECT_PATTERNS),
+    'members' (bitset dos pontos) e 'apex' (índice do ponto focal, -1 se
+    não houver), além de 'counts' (N, figuras).
+    """
+    lons = np.atleast_2d(np.asarray(lons, dtype=float))
+    n_charts, n_points = lons.shape
+    bitsets = aspect_bitsets(lons, orb, quincunx_orb)
+    opposition, trine, square = bitsets["Oposição"], bitsets["Trígono"], bitsets["Quadratura"]
+    sextile, quincunx = bitsets["Sextil"], bitsets['Quincunce']
+    hits = _PatternHits()
+
+    for i in range(n_points):
+        for j in range(i + 1, n_points):
+            pair = _bit(i) | _bit(j)
+
+            # Grande Trígono (i < j < k) e Pipa: ponto oposto a um vértice e em sextil aos outros dois
+            rows = np.nonzero(_has(trine[:, i], j))[0]
+            r, k = np.nonzero(_unpack(trine[rows, i] & trine[rows, j] & _above(j, n_points), n_points))
+            n = rows[r]
+            hits.add("Grande Trígono", n, pair | (_ONE << k.astype(np.uint64)))
+            for a, b, c in ((np.full_like(k, i), np.full_like(k, j), k),
+                            (np.full_like(k, j), np.full_like(k, i), k),
+                            (k, np.full_like(k, i), np.full_like(k, j))):
+                r2, d = np.nonzero(_unpack(opposition[n, a] & sextile[n, b] & sextile[n, c], n_points))
+                hits.add("Pipa", n[r2], pair | (_ONE << k[r2].astype(np.uint64)) | (_ONE << d.astype(np.uint64)), d)
+
+            # Quadratura em T: oposição i-j com o ápice em quadratura aos dois
+            rows = np.nonzero(_has(opposition[:, i], j))[0]
+            r, k = np.nonzero(_unpack(square[rows, i] & square[rows, j], n_points))
+            hits.add("Quadratura em T", rows[r], pair | (_ONE << k.astype(np.uint64)), k)
+
+            # Yod: sextil i-j com o ápice em quincunce aos dois
+            rows = np.nonzero(_has(sextile[:, i], j))[0]
+            r, k = np.nonzero(_unpack(quincunx[rows, i] & quincunx[rows, j], n_points))
+            hits.add("Yod", rows[r], pair | (_ONE << k.astype(np.uint64)), k)
+
+            # Figuras com duas oposições (i-j e k-l), com i o menor índice das quatro
+            rows = np.nonzero(_has(opposition[:, i], j))[0]
+            if not len(rows):
+                continue
+            cross = square[rows, i] & square[rows, j] & _above(i, n_points)
+            for k in range(i + 1, n_points):
+                sub = np.nonzero(_has(cross, k))[0]
+                r, l = np.nonzero(_unpack(cross[sub] & opposition[rows[sub], k] & _above(k, n_points), n_points))
+                hits.add("Grande Cruz", rows[sub][r], pair | _bit(k) | (_ONE << l.astype(np.uint64)))
+
+            # Retângulo Místico: i △ k, j △ l, i ⚹ l, j ⚹ k
+            r, k = np.nonzero(_unpack(trine[rows, i] & sextile[rows, j] & _above(i, n_points), n_points))
+            n = rows[r]
+            r2, l = np.nonzero(_unpack(opposition[n, k] & sextile[n, i] & trine[n, j] & _above(i, n_points), n_points))
+            hits.add("Retângulo Místico", n[r2],
+                     pair | (_ONE << k[r2].astype(np.uint64)) | (_ONE << l.astype(np.uint64)))
+
+    # Stellium: cliques máximos de conjunções. Pontos mutuamente conjuntos cabem num arco
+    # de até `orb`, então cada clique máximo é o arco que começa no seu ponto mais atrasado.
+    forward = signed_difference(lons[:, None, :], lons[:, :, None]) # lon_j - lon_i
+    arcs = _pack((forward >= 0) & (forward <= orb))                  # (N, P), inclui o próprio ponto
+    sizes = _unpack(arcs.ravel(), n_points).reshape(n_charts, n_points, n_points).sum(axis=-1)
+    maximal = sizes >= min_stellium
+    for k in range(n_points):
+        contained = (arcs & ~arcs[:, k:k + 1]) == 0
+        contained[:, k] = False
+        # Arcos iguais (pontos na mesma longitude): fica só o de menor índice
+        dominated = contained & ((arcs != arcs[:, k:k + 1]) | (np.arange(n_points) > k))
+        maximal &= ~dominated
+    n, i = np.nonzero(maximal)
+    hits.add("Stellium", n, arcs[n, i])
+
+    return hits.result(n_charts)
+
+
+def chart_patterns(point_positions, points=ASPECT_POINTS, orb=DEFAULT_ASPECT_ORB):
+    """
+    Configurações de aspectos de um mapa, como lista de dicionários
+    {'pattern', 'points', 'apex'} e as linhas de texto correspondentes.
+    """
+    points = list(points)
+    found = find_patterns(longitudes_array(point_positions, points), orb)
+    patterns_data, textual_patterns = [], []
+    for pattern, members, apex in zip(found['pattern'], found['members'], found['apex']):
+        names = [points[p] for p in range(len(points)) if int(members) >> p & 1]
+        apex_name = points[apex] if apex >= 0 else None
+        patterns_data.append({'pattern': ASPECT_PATTERNS[pattern], 'points': names, 'apex': apex_name})
+        text = f"{ASPECT_PATTERNS[pattern]}: {', '.join(names)}"
+        textual_patterns.append(text + (f" (ápice {apex_name})" if apex_name else ""))
+    return patterns_data, textual_patterns
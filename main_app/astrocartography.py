@@ -0,0 +1,177 @@
+import swisseph as swe
+import numpy as np
+from matplotlib.figure import Figure
+
+from .constants import (
+    ASPECT_POINTS, PLANET_UNICODE_SYMBOLS, ASTROCARTOGRAPHY_ANGLES, ASTROCARTOGRAPHY_LATITUDE_STEP,
+    ASTROCARTOGRAPHY_MAX_LATITUDE, ASTROCARTOGRAPHY_LINE_STYLES, ASTROCARTOGRAPHY_PLANET_COLORS,
+    ASTROCARTOGRAPHY_FIGSIZE, ASTROCARTOGRAPHY_DPI
+)
+from .ephemeris import SWE_POINTS_MAP
+
+
+def _wrap_longitude(lon):
+    """Longitude geográfica no intervalo [-180, 180)."""
+    return (np.asarray(lon, dtype=float) + 180) % 360 - 180
+
+
+def _ecliptic_to_equatorial(lons, eps):
+    """AR e declinação (graus) de pontos da eclíptica (latitude 0)."""
+    lam, eps = np.radians(lons), np.radians(eps)
+    ra = np.degrees(np.arctan2(np.sin(lam) * np.cos(eps), np.cos(lam))) % 360
+    dec = np.degrees(np.arcsin(np.sin(eps) * np.sin(lam)))
+    return ra, dec
+
+
+def sidereal_frame(jd):
+    """Tempo sideral aparente de Greenwich (graus) e obliquidade verdadeira no instante, como em calculate_houses_all."""
+    return swe.sidtime(jd) * 15, swe.calc_ut(jd, swe.ECL_NUT)[0][0]
+
+
+def planet_equatorial(jd, names=ASPECT_POINTS, in_mundo=True):
+    """
+    AR e declinação (P,) dos pontos no instante. Com `in_mundo` usa a
+    posição real do planeta (linhas clássicas de astrocartografia); sem ele,
+    o grau da eclíptica do planeta (latitude 0), que é o que o Ascendente e
+    o MC de swe.houses medem.
+    """
+    ra, dec = np.full(len(names), np.nan), np.full(len(names), np.nan)
+    eps = None if in_mundo else sidereal_frame(jd)[1]
+    for p, name in enumerate(names):
+        swe_id = SWE_POINTS_MAP.get(name)
+        if swe_id is None:
+            continue
+        if in_mundo:
+            xx = swe.calc_ut(jd, swe_id, swe.FLG_SWIEPH | swe.FLG_EQUATORIAL)[0]
+            ra[p], dec[p] = xx[0], xx[1]
+        else:
+            ra[p], dec[p] = _ecliptic_to_equatorial(swe.calc_ut(jd, swe_id, swe.FLG_SWIEPH)[0][0], eps)
+    return ra, dec
+
+
+def angle_grid(jd, latitudes, longitudes):
+    """
+    Ascendente e MC (longitudes eclípticas) em toda uma grade geográfica
+    para um único instante, pelas fórmulas fechadas em vez de um
+    swe.houses por célula. Retorna ('asc', 'mc') com formato (lat, lon).
+    """
+    gast, eps = sidereal_frame(jd)
+    latitudes = np.asarray(latitudes, dtype=float)[:, None]
+    armc = np.radians((gast + np.asarray(longitudes, dtype=float)[None, :]) % 360)
+    eps = np.radians(eps)
+    mc = np.degrees(np.arctan2(np.sin(armc), np.cos(armc) * np.cos(eps))) % 360
+    asc = np.degrees(np.arctan2(np.cos(armc),
+                                -(np.sin(armc) * np.cos(eps) + np.tan(np.radians(latitudes)) * np.sin(eps)))) % 360
+    return {'asc': asc, 'mc': np.broadcast_to(mc, asc.shape)}
+
+
+def angle_lines(jd, names=ASPECT_POINTS, in_mundo=True, latitude_step=ASTROCARTOGRAPHY_LATITUDE_STEP,
+                max_latitude=ASTROCARTOGRAPHY_MAX_LATITUDE):
+    """
+    Linhas de astrocartografia de um instante, analíticas e vetorizadas
+    sobre (pontos × latitudes): o ponto culmina (MC) onde o tempo sideral
+    local iguala a sua AR, e nasce/se põe (ASC/DSC) onde o ângulo horário
+    é ∓H0, com cos H0 = -tg φ · tg δ. Retorna 'latitudes' (L,), 'MC' e 'IC'
+    (P,) em longitude geográfica e 'ASC' e 'DSC' (P, L), NaN onde o ponto é
+    circumpolar ou nunca nasce.
+    """
+    names = list(names)
+    gast, _ = sidereal_frame(jd)
+    ra, dec = planet_equatorial(jd, names, in_mundo)
+    latitudes = np.arange(-max_latitude, max_latitude + latitude_step / 2, latitude_step)
+
+    cos_h0 = -np.tan(np.radians(latitudes))[None, :] * np.tan(np.radians(dec))[:, None]
+    h0 = np.degrees(np.arccos(np.where(np.abs(cos_h0) <= 1, cos_h0, np.nan)))
+    return {
+        'jd': jd,
+        'names': names,
+        'latitudes': latitudes,
+        'MC': _wrap_longitude(ra - gast),
+        'IC': _wrap_longitude(ra + 180 - gast),
+        'ASC': _wrap_longitude(ra[:, None] - h0 - gast),
+        'DSC': _wrap_longitude(ra[:, None] + h0 - gast),
+    }
+
+
+def _split_polyline(lons, lats):
+    """Quebra uma linha (lon, lat) nos NaN e onde cruza o antimeridiano. Retorna arrays (n, 2)."""
+    valid = ~np.isnan(lons)
+    breaks = np.ones(len(lons) + 1, dtype=bool)
+    breaks[1:-1] = ~valid[1:] | ~valid[:-1] | (np.abs(np.diff(lons)) > 180)
+    bounds = np.nonzero(breaks)[0]
+    segments = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        if end - start >= 2 and valid[start]:
+            segments.append(np.column_stack([lons[start:end], lats[start:end]]))
+    return segments
+
+
+def polylines(lines):
+    """
+    Linhas de `angle_lines` como polilinhas desenháveis:
+    {ponto: {ângulo: [arrays (n, 2) de (longitude, latitude)]}}.
+    MC e IC são meridianos; ASC e DSC são quebrados onde ficam indefinidos.
+    """
+    latitudes = lines['latitudes']
+    result = {}
+    for p, name in enumerate(lines['names']):
+        if np.isnan(lines['MC'][p]):
+            continue
+        result[name] = {}
+        for angle in ASTROCARTOGRAPHY_ANGLES:
+            if angle in ('MC', 'IC'):
+                meridian = np.full(2, lines[angle][p])
+                result[name][angle] = [np.column_stack([meridian, latitudes[[0, -1]]])]
+            else:
+                result[name][angle] = _split_polyline(lines[angle][p], latitudes)
+    return result
+
+
+def render_astrocartography(lines, path=None, locations=(), title=None, figsize=ASTROCARTOGRAPHY_FIGSIZE,
+                            dpi=ASTROCARTOGRAPHY_DPI):
+    """
+    Desenha as linhas num mapa equiretangular simples (grade de meridianos
+    e paralelos, equador, trópicos e círculos polares), sem pyplot nem
+    janela, então roda em servidores sem display. `locations`: pares
+    (rótulo, latitude, longitude) marcados no mapa (ex.: o local de nascimento).
+    Grava em `path` (formato pela extensão) se informado e retorna a Figure.
+    """
+    fig = Figure(figsize=figsize)
+    ax = fig.add_subplot()
+    ax.set_xlim(-180, 180)
+    ax.set_ylim(-90, 90)
+    ax.set_aspect('equal')
+    ax.set_xticks(np.arange(-180, 181, 30))
+    ax.set_yticks(np.arange(-90, 91, 30))
+    ax.grid(color='#dddddd', linewidth=0.5)
+    ax.axhline(0, color='#999999', linewidth=0.8)
+    _, eps = sidereal_frame(lines['jd'])
+    for parallel in (eps, -eps, 90 - eps, eps - 90):
+        ax.axhline(parallel, color='#bbbbbb', linewidth=0.6, linestyle=':')
+
+    for name, angles in polylines(lines).items():
+        color = ASTROCARTOGRAPHY_PLANET_COLORS.get(name, 'black')
+        symbol = PLANET_UNICODE_SYMBOLS.get(name, name)
+        for angle, segments in angles.items():
+            for segment in segments:
+                ax.plot(segment[:, 0], segment[:, 1], color=color, linewidth=1.1,
+                        linestyle=ASTROCARTOGRAPHY_LINE_STYLES[angle])
+            if angle in ('MC', 'IC') and segments:
+                ax.text(segments[0][0, 0], 86 if angle == 'MC' else -86, f"{symbol}{angle}",
+                        color=color, fontsize=8, ha='center', va='center')
+
+    for label, latitude, longitude in locations:
+        ax.plot(longitude, latitude, marker='o', color='black', markersize=4)
+        ax.annotate(label, (longitude, latitude), xytext=(4, 4), textcoords='offset points', fontsize=8)
+
+    # Legenda dos estilos de linha (as cores identificam o planeta)
+    for angle in ASTROCARTOGRAPHY_ANGLES:
+        ax.plot([], [], color='black', linestyle=ASTROCARTOGRAPHY_LINE_STYLES[angle], label=angle)
+    ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.06), fontsize=8, ncol=len(ASTROCARTOGRAPHY_ANGLES),
+              frameon=False)
+    if title:
+        ax.set_title(title)
+    fig.tight_layout()
+    if path is not None:
+        fig.savefig(path, dpi=dpi)
+    return fig
@@ -1,25 +1,38 @@
 import swisseph as swe
 import datetime
 import pytz
-from geopy.geocoders import Nominatim
 from timezonefinder import TimezoneFinder
 import numpy as np
+from collections import OrderedDict
 
 # Supondo que essas constantes vêm de seu arquivo constants.py
 from .constants import (
     NATAL_POINTS_CALCULABLE, HORARY_POINTS_CALCULABLE,
-    RETROGRADE_PLANETS, SIGNS # Certifique-se de que SIGNS está definido
+    RETROGRADE_PLANETS, SIGNS, # Certifique-se de que SIGNS está definido
+    ASPECTS, ASPECT_POINTS, DEFAULT_ASPECT_ORB, HOUSE_SYSTEMS, HOUSES_CACHE_SIZE,
+    DECLINATION_ASPECTS, PARALLEL_ORB_DEGREES
 )
+from .angular_math import (
+    separation_matrix, match_aspects, match_parallels, out_of_bounds,
+    longitudes_array, circular_midpoint, geographic_midpoint
+)
+from .aspect_patterns import chart_patterns
+from .dignities import is_day_chart, chart_dignities
+from .geocoder import default_geocoder
+from .ephemeris import SWE_POINTS_MAP, jd_to_datetime, sample_coordinates
 
 class AstrologicalData:
-    def __init__(self):
-        self.geolocator = Nominatim(user_agent="astral_chart_app")
+    def __init__(self, geocoder=None):
+        # Cliente compartilhado: limite de 1 requisição/s e coalescência valem para o processo todo
+        self.geocoder = geocoder or default_geocoder()
         self.tf = TimezoneFinder()
+        # (jd, lat, lon) -> {sistema: (cúspides, ascmc)}, em ordem de uso recente
+        self._houses_cache = OrderedDict()
 
     def get_location_details(self, location_input_str):
         """Obtém latitude, longitude e fuso horário para uma localização."""
         try:
-            location = self.geolocator.geocode(location_input_str)
+            location = self.geocoder.geocode(location_input_str)
             if not location:
                 return None, None, None, "Localização não encontrada."
 
@@ -40,24 +53,10 @@ class AstrologicalData:
         """
         Determina se o mapa é diurno ou noturno.
         Um mapa é diurno se o Sol está acima do horizonte (Casas 7 a 12).
-        houses[0] é o Ascendente (Cúspide da Casa 1)
-        houses[6] é o Descendente (Cúspide da Casa 7)
+        houses[0] é o Ascendente (Cúspide da Casa 1); o cruzamento de 0/360
+        graus é tratado em `is_day_chart`, que também serve a lotes de mapas.
         """
-        asc_lon = houses[0]
-        des_lon = (houses[0] + 180) % 360 # Descendente é 180 graus do Ascendente
-
-        # Normaliza longitudes para um range contínuo se necessário para comparação
-        # Isso lida com o cruzar de 0/360 graus
-        if des_lon < asc_lon:
-            if sun_lon >= asc_lon or sun_lon < des_lon:
-                return True # Sol no hemisfério superior
-            else:
-                return False # Sol no hemisfério inferior
-        else:
-            if sun_lon >= asc_lon and sun_lon < des_lon:
-                return False # Sol no hemisfério inferior
-            else:
-                return True # Sol no hemisfério superior
+        return bool(is_day_chart(sun_lon, houses[0]))
 
     def calculate_chart_data(self, chart_type, house_system, date_str, time_str, latitude, longitude, timezone_id):
         """
@@ -65,130 +64,491 @@ class AstrologicalData:
         Retorna um dicionário com os dados do mapa ou None em caso de erro.
         """
         try:
-            if chart_type == 'natal':
-                birth_date = datetime.datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
-            elif chart_type == 'horary':
-                birth_date = datetime.datetime.now(pytz.timezone(timezone_id))
-                date_str = birth_date.strftime("%Y-%m-%d") # Update for display
-                time_str = birth_date.strftime("%H:%M") # Update for display
-
-            utc_birth_date = birth_date.astimezone(pytz.utc)
-            jd = swe.julday(utc_birth_date.year, utc_birth_date.month, utc_birth_date.day,
-                            utc_birth_date.hour + utc_birth_date.minute / 60.0)
-
-            point_positions = []
-            swe_points_map = {
-                'Sun': swe.SUN, 'Moon': swe.MOON, 'Mercury': swe.MERCURY,
-                'Venus': swe.VENUS, 'Mars': swe.MARS, 'Jupiter': swe.JUPITER,
-                'Saturn': swe.SATURN, 'Uranus': swe.URANUS, 'Neptune': swe.NEPTUNE,
-                'Pluto': swe.PLUTO, 'True Node': swe.MEAN_NODE # Ou swe.TRUE_NODE se preferir
-            }
+            birth_date, date_str, time_str, jd = self._resolve_birth_date(chart_type, date_str, time_str, timezone_id)
 
             points_to_calculate = NATAL_POINTS_CALCULABLE if chart_type == 'natal' else HORARY_POINTS_CALCULABLE
+            point_positions = self._calculate_point_positions(jd, points_to_calculate)
 
-            for name in points_to_calculate:
-                if name in swe_points_map:
-                    swe_id = swe_points_map.get(name)
-                    xx = swe.calc_ut(jd, swe_id, swe.FLG_SWIEPH | swe.FLG_SPEED)[0]
-                    
-                    lon = xx[0]         # Longitude
-                    speed = xx[3]       # Velocidade da longitude (graus/dia)
+            # Calculate Houses (todos os sistemas de uma vez, para troca instantânea)
+            houses_by_system = self.calculate_houses_all(jd, latitude, longitude)
+            houses, ascmc = self._select_house_system(houses_by_system, house_system)
+            self._add_derived_points(point_positions, houses, ascmc[0])
 
-                    is_retrograde = False
-                    if name in RETROGRADE_PLANETS and speed < 0:
-                        is_retrograde = True
+            chart_data = self._build_chart_dict(
+                chart_type, house_system, birth_date, date_str, time_str, jd,
+                latitude, longitude, timezone_id, point_positions, houses, ascmc
+            )
+            chart_data['houses_by_system'] = houses_by_system
+            return chart_data, None # No error
 
-                    point_positions.append({
-                        'name': name,
-                        'lon': lon,
-                        'retrograde': is_retrograde,
-                        'speed': speed
-                    })
+        except ValueError as e:
+            return None, f"Erro no formato de data/hora: {e}. Use AAAA-MM-DD e HH:MM."
+        except pytz.UnknownTimeZoneError:
+            return None, "Fuso horário inválido. Verifique o local ou o fuso."
+        except Exception as e:
+            return None, f"Erro inesperado no cálculo astrológico: {e}"
 
-            # Calculate Houses
-            houses_bytes = b'P' if house_system == 'Placidus' else b'R'
-            houses, ascmc = swe.houses(jd, latitude, longitude, houses_bytes)
-            asc = ascmc[0]
-            mc = ascmc[1]
-
-            # --- MODIFICAÇÃO AQUI PARA A PARTE DA FORTUNA ---
-            moon_lon = next((p['lon'] for p in point_positions if p['name'] == 'Moon'), None)
-            sun_lon = next((p['lon'] for p in point_positions if p['name'] == 'Sun'), None)
-
-            if moon_lon is not None and sun_lon is not None:
-                is_day_chart = self._is_day_chart(sun_lon, houses)
-
-                if is_day_chart:
-                    # Fórmula diurna: Asc + Lua - Sol
-                    fortune_lon = (asc + moon_lon - sun_lon) % 360
-                else:
-                    # Fórmula noturna: Asc - Lua + Sol
-                    fortune_lon = (asc - moon_lon + sun_lon) % 360
-                    # Garante que o resultado seja positivo
-                    if fortune_lon < 0:
-                        fortune_lon += 360
-
-                point_positions.append({'name': 'Fortune', 'lon': fortune_lon, 'retrograde': False, 'speed': 0})
-            # --- FIM DA MODIFICAÇÃO ---
-            
-            # Calculate South Node (180 degrees opposite to True Node)
-            true_node_lon = next((p['lon'] for p in point_positions if p['name'] == 'True Node'), None)
-            if true_node_lon is not None:
-                south_node_lon = (true_node_lon + 180) % 360
-                point_positions.append({'name': 'True Node South', 'lon': south_node_lon, 'retrograde': False, 'speed': 0})
-
-            # Format house cusps for display
-            textual_house_cusps = []
-            for i in range(1, 13):
-                cusp_lon = houses[i-1]
-                sign_at_cusp = self._get_sign(cusp_lon)
-                degree_in_sign = self._get_degree_in_sign(cusp_lon)
-                degrees = int(degree_in_sign)
-                minutes = int((degree_in_sign - degrees) * 60)
-                textual_house_cusps.append(f"Casa {i}: {degrees}°{minutes:02d}' {sign_at_cusp}")
-
-            # Calculate aspects
-            aspects_data, textual_aspects = self._calculate_aspects(point_positions)
-
-            # Format point positions for display
-            textual_point_positions = []
-            for p_data in point_positions:
-                sign_of_point = self._get_sign(p_data['lon'])
-                degree_in_sign = self._get_degree_in_sign(p_data['lon'])
-                degrees = int(degree_in_sign)
-                minutes = int((degree_in_sign - degrees) * 60)
-                retro_status = " (R)" if p_data['retrograde'] else ""
-                textual_point_positions.append(
-                    f"{p_data['name']}: {degrees}°{minutes:02d}' {sign_of_point}{retro_status} ({p_data['lon']:.2f}°)"
-                )
-
-            return {
-                'chart_type': chart_type,
-                'house_system': house_system,
-                'birth_date': birth_date,
-                'date_str': date_str,
-                'time_str': time_str,
-                'jd': jd,
-                'latitude': latitude,
-                'longitude': longitude,
-                'timezone_id': timezone_id,
-                'point_positions': point_positions,
-                'houses': houses,
-                'asc': asc,
-                'mc': mc,
-                'textual_house_cusps': textual_house_cusps,
-                'aspects_data': aspects_data,
-                'textual_aspects': textual_aspects,
-                'textual_point_positions': textual_point_positions
-            }, None # No error
+    def calculate_charts_batch(self, chart_specs):
+        """
+        Calcula vários mapas numa única chamada (ex.: painel com vários mapas).
+        As posições de todos os instantes saem de uma só amostragem das
+        efemérides e as casas passam pelo cache de sistemas.
+        `chart_specs`: tuplas (chart_type, house_system, date_str, time_str,
+        latitude, longitude, timezone_id), como em `calculate_chart_data`.
+        Retorna (lista de mapas, erro).
+        """
+        try:
+            if not chart_specs:
+                return [], None
+            resolved = [self._resolve_birth_date(spec[0], spec[2], spec[3], spec[6]) for spec in chart_specs]
+            jds = np.array([jd for _, _, _, jd in resolved])
+            all_lons, all_speeds, all_lats, all_decs = sample_coordinates(jds, NATAL_POINTS_CALCULABLE)
+
+            charts = []
+            for k, (chart_type, house_system, _, _, latitude, longitude, timezone_id) in enumerate(chart_specs):
+                birth_date, date_str, time_str, jd = resolved[k]
+                houses_by_system = self.calculate_houses_all(jd, latitude, longitude)
+                charts.append(self.chart_from_samples(
+                    chart_type, house_system, jd, latitude, longitude, timezone_id,
+                    NATAL_POINTS_CALCULABLE, all_lons[k], all_speeds[k], houses_by_system,
+                    lats=all_lats[k], decs=all_decs[k],
+                    birth_date=birth_date, date_str=date_str, time_str=time_str
+                ))
+            return charts, None
 
         except ValueError as e:
-            return None, f"Erro no formato de data/hora: {e}. Use AAAA-MM-DD e HH:MM."
+            return [], f"Erro no formato de data/hora: {e}. Use AAAA-MM-DD e HH:MM."
+        except pytz.UnknownTimeZoneError:
+            return [], "Fuso horário inválido. Verifique o local ou o fuso."
+        except Exception as e:
+            return [], f"Erro inesperado no cálculo astrológico: {e}"
+
+    def screen_out_of_bounds(self, jds, points=ASPECT_POINTS):
+        """
+        Triagem em massa de pontos fora dos limites (declinação além da
+        obliquidade) para muitos instantes de uma vez, ex.: uma base inteira
+        de mapas. Não monta dicionários de mapa: só amostra as declinações.
+        Retorna ({'decs' (N, P), 'obliquity' (N,), 'mask' (N, P), 'points'}, erro).
+        """
+        try:
+            jds = np.atleast_1d(np.asarray(jds, dtype=float))
+            points = list(points)
+            _, _, _, decs = sample_coordinates(jds, points)
+            obliquity = np.array([self._obliquity(jd) for jd in jds])
+            return {'decs': decs, 'obliquity': obliquity,
+                    'mask': out_of_bounds(decs, obliquity), 'points': points}, None
+        except Exception as e:
+            return None, f"Erro inesperado no cálculo astrológico: {e}"
+
+    def chart_from_samples(self, chart_type, house_system, jd, latitude, longitude, timezone_id,
+                           names, lons, speeds, houses_by_system, lats=None, decs=None,
+                           birth_date=None, date_str=None, time_str=None):
+        """
+        Monta o mapa a partir de longitudes e velocidades já amostradas (na
+        ordem de `names`) e das cúspides de `houses_by_system`, sem chamar o
+        Swiss Ephemeris: ex.: lotes de `sample_coordinates` ou o buffer horário.
+        `lats` e `decs` (latitude eclíptica e declinação) são opcionais.
+        Só entram os pontos do tipo de mapa; os pontos derivados são refeitos.
+        """
+        points_to_calculate = NATAL_POINTS_CALCULABLE if chart_type == 'natal' else HORARY_POINTS_CALCULABLE
+        point_positions = []
+        for p, name in enumerate(names):
+            if name not in points_to_calculate:
+                continue
+            speed = float(speeds[p])
+            point = {
+                'name': name,
+                'lon': float(lons[p]),
+                'retrograde': bool(name in RETROGRADE_PLANETS and speed < 0),
+                'speed': speed
+            }
+            if lats is not None and decs is not None:
+                point['lat'], point['dec'] = float(lats[p]), float(decs[p])
+            point_positions.append(point)
+
+        if birth_date is None:
+            birth_date = self._jd_to_datetime(jd, timezone_id)
+            date_str, time_str = birth_date.strftime("%Y-%m-%d"), birth_date.strftime("%H:%M")
+        houses, ascmc = self._select_house_system(houses_by_system, house_system)
+        self._add_derived_points(point_positions, houses, ascmc[0])
+        chart_data = self._build_chart_dict(
+            chart_type, house_system, birth_date, date_str, time_str, jd,
+            latitude, longitude, timezone_id, point_positions, houses, ascmc
+        )
+        chart_data['houses_by_system'] = houses_by_system
+        return chart_data
+
+    def calculate_chart_data_for_jd(self, chart_type, house_system, jd, latitude, longitude, timezone_id,
+                                    points_to_calculate=NATAL_POINTS_CALCULABLE):
+        """
+        Calcula um mapa completo a partir de um Dia Juliano (UT) já conhecido.
+        Usado por mapas derivados (Davison, retornos) cujo instante não vem da interface.
+        Retorna (dados do mapa, erro) como `calculate_chart_data`.
+        """
+        try:
+            birth_date = self._jd_to_datetime(jd, timezone_id)
+            point_positions = self._calculate_point_positions(jd, points_to_calculate)
+            houses_by_system = self.calculate_houses_all(jd, latitude, longitude)
+            houses, ascmc = self._select_house_system(houses_by_system, house_system)
+            self._add_derived_points(point_positions, houses, ascmc[0])
+
+            chart_data = self._build_chart_dict(
+                chart_type, house_system, birth_date, birth_date.strftime("%Y-%m-%d"),
+                birth_date.strftime("%H:%M"), jd, latitude, longitude, timezone_id,
+                point_positions, houses, ascmc
+            )
+            chart_data['houses_by_system'] = houses_by_system
+            return chart_data, None
+
         except pytz.UnknownTimeZoneError:
             return None, "Fuso horário inválido. Verifique o local ou o fuso."
         except Exception as e:
             return None, f"Erro inesperado no cálculo astrológico: {e}"
 
+    def chart_from_positions(self, chart_type, house_system, jd, latitude, longitude, timezone_id,
+                             point_positions, houses, ascmc):
+        """
+        Remonta um dicionário de mapa completo (textos e aspectos incluídos) a
+        partir de dados numéricos já calculados, ex.: carregados de um banco ou arquivo.
+        """
+        birth_date = self._jd_to_datetime(jd, timezone_id)
+        return self._build_chart_dict(
+            chart_type, house_system, birth_date, birth_date.strftime("%Y-%m-%d"),
+            birth_date.strftime("%H:%M"), jd, latitude, longitude, timezone_id,
+            point_positions, houses, ascmc
+        )
+
+    def calculate_houses_all(self, jd, latitude, longitude, house_systems=None):
+        """
+        Calcula as cúspides de vários sistemas de casas para um mesmo (jd, lat, lon).
+        O tempo sideral (ARMC) e a obliquidade são calculados uma única vez e
+        compartilhados por todos os sistemas via swe.houses_armc.
+        Sistemas indefinidos na latitude (ex.: Placidus no círculo polar) ficam de fora.
+        Retorna {nome do sistema: (cúspides, ascmc)}; o resultado fica em cache.
+        """
+        house_systems = list(HOUSE_SYSTEMS) if house_systems is None else list(house_systems)
+        key = (jd, latitude, longitude)
+
+        cached = self._houses_cache.get(key)
+        if cached is None:
+            cached = {'armc': None, 'eps': None, 'systems': {}, 'failed': set()}
+            self._houses_cache[key] = cached
+            if len(self._houses_cache) > HOUSES_CACHE_SIZE:
+                self._houses_cache.popitem(last=False)
+        else:
+            self._houses_cache.move_to_end(key)
+
+        missing = [name for name in house_systems
+                   if name not in cached['systems'] and name not in cached['failed']]
+        if missing:
+            if cached['armc'] is None:
+                # swe.sidtime já inclui a nutação (tempo sideral aparente), como swe.houses
+                cached['armc'] = (swe.sidtime(jd) * 15 + longitude) % 360
+                cached['eps'] = self._obliquity(jd)
+            for name in missing:
+                try:
+                    cached['systems'][name] = swe.houses_armc(
+                        cached['armc'], latitude, cached['eps'], self._house_system_code(name)
+                    )
+                except swe.Error:
+                    cached['failed'].add(name)
+
+        return {name: cached['systems'][name] for name in house_systems if name in cached['systems']}
+
+    def switch_house_system(self, chart_data, house_system):
+        """
+        Troca o sistema de casas de um mapa já calculado sem recalcular os planetas.
+        Usa as cúspides já presentes em `houses_by_system` (ou o cache de casas).
+        Retorna (novo dicionário do mapa, erro).
+        """
+        try:
+            houses_by_system = chart_data.get('houses_by_system') or {}
+            if house_system not in houses_by_system:
+                houses_by_system = {**houses_by_system, **self.calculate_houses_all(
+                    chart_data['jd'], chart_data['latitude'], chart_data['longitude'], [house_system]
+                )}
+            houses, ascmc = self._select_house_system(houses_by_system, house_system)
+
+            # Pontos derivados (Fortuna, Nodo Sul) dependem do Ascendente e são refeitos
+            point_positions = [dict(p) for p in chart_data['point_positions']
+                               if p['name'] not in ('Fortune', 'True Node South')]
+            self._add_derived_points(point_positions, houses, ascmc[0])
+
+            new_chart = self._build_chart_dict(
+                chart_data['chart_type'], house_system, chart_data['birth_date'],
+                chart_data['date_str'], chart_data['time_str'], chart_data['jd'],
+                chart_data['latitude'], chart_data['longitude'], chart_data['timezone_id'],
+                point_positions, houses, ascmc
+            )
+            new_chart['houses_by_system'] = houses_by_system
+            return new_chart, None
+
+        except Exception as e:
+            return None, f"Erro ao trocar o sistema de casas: {e}"
+
+    def calculate_composite_chart(self, chart_a, chart_b):
+        """
+        Mapa composto: ponto médio (circular) de cada par de pontos dos dois mapas.
+        As casas são derivadas do MC composto na latitude média (método do local de referência).
+        Retorna (dados do mapa, erro).
+        """
+        charts, error = self.calculate_composite_charts_batch([(chart_a, chart_b)])
+        return (charts[0] if charts else None), error
+
+    def calculate_composite_charts_batch(self, chart_pairs):
+        """
+        Gera vários mapas compostos de uma vez. Os pontos médios de todas as
+        longitudes, velocidades e MCs são calculados em arrays (K, P) do NumPy.
+        Retorna (lista de mapas, erro).
+        """
+        try:
+            if not chart_pairs:
+                return [], None
+            names = [p['name'] for p in chart_pairs[0][0]['point_positions']]
+
+            lons_a = np.array([longitudes_array(a['point_positions'], names) for a, _ in chart_pairs])
+            lons_b = np.array([longitudes_array(b['point_positions'], names) for _, b in chart_pairs])
+            speeds_a = np.array([[self._point_speed(a, name) for name in names] for a, _ in chart_pairs])
+            speeds_b = np.array([[self._point_speed(b, name) for name in names] for _, b in chart_pairs])
+
+            composite_lons = circular_midpoint(lons_a, lons_b)
+            composite_speeds = (speeds_a + speeds_b) / 2
+            composite_mcs = circular_midpoint([a['mc'] for a, _ in chart_pairs], [b['mc'] for _, b in chart_pairs])
+            mean_jds = np.array([(a['jd'] + b['jd']) / 2 for a, b in chart_pairs])
+            mean_lats = np.array([(a['latitude'] + b['latitude']) / 2 for a, b in chart_pairs])
+            mean_lons = geographic_midpoint([a['longitude'] for a, _ in chart_pairs],
+                                            [b['longitude'] for _, b in chart_pairs])
+
+            composite_charts = []
+            for k, (chart_a, _) in enumerate(chart_pairs):
+                eps = self._obliquity(mean_jds[k])
+                armc = self._armc_from_mc(composite_mcs[k], eps)
+                houses, ascmc = swe.houses_armc(armc, mean_lats[k], eps, self._house_system_code(chart_a['house_system']))
+
+                point_positions = []
+                for name, lon, speed in zip(names, composite_lons[k], composite_speeds[k]):
+                    if np.isnan(lon):
+                        continue
+                    point_positions.append({
+                        'name': name,
+                        'lon': float(lon),
+                        'retrograde': bool(name in RETROGRADE_PLANETS and speed < 0),
+                        'speed': float(speed)
+                    })
+
+                birth_date = self._jd_to_datetime(mean_jds[k], 'UTC')
+                composite_charts.append(self._build_chart_dict(
+                    'composite', chart_a['house_system'], birth_date, birth_date.strftime("%Y-%m-%d"),
+                    birth_date.strftime("%H:%M"), float(mean_jds[k]), float(mean_lats[k]), float(mean_lons[k]),
+                    'UTC', point_positions, houses, ascmc
+                ))
+            return composite_charts, None
+
+        except Exception as e:
+            return [], f"Erro inesperado no cálculo do mapa composto: {e}"
+
+    def calculate_davison_chart(self, chart_a, chart_b):
+        """
+        Mapa Davison: um mapa real calculado no instante médio e no local médio dos dois mapas.
+        Retorna (dados do mapa, erro).
+        """
+        charts, error = self.calculate_davison_charts_batch([(chart_a, chart_b)])
+        return (charts[0] if charts else None), error
+
+    def calculate_davison_charts_batch(self, chart_pairs):
+        """
+        Gera vários mapas Davison de uma vez. Instantes e locais médios são
+        calculados em lote; cada mapa é recalculado com swe.calc_ut/swe.houses.
+        Retorna (lista de mapas, erro).
+        """
+        if not chart_pairs:
+            return [], None
+        mean_jds = (np.array([a['jd'] for a, _ in chart_pairs]) + np.array([b['jd'] for _, b in chart_pairs])) / 2
+        mean_lats = (np.array([a['latitude'] for a, _ in chart_pairs]) + np.array([b['latitude'] for _, b in chart_pairs])) / 2
+        mean_lons = geographic_midpoint([a['longitude'] for a, _ in chart_pairs],
+                                        [b['longitude'] for _, b in chart_pairs])
+
+        davison_charts = []
+        for k, (chart_a, _) in enumerate(chart_pairs):
+            timezone_id = self.tf.timezone_at(lng=mean_lons[k], lat=mean_lats[k]) or 'UTC'
+            chart, error = self.calculate_chart_data_for_jd(
+                'davison', chart_a['house_system'], float(mean_jds[k]),
+                float(mean_lats[k]), float(mean_lons[k]), timezone_id
+            )
+            if error:
+                return [], error
+            davison_charts.append(chart)
+        return davison_charts, None
+
+    def _resolve_birth_date(self, chart_type, date_str, time_str, timezone_id):
+        """
+        Data do mapa (agora, no fuso do local, para a horária), textos de data
+        e hora para exibição e o Dia Juliano (UT) correspondente.
+        """
+        if chart_type == 'horary':
+            birth_date = datetime.datetime.now(pytz.timezone(timezone_id))
+            date_str = birth_date.strftime("%Y-%m-%d") # Update for display
+            time_str = birth_date.strftime("%H:%M") # Update for display
+        else:
+            birth_date = datetime.datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
+
+        utc_birth_date = birth_date.astimezone(pytz.utc)
+        jd = swe.julday(utc_birth_date.year, utc_birth_date.month, utc_birth_date.day,
+                        utc_birth_date.hour + utc_birth_date.minute / 60.0)
+        return birth_date, date_str, time_str, jd
+
+    def _calculate_point_positions(self, jd, points_to_calculate):
+        """Calcula longitude, velocidade e retrogradação de cada ponto no instante `jd`."""
+        point_positions = []
+        for name in points_to_calculate:
+            if name in SWE_POINTS_MAP:
+                swe_id = SWE_POINTS_MAP.get(name)
+                xx = swe.calc_ut(jd, swe_id, swe.FLG_SWIEPH | swe.FLG_SPEED)[0]
+                equatorial = swe.calc_ut(jd, swe_id, swe.FLG_SWIEPH | swe.FLG_SPEED | swe.FLG_EQUATORIAL)[0]
+                
+                lon = xx[0]         # Longitude
+                speed = xx[3]       # Velocidade da longitude (graus/dia)
+
+                is_retrograde = False
+                if name in RETROGRADE_PLANETS and speed < 0:
+                    is_retrograde = True
+
+                point_positions.append({
+                    'name': name,
+                    'lon': lon,
+                    'retrograde': is_retrograde,
+                    'speed': speed,
+                    'lat': xx[1],           # Latitude eclíptica
+                    'dec': equatorial[1]    # Declinação
+                })
+        return point_positions
+
+    def _add_derived_points(self, point_positions, houses, asc):
+        """Acrescenta a Parte da Fortuna e o Nodo Sul, derivados dos pontos calculados."""
+        # --- MODIFICAÇÃO AQUI PARA A PARTE DA FORTUNA ---
+        moon_lon = next((p['lon'] for p in point_positions if p['name'] == 'Moon'), None)
+        sun_lon = next((p['lon'] for p in point_positions if p['name'] == 'Sun'), None)
+
+        if moon_lon is not None and sun_lon is not None:
+            is_day_chart = self._is_day_chart(sun_lon, houses)
+
+            if is_day_chart:
+                # Fórmula diurna: Asc + Lua - Sol
+                fortune_lon = (asc + moon_lon - sun_lon) % 360
+            else:
+                # Fórmula noturna: Asc - Lua + Sol
+                fortune_lon = (asc - moon_lon + sun_lon) % 360
+                # Garante que o resultado seja positivo
+                if fortune_lon < 0:
+                    fortune_lon += 360
+
+            point_positions.append({'name': 'Fortune', 'lon': fortune_lon, 'retrograde': False, 'speed': 0})
+        # --- FIM DA MODIFICAÇÃO ---
+        
+        # Calculate South Node (180 degrees opposite to True Node)
+        true_node_lon = next((p['lon'] for p in point_positions if p['name'] == 'True Node'), None)
+        if true_node_lon is not None:
+            south_node_lon = (true_node_lon + 180) % 360
+            south_node = {'name': 'True Node South', 'lon': south_node_lon, 'retrograde': False, 'speed': 0}
+            north_node = next(p for p in point_positions if p['name'] == 'True Node')
+            if 'dec' in north_node:
+                south_node['lat'], south_node['dec'] = -north_node['lat'], -north_node['dec']
+            point_positions.append(south_node)
+
+    def _build_chart_dict(self, chart_type, house_system, birth_date, date_str, time_str, jd,
+                          latitude, longitude, timezone_id, point_positions, houses, ascmc):
+        """Monta o dicionário de dados do mapa, com aspectos e textos formatados."""
+        # Format house cusps for display
+        textual_house_cusps = []
+        for i in range(1, 13):
+            cusp_lon = houses[i-1]
+            sign_at_cusp = self._get_sign(cusp_lon)
+            degree_in_sign = self._get_degree_in_sign(cusp_lon)
+            degrees = int(degree_in_sign)
+            minutes = int((degree_in_sign - degrees) * 60)
+            textual_house_cusps.append(f"Casa {i}: {degrees}°{minutes:02d}' {sign_at_cusp}")
+
+        # Calculate aspects
+        aspects_data, textual_aspects = self._calculate_aspects(point_positions)
+        parallels_data, textual_parallels = self._calculate_parallels(point_positions)
+        patterns_data, textual_patterns = chart_patterns(point_positions)
+        obliquity = self._obliquity(jd)
+        declined = [p for p in point_positions if 'dec' in p]
+        oob_mask = out_of_bounds([p['dec'] for p in declined], obliquity)
+        out_of_bounds_points = [p['name'] for p, oob in zip(declined, oob_mask) if oob]
+
+        # Dignidades essenciais pela seita do mapa (tabelas pré-calculadas)
+        sun_lon = next((p['lon'] for p in point_positions if p['name'] == 'Sun'), None)
+        is_day = self._is_day_chart(sun_lon, houses) if sun_lon is not None else True
+        dignities = chart_dignities(point_positions, is_day, ascmc[0], ascmc[1])
+
+        # Format point positions for display
+        textual_point_positions = []
+        for p_data in point_positions:
+            sign_of_point = self._get_sign(p_data['lon'])
+            degree_in_sign = self._get_degree_in_sign(p_data['lon'])
+            degrees = int(degree_in_sign)
+            minutes = int((degree_in_sign - degrees) * 60)
+            retro_status = " (R)" if p_data['retrograde'] else ""
+            textual_point_positions.append(
+                f"{p_data['name']}: {degrees}°{minutes:02d}' {sign_of_point}{retro_status} ({p_data['lon']:.2f}°)"
+            )
+
+        return {
+            'chart_type': chart_type,
+            'house_system': house_system,
+            'birth_date': birth_date,
+            'date_str': date_str,
+            'time_str': time_str,
+            'jd': jd,
+            'latitude': latitude,
+            'longitude': longitude,
+            'timezone_id': timezone_id,
+            'point_positions': point_positions,
+            'houses': houses,
+            'asc': ascmc[0],
+            'mc': ascmc[1],
+            'textual_house_cusps': textual_house_cusps,
+            'aspects_data': aspects_data,
+            'textual_aspects': textual_aspects,
+            'textual_point_positions': textual_point_positions,
+            'obliquity': obliquity,
+            'parallels_data': parallels_data,
+            'textual_parallels': textual_parallels,
+            'aspect_patterns': patterns_data,
+            'textual_patterns': textual_patterns,
+            'out_of_bounds': out_of_bounds_points,
+            'is_day_chart': is_day,
+            'dignities': dignities
+        }
+
+    def _point_speed(self, chart_data, name):
+        """Velocidade de um ponto pelo nome (NaN se o mapa não tiver o ponto)."""
+        return next((p['speed'] for p in chart_data['point_positions'] if p['name'] == name), np.nan)
+
+    def _house_system_code(self, house_system):
+        """Converte o nome do sistema de casas no código do Swiss Ephemeris."""
+        return HOUSE_SYSTEMS.get(house_system, b'R')
+
+    def _select_house_system(self, houses_by_system, house_system):
+        """Retorna (cúspides, ascmc) do sistema pedido ou erro se ele não pôde ser calculado."""
+        if house_system not in houses_by_system:
+            raise swe.Error(f"Sistema de casas {house_system} indefinido para esta latitude.")
+        return houses_by_system[house_system]
+
+    def _jd_to_datetime(self, jd, timezone_id):
+        """Converte um Dia Juliano (UT) em datetime localizado no fuso `timezone_id`."""
+        return jd_to_datetime(jd, timezone_id)
+
+    def _obliquity(self, jd):
+        """Obliquidade verdadeira da eclíptica no instante `jd`."""
+        return swe.calc_ut(jd, swe.ECL_NUT)[0][0]
+
+    def _armc_from_mc(self, mc, eps):
+        """Ascensão reta do meio do céu (ARMC) correspondente a uma longitude de MC."""
+        mc_rad = np.radians(mc)
+        return np.degrees(np.arctan2(np.sin(mc_rad) * np.cos(np.radians(eps)), np.cos(mc_rad))) % 360
+
     def _get_sign(self, longitude):
         """Helper to get sign from longitude."""
         sign_index = int(longitude / 30) % 12
@@ -198,41 +558,53 @@ class AstrologicalData:
         """Helper to get degree within sign from longitude."""
         return longitude % 30
 
-    def _calculate_aspects(self, point_positions, orb=8):
+    def _calculate_aspects(self, point_positions, orb=DEFAULT_ASPECT_ORB):
         """Calcula e formata os aspectos entre os planetas."""
-        aspects = {
-            "Conjunção": (0, 'red'),
-            "Oposição": (180, 'red'),
-            "Trígono": (120, '#008000'), # Green
-            "Quadratura": (90, 'red'),
-            "Sextil": (60, '#008000'), # Green
-        }
-
         aspect_lines_info = []
         textual_aspects = []
-        
+
         # Filter for actual planets for aspects (excluding nodes/fortune)
-        planet_names_for_aspects = [
-            'Sun', 'Moon', 'Mercury', 'Venus', 'Mars',
-            'Jupiter', 'Saturn', 'Uranus', 'Neptune', 'Pluto'
-        ]
-        
-        aspect_points = [p for p in point_positions if p['name'] in planet_names_for_aspects]
-
-        for i in range(len(aspect_points)):
-            for j in range(i + 1, len(aspect_points)):
-                name1 = aspect_points[i]['name']
-                lon1 = aspect_points[i]['lon']
-                name2 = aspect_points[j]['name']
-                lon2 = aspect_points[j]['lon']
-
-                diff = abs(lon1 - lon2)
-                if diff > 180:
-                    diff = 360 - diff
-
-                for aspect_name, (angle, color) in aspects.items():
-                    if abs(diff - angle) <= orb:
-                        aspect_lines_info.append({'point1': name1, 'point2': name2, 'color': color})
-                        textual_aspects.append(f"{name1} - {name2}: {aspect_name} ({diff:.2f}°)")
-                        break # Found an aspect, move to next pair
-        return aspect_lines_info, textual_aspects
\ No newline at end of file
+        aspect_points = [p for p in point_positions if p['name'] in ASPECT_POINTS]
+        lons = np.array([p['lon'] for p in aspect_points], dtype=float)
+
+        # Matriz de separações e classificação de todos os pares de uma vez
+        separations = separation_matrix(lons, lons)
+        aspect_index, exact_orb = match_aspects(separations, orb)
+        aspect_names = list(ASPECTS)
+
+        rows, cols = np.triu_indices(len(aspect_points), k=1)
+        for i, j in zip(rows, cols):
+            idx = aspect_index[i, j]
+            if idx < 0:
+                continue
+            name1 = aspect_points[i]['name']
+            name2 = aspect_points[j]['name']
+            aspect_name = aspect_names[idx]
+            angle, color = ASPECTS[aspect_name]
+            diff = separations[i, j]
+
+            aspect_lines_info.append({
+                'point1': name1, 'point2': name2, 'color': color,
+                'aspect': aspect_name, 'angle': angle, 'orb': float(exact_orb[i, j])
+            })
+            textual_aspects.append(f"{name1} - {name2}: {aspect_name} ({diff:.2f}°)")
+        return aspect_lines_info, textual_aspects
+
+    def _calculate_parallels(self, point_positions, orb=PARALLEL_ORB_DEGREES):
+        """Paralelos e contraparalelos entre os planetas que têm declinação."""
+        parallel_points = [p for p in point_positions if p['name'] in ASPECT_POINTS and 'dec' in p]
+        decs = np.array([p['dec'] for p in parallel_points], dtype=float)
+        kind, exact_orb = match_parallels(decs, decs, orb)
+
+        parallels_data, textual_parallels = [], []
+        rows, cols = np.triu_indices(len(parallel_points), k=1)
+        for i, j in zip(rows, cols):
+            if kind[i, j] < 0:
+                continue
+            name1, name2 = parallel_points[i]['name'], parallel_points[j]['name']
+            aspect_name = DECLINATION_ASPECTS[kind[i, j]]
+            parallels_data.append({
+                'point1': name1, 'point2': name2, 'aspect': aspect_name, 'orb': float(exact_orb[i, j])
+            })
+            textual_parallels.append(f"{name1} - {name2}: {aspect_name} (orbe {exact_orb[i, j]:.2f}°)")
+        return parallels_data, textual_parallels
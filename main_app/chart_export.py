@@ -0,0 +1,363 @@
+import csv
+import json
+import os
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+except ImportError: # pyarrow é opcional: só o formato Arrow depende dele
+    pa = None
+
+from .constants import EXPORT_SCHEMA_VERSION, EXPORT_BATCH_SIZE
+from .astrological_data import AstrologicalData
+from .chart_store import POINT_ORDER
+
+# =============================================================================
+# ESQUEMA ESTÁVEL
+# Um mapa exportado é um registro com os campos de CHART_FIELDS mais:
+#   points:  [{name, lon, speed, retrograde, dignity}]  (dignity: pontuação
+#            essencial dos planetas tradicionais, vazia nos demais; só saída)
+#   cusps:   [12 longitudes]
+#   aspects: [{point1, point2, aspect, angle, orb}]
+# Só dados numéricos: os textos em português (`textual_*`) são gerados de
+# novo na carga. JSON Lines guarda o registro como está; CSV usa uma linha
+# larga por mapa; Arrow IPC usa listas de structs, no formato de arquivo
+# (.arrow, com rodapé e acesso aleatório) ou no de fluxo (.arrows).
+# =============================================================================
+
+CHART_FIELDS = ['schema_version', 'label', 'chart_type', 'house_system', 'jd',
+                'latitude', 'longitude', 'timezone_id', 'asc', 'mc']
+FLOAT_FIELDS = {'jd', 'latitude', 'longitude', 'asc', 'mc'}
+ARROW_FILE_MAGIC = b'ARROW1' # Início do formato de arquivo do Arrow IPC (o de fluxo não tem)
+
+
+def chart_to_record(chart_data, label=None):
+    """Converte um dicionário de mapa no registro do esquema de exportação."""
+    dignity_scores = {p['name']: p['score'] for p in (chart_data.get('dignities') or {}).get('points', [])}
+    return {
+        'schema_version': EXPORT_SCHEMA_VERSION,
+        'label': label,
+        'chart_type': chart_data['chart_type'],
+        'house_system': chart_data['house_system'],
+        'jd': float(chart_data['jd']),
+        'latitude': float(chart_data['latitude']),
+        'longitude': float(chart_data['longitude']),
+        'timezone_id': chart_data['timezone_id'],
+        'asc': float(chart_data['asc']),
+        'mc': float(chart_data['mc']),
+        'points': [{'name': p['name'], 'lon': float(p['lon']), 'speed': float(p.get('speed', 0.0)),
+                    'retrograde': bool(p['retrograde']), 'dignity': dignity_scores.get(p['name'])}
+                   for p in chart_data['point_positions']],
+        'cusps': [float(lon) for lon in chart_data['houses'][:12]],
+        'aspects': [{'point1': a['point1'], 'point2': a['point2'], 'aspect': a['aspect'],
+                     'angle': float(a['angle']), 'orb': float(a.get('orb', 0.0))} for a in chart_data['aspects_data']],
+    }
+
+
+def record_to_chart(record, astrological_data):
+    """Remonta o dicionário de mapa completo (desenhável) a partir de um registro."""
+    if record.get('schema_version', EXPORT_SCHEMA_VERSION) > EXPORT_SCHEMA_VERSION:
+        raise ValueError(f"Versão de esquema {record['schema_version']} mais nova que a suportada ({EXPORT_SCHEMA_VERSION}).")
+    point_positions = [{'name': p['name'], 'lon': p['lon'], 'retrograde': bool(p['retrograde']), 'speed': p['speed']}
+                       for p in record['points']]
+    return astrological_data.chart_from_positions(
+        record['chart_type'], record['house_system'], record['jd'], record['latitude'], record['longitude'],
+        record['timezone_id'], point_positions, tuple(record['cusps']), (record['asc'], record['mc'])
+    )
+
+
+def _column_prefix(point_name):
+    return point_name.lower().replace(' ', '_')
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("O formato Arrow requer o pacote opcional 'pyarrow' (pip install pyarrow).")
+
+
+def arrow_schema():
+    """Esquema Arrow dos registros exportados."""
+    _require_pyarrow()
+    point = pa.struct([('name', pa.string()), ('lon', pa.float64()), ('speed', pa.float64()),
+                       ('retrograde', pa.bool_()), ('dignity', pa.int8())])
+    aspect = pa.struct([('point1', pa.string()), ('point2', pa.string()), ('aspect', pa.string()),
+                        ('angle', pa.float64()), ('orb', pa.float64())])
+    return pa.schema([
+        ('schema_version', pa.int16()), ('label', pa.string()), ('chart_type', pa.string()),
+        ('house_system', pa.string()), ('jd', pa.float64()), ('latitude', pa.float64()),
+        ('longitude', pa.float64()), ('timezone_id', pa.string()), ('asc', pa.float64()), ('mc', pa.float64()),
+        ('points', pa.list_(point)), ('cusps', pa.list_(pa.float64(), 12)), ('aspects', pa.list_(aspect)),
+    ])
+
+
+# =============================================================================
+# ESCRITORES EM FLUXO
+# Todos aceitam `write(chart, label)` e `write_many(charts, labels)` com
+# qualquer iterável (inclusive geradores) e mantêm em memória no máximo um
+# lote; funcionam como gerenciadores de contexto.
+# =============================================================================
+
+
+class ChartWriter(ABC):
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+
+    def write(self, chart_data, label=None):
+        self.write_record(chart_to_record(chart_data, label))
+
+    def write_many(self, charts, labels=None):
+        labels = iter(labels) if labels is not None else None
+        for chart_data in charts:
+            self.write(chart_data, next(labels) if labels is not None else None)
+        return self.count
+
+    @abstractmethod
+    def write_record(self, record):
+        """Grava um registro do esquema de exportação."""
+
+    @abstractmethod
+    def close(self):
+        """Grava o que estiver pendente e fecha o arquivo."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class JsonLinesChartWriter(ChartWriter):
+    """Um registro JSON por linha (.jsonl)."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write_record(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+        self.file.write('\n')
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+
+class CsvChartWriter(ChartWriter):
+    """
+    Uma linha larga por mapa: campos do mapa, <ponto>_lon/_speed/_retrograde/_dignity
+    para cada ponto de POINT_ORDER, cusp_1..cusp_12 e a coluna `aspects`
+    no formato "ponto1|ponto2|aspecto|ângulo|orbe;...".
+    """
+
+    def __init__(self, path, points=POINT_ORDER):
+        super().__init__(path)
+        self.points = list(points)
+        self.file = open(path, 'w', encoding='utf-8', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.columns())
+
+    def columns(self):
+        point_columns = [f"{_column_prefix(p)}_{field}" for p in self.points for field in ('lon', 'speed', 'retrograde', 'dignity')]
+        return CHART_FIELDS + point_columns + [f"cusp_{i}" for i in range(1, 13)] + ['aspects']
+
+    def write_record(self, record):
+        points = {p['name']: p for p in record['points']}
+        row = [record[field] if record[field] is not None else '' for field in CHART_FIELDS]
+        for name in self.points:
+            p = points.get(name)
+            if p:
+                dignity = p.get('dignity')
+                row.extend([repr(p['lon']), repr(p['speed']), int(p['retrograde']), '' if dignity is None else dignity])
+            else:
+                row.extend(['', '', '', ''])
+        row.extend(repr(lon) for lon in record['cusps'])
+        row.append(';'.join(f"{a['point1']}|{a['point2']}|{a['aspect']}|{a['angle']:g}|{a['orb']!r}"
+                            for a in record['aspects']))
+        self.writer.writerow(row)
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+
+class ArrowChartWriter(ChartWriter):
+    """
+    Arrow IPC no formato de arquivo (.arrow): um RecordBatch a cada
+    `batch_size` mapas e o rodapé com o índice dos lotes gravado no `close`.
+    """
+
+    def __init__(self, path, batch_size=EXPORT_BATCH_SIZE):
+        _require_pyarrow()
+        super().__init__(path)
+        self.schema = arrow_schema()
+        self.batch_size = batch_size
+        self.sink = pa.OSFile(path, 'wb')
+        self.writer = self._new_writer()
+        self._pending = []
+
+    def _new_writer(self):
+        return pa.ipc.new_file(self.sink, self.schema)
+
+    def write_record(self, record):
+        self._pending.append(record)
+        self.count += 1
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self.writer.write_batch(pa.RecordBatch.from_pylist(self._pending, schema=self.schema))
+            self._pending = []
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+        self.sink.close()
+
+
+class ArrowStreamChartWriter(ArrowChartWriter):
+    """Arrow IPC no formato de fluxo (.arrows): sem rodapé, legível enquanto é gravado."""
+
+    def _new_writer(self):
+        return pa.ipc.new_stream(self.sink, self.schema)
+
+
+WRITERS = {'jsonl': JsonLinesChartWriter, 'csv': CsvChartWriter, 'arrow': ArrowChartWriter,
+           'arrows': ArrowStreamChartWriter}
+
+
+def _format_from_path(path, file_format):
+    if file_format is not None:
+        return file_format
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    return {'json': 'jsonl', 'ndjson': 'jsonl', 'ipc': 'arrow', 'feather': 'arrow'}.get(extension, extension)
+
+
+def open_chart_writer(path, file_format=None, **kwargs):
+    """Escritor em fluxo para `path`; o formato vem da extensão se não for informado."""
+    file_format = _format_from_path(path, file_format)
+    if file_format not in WRITERS:
+        raise ValueError(f"Formato de exportação desconhecido: {file_format}. Use um de {sorted(WRITERS)}.")
+    return WRITERS[file_format](path, **kwargs)
+
+
+def export_charts(path, charts, labels=None, file_format=None, **kwargs):
+    """Exporta uma sequência de mapas de uma vez. Retorna a quantidade gravada."""
+    with open_chart_writer(path, file_format, **kwargs) as writer:
+        return writer.write_many(charts, labels)
+
+
+# =============================================================================
+# LEITURA
+# =============================================================================
+
+
+def iter_records(path, file_format=None):
+    """Lê os registros de um arquivo exportado, um de cada vez."""
+    file_format = _format_from_path(path, file_format)
+    if file_format == 'jsonl':
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif file_format == 'csv':
+        yield from _iter_csv_records(path)
+    elif file_format in ('arrow', 'arrows'):
+        _require_pyarrow()
+        with pa.OSFile(path, 'rb') as source:
+            reader = _open_arrow_reader(source)
+            if isinstance(reader, pa.ipc.RecordBatchFileReader):
+                batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+            else:
+                batches = reader
+            for batch in batches:
+                yield from batch.to_pylist()
+    else:
+        raise ValueError(f"Formato de exportação desconhecido: {file_format}. Use um de {sorted(WRITERS)}.")
+
+
+def _open_arrow_reader(source):
+    """
+    Leitor Arrow IPC escolhido pelo cabeçalho e não pela extensão: o formato
+    de arquivo começa com ARROW_FILE_MAGIC; o resto é lido como fluxo
+    (inclusive .arrow gravados em fluxo por versões anteriores).
+    """
+    magic = source.read(len(ARROW_FILE_MAGIC))
+    source.seek(0)
+    if magic == ARROW_FILE_MAGIC:
+        return pa.ipc.open_file(source)
+    return pa.ipc.open_stream(source)
+
+
+def _iter_csv_records(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        index = {column: i for i, column in enumerate(header)}
+        point_names = [name for name in POINT_ORDER if f"{_column_prefix(name)}_lon" in index]
+
+        for row in reader:
+            record = {field: row[index[field]] for field in CHART_FIELDS}
+            record['schema_version'] = int(record['schema_version'])
+            record['label'] = record['label'] or None
+            for field in FLOAT_FIELDS:
+                record[field] = float(record[field])
+
+            record['points'] = []
+            for name in point_names:
+                prefix = _column_prefix(name)
+                lon = row[index[f"{prefix}_lon"]]
+                if lon != '':
+                    record['points'].append({'name': name, 'lon': float(lon),
+                                             'speed': float(row[index[f"{prefix}_speed"]]),
+                                             'retrograde': row[index[f"{prefix}_retrograde"]] == '1'})
+            record['cusps'] = [float(row[index[f"cusp_{i}"]]) for i in range(1, 13)]
+
+            record['aspects'] = []
+            for item in filter(None, row[index['aspects']].split(';')):
+                point1, point2, aspect, angle, orb = item.split('|')
+                record['aspects'].append({'point1': point1, 'point2': point2, 'aspect': aspect,
+                                          'angle': float(angle), 'orb': float(orb)})
+            yield record
+
+
+def iter_charts(path, file_format=None, astrological_data=None):
+    """Lê um arquivo exportado devolvendo dicionários de mapa completos, um de cada vez."""
+    astrological_data = astrological_data or AstrologicalData()
+    for record in iter_records(path, file_format):
+        yield record_to_chart(record, astrological_data)
+
+
+def load_charts(path, file_format=None, astrological_data=None):
+    """Carrega todos os mapas de um arquivo exportado numa lista."""
+    return list(iter_charts(path, file_format, astrological_data))
+
+
+def load_point_matrix(path, points=POINT_ORDER):
+    """
+    Leitura rápida e colunar de um arquivo Arrow (.arrow ou .arrows), sem
+    montar dicionários: retorna (jds (N,), longitudes (N, P) na ordem de
+    `points`, NaN se ausente).
+    """
+    _require_pyarrow()
+    with pa.OSFile(path, 'rb') as source:
+        table = _open_arrow_reader(source).read_all()
+    jds = table.column('jd').to_numpy()
+    point_lists = table.column('points').combine_chunks()
+    offsets = point_lists.offsets.to_numpy()
+    values = point_lists.flatten()
+    names = np.asarray(values.field('name').to_numpy(zero_copy_only=False))
+    lons = values.field('lon').to_numpy()
+
+    rows = np.repeat(np.arange(len(jds)), np.diff(offsets))
+    column_of = {name: i for i, name in enumerate(points)}
+    unique_names, inverse = np.unique(names, return_inverse=True)
+    columns = np.array([column_of.get(name, -1) for name in unique_names], dtype=int)[inverse]
+    known = columns >= 0
+
+    matrix = np.full((len(jds), len(points)), np.nan)
+    matrix[rows[known], columns[known]] = lons[known]
+    return jds, matrix
@@ -0,0 +1,222 @@
+import math
+
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.offsetbox import OffsetImage, AnnotationBbox
+from matplotlib.transforms import Affine2D
+import numpy as np
+
+from .constants import (
+    ALL_POINT_IMAGES, SIGN_UNICODE_SYMBOLS, PLANET_UNICODE_SYMBOLS,
+    SIGNS, ELEMENT_COLORS, SIGN_ELEMENTS, CHART_TYPE_TITLES,
+    IMAGE_CENTER_R, DEGREE_TEXT_R, RETROGRADE_TEXT_R,
+    HOUSE_NUMBER_R, SIGN_LINE_R_INNER, SIGN_LINE_R_OUTER, ASPECT_RADIAL_POS,
+    GRID_MAX_CHARTS, GRID_CELL_INCHES, GRID_WHEEL_FIT_R, GRID_TITLE_HEIGHT,
+    GRID_BACKGROUND_PX, GRID_GLYPH_ZOOM
+)
+from .chart_renderer import spread_point_positions
+
+_WHEEL_BACKGROUND_CACHE = {}
+
+
+def wheel_background(size_px=GRID_BACKGROUND_PX):
+    """
+    Imagem RGBA da parte estática da roda (círculos e divisões dos signos),
+    com Aries a 0° no sentido anti-horário. Renderizada uma única vez por
+    resolução e compartilhada por todas as células; cada célula apenas a
+    gira para o seu Ascendente.
+    """
+    if size_px not in _WHEEL_BACKGROUND_CACHE:
+        fig = Figure(figsize=(size_px / 100, size_px / 100), dpi=100)
+        canvas = FigureCanvasAgg(fig)
+        fig.patch.set_alpha(0)
+        ax = fig.add_axes([0, 0, 1, 1])
+        ax.set_xlim(-GRID_WHEEL_FIT_R, GRID_WHEEL_FIT_R)
+        ax.set_ylim(-GRID_WHEEL_FIT_R, GRID_WHEEL_FIT_R)
+        ax.set_axis_off()
+
+        for radius, color in ((1.0, 'black'), (0.55, 'gray'), (0.65, 'gray'), (SIGN_LINE_R_OUTER, 'gray')):
+            ax.add_patch(plt.Circle((0, 0), radius, fill=False, color=color, linewidth=1.2))
+        angles = np.radians(np.arange(0, 360, 30))
+        segments = [[(SIGN_LINE_R_INNER * np.cos(a), SIGN_LINE_R_INNER * np.sin(a)),
+                     (SIGN_LINE_R_OUTER * np.cos(a), SIGN_LINE_R_OUTER * np.sin(a))] for a in angles]
+        ax.add_collection(LineCollection(segments, colors='black', linewidths=1.0))
+
+        canvas.draw()
+        _WHEEL_BACKGROUND_CACHE[size_px] = np.asarray(canvas.buffer_rgba()).copy()
+    return _WHEEL_BACKGROUND_CACHE[size_px]
+
+
+class ChartGridRenderer:
+    """
+    Painel com vários mapas (até GRID_MAX_CHARTS) numa única figura.
+    A imagem estática da roda e as imagens dos símbolos dos planetas são as
+    mesmas para todas as células; cada célula guarda só os seus artistas
+    dinâmicos (cúspides, pontos, aspectos, título). `update_cell` troca o
+    mapa de uma célula e, se a figura já foi desenhada, repinta apenas essa
+    célula (blitting), sem redesenhar as outras.
+    """
+
+    def __init__(self):
+        self.fig = None
+        self.axes = []
+        self.charts = []
+        self._cell_artists = []
+        self._backgrounds = []
+        self._drawn = False # Já houve um desenho completo (pré-requisito do blitting)
+
+    def create_grid_plot(self, charts, capacity=None, columns=None):
+        """
+        Cria a figura com uma célula por mapa. `capacity` reserva células vazias
+        para mapas adicionados depois com `update_cell` sem recriar a figura.
+        Retorna a figura Matplotlib.
+        """
+        capacity = min(max(capacity or len(charts), len(charts), 1), GRID_MAX_CHARTS)
+        columns = columns or math.ceil(math.sqrt(capacity))
+        rows = math.ceil(capacity / columns)
+
+        # Figure direto, fora do pyplot (como no FigurePool): a figura anterior
+        # é liberada quando deixa de ser referenciada, sem registro global a fechar
+        self.fig = Figure(figsize=(columns * GRID_CELL_INCHES, rows * GRID_CELL_INCHES))
+        self._drawn = False
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+        grid = self.fig.add_gridspec(rows, columns, left=0, right=1, bottom=0, top=1, wspace=0, hspace=0)
+
+        background = wheel_background()
+        self.axes, self.charts, self._cell_artists, self._backgrounds = [], [], [], []
+        for index in range(rows * columns):
+            ax = self.fig.add_subplot(grid[index // columns, index % columns])
+            ax.set_xlim(-GRID_WHEEL_FIT_R, GRID_WHEEL_FIT_R)
+            ax.set_ylim(-GRID_WHEEL_FIT_R, GRID_WHEEL_FIT_R + GRID_TITLE_HEIGHT)
+            ax.set_aspect('equal', adjustable='box')
+            ax.set_xticks([])
+            ax.set_yticks([])
+            for spine in ax.spines.values():
+                spine.set_color('lightgray')
+
+            # Fundo compartilhado: mesmo array de pixels em todas as células, só a rotação muda
+            image = ax.imshow(background, extent=(-GRID_WHEEL_FIT_R, GRID_WHEEL_FIT_R, -GRID_WHEEL_FIT_R, GRID_WHEEL_FIT_R),
+                              interpolation='antialiased', zorder=0, visible=False)
+            self._backgrounds.append(image)
+            self.axes.append(ax)
+            self.charts.append(None)
+            self._cell_artists.append([])
+
+        for index, chart_data in enumerate(charts):
+            self._draw_cell(index, chart_data)
+        return self.fig
+
+    def update_cell(self, index, chart_data):
+        """Troca (ou limpa, com None) o mapa de uma célula, repintando só ela."""
+        self._draw_cell(index, chart_data)
+        ax = self.axes[index]
+        canvas = self.fig.canvas
+        if self._drawn and canvas.supports_blit:
+            self.fig.draw_artist(ax)
+            canvas.blit(ax.bbox)
+        else:
+            canvas.draw_idle()
+
+    def cell_at(self, event):
+        """Índice da célula sob um evento de mouse do Matplotlib (ou None)."""
+        return self.axes.index(event.inaxes) if event.inaxes in self.axes else None
+
+    def _on_draw(self, event):
+        self._drawn = True
+
+    # --- Desenho de uma célula ---
+
+    def _draw_cell(self, index, chart_data):
+        ax = self.axes[index]
+        for artist in self._cell_artists[index]:
+            artist.remove()
+        self._cell_artists[index] = []
+        self.charts[index] = chart_data
+
+        background = self._backgrounds[index]
+        if chart_data is None:
+            background.set_visible(False)
+            return
+        rotation = 180 - chart_data['asc'] # Ascendente à esquerda, como no ChartRenderer
+        background.set_transform(Affine2D().rotate_deg(rotation) + ax.transData)
+        background.set_visible(True)
+
+        artists = self._cell_artists[index]
+        artists.extend(self._draw_signs(ax, rotation))
+        artists.extend(self._draw_houses(ax, chart_data['houses'], rotation))
+        artists.extend(self._draw_points(ax, chart_data['point_positions'], rotation))
+        artists.extend(self._draw_aspects(ax, chart_data, rotation))
+
+        chart_title_type = CHART_TYPE_TITLES.get(chart_data['chart_type'], "Mapa Astral")
+        artists.append(ax.text(
+            0, GRID_WHEEL_FIT_R + GRID_TITLE_HEIGHT / 2,
+            f"{chart_title_type} — {chart_data['birth_date'].strftime('%Y-%m-%d %H:%M')}\n"
+            f"{chart_data['latitude']:.2f}, {chart_data['longitude']:.2f} ({chart_data['house_system']})",
+            ha='center', va='center', fontsize=8
+        ))
+
+    def _xy(self, lon, radius, rotation):
+        angle = np.radians(np.asarray(lon) + rotation)
+        return radius * np.cos(angle), radius * np.sin(angle)
+
+    def _draw_signs(self, ax, rotation):
+        """Símbolos dos signos (texto na vertical; só as linhas ficam na imagem de fundo)."""
+        artists = []
+        for i, sign_name in enumerate(SIGNS):
+            x, y = self._xy(i * 30 + 15, (SIGN_LINE_R_INNER + SIGN_LINE_R_OUTER) / 2 + 0.02, rotation)
+            color = ELEMENT_COLORS.get(SIGN_ELEMENTS.get(sign_name), 'black')
+            artists.append(ax.text(x, y, SIGN_UNICODE_SYMBOLS.get(sign_name, '?'), fontsize=7,
+                                   ha='center', va='center', color=color, weight='bold'))
+        return artists
+
+    def _draw_houses(self, ax, houses, rotation):
+        """Cúspides numa única LineCollection e números das casas."""
+        cusps = np.asarray(houses[:12], dtype=float)
+        x0, y0 = self._xy(cusps, 0.55, rotation)
+        x1, y1 = self._xy(cusps, 1.0, rotation)
+        artists = [ax.add_collection(LineCollection(np.stack([np.c_[x0, y0], np.c_[x1, y1]], axis=1),
+                                                    colors='gray', linewidths=1.0))]
+        spans = (np.roll(cusps, -1) - cusps) % 360
+        x, y = self._xy(cusps + spans / 2, HOUSE_NUMBER_R, rotation)
+        for i in range(12):
+            artists.append(ax.text(x[i], y[i], str(i + 1), fontsize=7, ha='center', va='center', weight='bold'))
+        return artists
+
+    def _draw_points(self, ax, point_positions, rotation):
+        """Símbolos dos pontos (imagens compartilhadas) com grau e 'R' de retrógrado."""
+        artists = []
+        for p_info in spread_point_positions(point_positions):
+            name = p_info['name']
+            x, y = self._xy(p_info['adjusted_lon'], IMAGE_CENTER_R, rotation)
+            if ALL_POINT_IMAGES.get(name) is not None:
+                artists.append(ax.add_artist(AnnotationBbox(
+                    OffsetImage(ALL_POINT_IMAGES[name], zoom=GRID_GLYPH_ZOOM), (x, y),
+                    frameon=False, pad=0.0, xycoords='data'
+                )))
+            else:
+                artists.append(ax.text(x, y, PLANET_UNICODE_SYMBOLS.get(name, '?'), fontsize=9,
+                                       ha='center', va='center', weight='bold'))
+
+            x, y = self._xy(p_info['adjusted_lon'], DEGREE_TEXT_R, rotation)
+            artists.append(ax.text(x, y, f"{int(p_info['original_lon'] % 30)}°", fontsize=6,
+                                   ha='center', va='center'))
+            if p_info['retrograde']:
+                x, y = self._xy(p_info['adjusted_lon'], RETROGRADE_TEXT_R, rotation)
+                artists.append(ax.text(x, y, "R", fontsize=5, ha='center', va='center', color='red', weight='bold'))
+        return artists
+
+    def _draw_aspects(self, ax, chart_data, rotation):
+        """Todas as linhas de aspecto da célula numa única LineCollection."""
+        point_lon_map = {p['name']: p['lon'] for p in chart_data['point_positions']}
+        segments, colors = [], []
+        for aspect_info in chart_data['aspects_data']:
+            lon1 = point_lon_map.get(aspect_info['point1'])
+            lon2 = point_lon_map.get(aspect_info['point2'])
+            if lon1 is not None and lon2 is not None:
+                segments.append([self._xy(lon1, ASPECT_RADIAL_POS, rotation), self._xy(lon2, ASPECT_RADIAL_POS, rotation)])
+                colors.append(aspect_info['color'])
+        if not segments:
+            return []
+        return [ax.add_collection(LineCollection(segments, colors=colors, linewidths=0.8))]
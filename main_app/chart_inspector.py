@@ -0,0 +1,292 @@
+import math
+
+import numpy as np
+
+from .constants import (
+    SIGNS, PLANET_UNICODE_SYMBOLS, ASPECT_RADIAL_POS,
+    ANGULAR_OVERLAP_THRESHOLD_DEGREES, INSPECTOR_ANGLE_BIN_DEGREES, INSPECTOR_RADIAL_BIN,
+    INSPECTOR_CENTER_R, INSPECTOR_LINE_TOLERANCE, INSPECTOR_POINT_R_RANGE
+)
+from .angular_math import house_positions, signed_difference
+from .dignities import point_dignities, describe_dignity
+
+
+def format_longitude(lon):
+    """Longitude no formato 15°23'12" Taurus."""
+    total_seconds = int(round((lon % 30) * 3600))
+    degrees, remainder = divmod(total_seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{degrees}°{minutes:02d}'{seconds:02d}\" {SIGNS[int(lon // 30) % 12]}"
+
+
+class ChartHitIndex:
+    """
+    Índice espacial dos elementos desenhados do mapa, construído no momento
+    da renderização. O disco do mapa é dividido em células polares (faixas
+    de INSPECTOR_ANGLE_BIN_DEGREES × INSPECTOR_RADIAL_BIN; perto do centro,
+    só faixas radiais) e cada célula guarda os símbolos de pontos e as
+    linhas de aspecto que passam por ela. Uma consulta olha uma única célula
+    e testa exatamente só os poucos candidatos dela, em tempo constante
+    qualquer que seja o número de pontos e linhas.
+    Coordenadas em unidades do mapa: (longitude eclíptica, raio).
+    `drawn_points` são as posições já afastadas por `spread_point_positions`
+    usadas no desenho, para que a área de acerto coincida com o símbolo.
+    """
+
+    def __init__(self, chart_data, drawn_points):
+        self.chart_data = chart_data
+        self.points = drawn_points
+        self._angle_bins = int(round(360 / INSPECTOR_ANGLE_BIN_DEGREES))
+        self._cells = {}
+
+        point_lon_map = {p['name']: p['lon'] for p in chart_data['point_positions']}
+        self.segments = []
+        for aspect in chart_data['aspects_data']:
+            lon1, lon2 = point_lon_map.get(aspect['point1']), point_lon_map.get(aspect['point2'])
+            if lon1 is not None and lon2 is not None:
+                self.segments.append((aspect, self._xy(lon1, ASPECT_RADIAL_POS), self._xy(lon2, ASPECT_RADIAL_POS)))
+
+        self._index_points()
+        self._index_segments()
+
+    # --- Construção ---
+
+    def _xy(self, lon, radius):
+        angle = math.radians(lon)
+        return radius * math.cos(angle), radius * math.sin(angle)
+
+    def _cell_ids(self, lons, radii):
+        """Identificador da célula de cada par (longitude, raio) (vetorizado)."""
+        radial = (np.asarray(radii) / INSPECTOR_RADIAL_BIN).astype(int)
+        angular = (np.asarray(lons) % 360 / INSPECTOR_ANGLE_BIN_DEGREES).astype(int) % self._angle_bins
+        angular = np.where(np.asarray(radii) < INSPECTOR_CENTER_R, 0, angular)
+        return radial * self._angle_bins + angular
+
+    def _add(self, cell_ids, entry):
+        for cell in np.unique(cell_ids):
+            self._cells.setdefault(int(cell), []).append(entry)
+
+    def _index_points(self):
+        """Cada ponto ocupa a faixa angular do seu símbolo deslocado, na faixa radial de símbolo e textos."""
+        half_width = ANGULAR_OVERLAP_THRESHOLD_DEGREES / 2
+        r_min, r_max = INSPECTOR_POINT_R_RANGE
+        radii = np.arange(r_min, r_max + INSPECTOR_RADIAL_BIN, INSPECTOR_RADIAL_BIN / 2)
+        for i, p in enumerate(self.points):
+            lons = np.arange(p['adjusted_lon'] - half_width, p['adjusted_lon'] + half_width + 1e-9,
+                             INSPECTOR_ANGLE_BIN_DEGREES / 2)
+            grid_lons, grid_radii = np.meshgrid(lons, np.clip(radii, r_min, r_max))
+            self._add(self._cell_ids(grid_lons.ravel(), grid_radii.ravel()), ('point', i))
+
+    def _index_segments(self):
+        """Cada linha é amostrada ao longo do comprimento e dilatada pela tolerância de acerto."""
+        step = INSPECTOR_LINE_TOLERANCE / 2
+        offsets = np.linspace(-INSPECTOR_LINE_TOLERANCE, INSPECTOR_LINE_TOLERANCE, 7)
+        off_x, off_y = [o.ravel() for o in np.meshgrid(offsets, offsets)]
+        for i, (_, (x0, y0), (x1, y1)) in enumerate(self.segments):
+            n = max(int(math.hypot(x1 - x0, y1 - y0) / step), 1) + 1
+            t = np.linspace(0, 1, n)
+            xs = (x0 + (x1 - x0) * t)[:, None] + off_x[None, :]
+            ys = (y0 + (y1 - y0) * t)[:, None] + off_y[None, :]
+            lons = np.degrees(np.arctan2(ys, xs))
+            self._add(self._cell_ids(lons.ravel(), np.hypot(xs, ys).ravel()), ('aspect', i))
+
+    # --- Consulta ---
+
+    def hit(self, lon, radius):
+        """
+        Elemento sob o ponteiro em (longitude, raio): ('point', dados do ponto),
+        ('aspect', dados do aspecto) ou None. Pontos têm prioridade sobre linhas.
+        """
+        if radius < 0 or radius > INSPECTOR_POINT_R_RANGE[1] + INSPECTOR_RADIAL_BIN:
+            return None
+        candidates = self._cells.get(int(self._cell_ids(lon, radius)), ())
+
+        best_aspect, best_distance = None, INSPECTOR_LINE_TOLERANCE
+        px, py = self._xy(lon, radius)
+        for kind, i in candidates:
+            if kind == 'point':
+                p = self.points[i]
+                if (abs(signed_difference(lon, p['adjusted_lon'])) <= ANGULAR_OVERLAP_THRESHOLD_DEGREES / 2
+                        and INSPECTOR_POINT_R_RANGE[0] <= radius <= INSPECTOR_POINT_R_RANGE[1]):
+                    return 'point', self._point_data(p['name'])
+            else:
+                aspect, (x0, y0), (x1, y1) = self.segments[i]
+                distance = self._segment_distance(px, py, x0, y0, x1, y1)
+                if distance <= best_distance:
+                    best_aspect, best_distance = aspect, distance
+        return ('aspect', best_aspect) if best_aspect is not None else None
+
+    def _point_data(self, name):
+        return next(p for p in self.chart_data['point_positions'] if p['name'] == name)
+
+    @staticmethod
+    def _segment_distance(px, py, x0, y0, x1, y1):
+        dx, dy = x1 - x0, y1 - y0
+        length2 = dx * dx + dy * dy
+        t = 0.0 if length2 == 0 else min(max(((px - x0) * dx + (py - y0) * dy) / length2, 0.0), 1.0)
+        return math.hypot(px - (x0 + t * dx), py - (y0 + t * dy))
+
+
+def describe_hit(hit, chart_data):
+    """Texto da dica para um resultado de `ChartHitIndex.hit`."""
+    kind, data = hit
+    if kind == 'point':
+        name = data['name']
+        house = house_positions(np.array([data['lon']]), np.asarray(chart_data['houses'][:12], dtype=float))[0] + 1
+        lines = [f"{name} {PLANET_UNICODE_SYMBOLS.get(name, '')}",
+                 format_longitude(data['lon']),
+                 f"Casa {house}"]
+        if data.get('speed') is not None:
+            lines.append(f"Velocidade: {data['speed']:.4f}°/dia" + (" (R)" if data['retrograde'] else ""))
+        if data.get('dec') is not None:
+            out_of_bounds = " (fora dos limites)" if name in chart_data.get('out_of_bounds', []) else ""
+            lines.append(f"Declinação: {data['dec']:+.2f}°" + out_of_bounds)
+        dignity = point_dignities(name, data['lon'], chart_data.get('is_day_chart', True))
+        if dignity is not None:
+            lines.append(f"Dignidade: {describe_dignity(dignity)}")
+        return "\n".join(lines)
+
+    orb_degrees, orb_minutes = divmod(int(round(data.get('orb', 0.0) * 60)), 60)
+    return (f"{data['point1']} {PLANET_UNICODE_SYMBOLS.get(data['point1'], '')} {data['aspect']} "
+            f"{data['point2']} {PLANET_UNICODE_SYMBOLS.get(data['point2'], '')}\n"
+            f"Ângulo exato: {data['angle']}°\n"
+            f"Orbe: {orb_degrees}°{orb_minutes:02d}'")
+
+
+class MatplotlibChartInspector:
+    """
+    Dicas ao passar o mouse (e fixação com clique) sobre o mapa embutido do
+    ChartRenderer. A dica é um artista animado desenhado por blitting sobre
+    o fundo guardado após cada desenho completo, sem redesenhar a figura.
+    """
+
+    def __init__(self, figure_canvas, ax, hit_index):
+        self.figure_canvas = figure_canvas
+        self._connections = [
+            figure_canvas.mpl_connect('draw_event', self._on_draw),
+            figure_canvas.mpl_connect('motion_notify_event', self._on_motion),
+            figure_canvas.mpl_connect('button_press_event', self._on_click),
+        ]
+        self.attach(ax, hit_index)
+
+    def attach(self, ax, hit_index):
+        """
+        Passa a inspecionar um novo mapa. Com a figura reaproveitada do pool
+        do ChartRenderer, os eixos são limpos entre um mapa e outro (o que
+        remove a anotação), então a dica é recriada aqui sem refazer as conexões.
+        """
+        self.ax = ax
+        self.hit_index = hit_index
+        self.pinned = False
+        self._background = None
+        self._last_hit = None
+        self.annotation = ax.annotate(
+            "", xy=(0, 0), xytext=(15, 15), textcoords='offset points', fontsize=9,
+            bbox=dict(boxstyle='round', fc='lightyellow', ec='gray', alpha=0.95),
+            annotation_clip=False, animated=True
+        )
+        self.annotation.set_visible(False)
+
+    def disconnect(self):
+        for cid in self._connections:
+            self.figure_canvas.mpl_disconnect(cid)
+        self._connections = []
+
+    def _on_draw(self, event):
+        self._background = self.figure_canvas.copy_from_bbox(self.figure_canvas.figure.bbox)
+        self._blit()
+
+    def _on_motion(self, event):
+        if self.pinned:
+            return
+        hit = None
+        if event.inaxes is self.ax and event.xdata is not None:
+            hit = self.hit_index.hit(math.degrees(event.xdata) % 360, event.ydata)
+        if hit is None and self._last_hit is None:
+            return
+        self._last_hit = hit
+        if hit is not None:
+            self.annotation.xy = (event.xdata, event.ydata)
+            self.annotation.set_text(describe_hit(hit, self.hit_index.chart_data))
+        self.annotation.set_visible(hit is not None)
+        self._blit()
+
+    def _on_click(self, event):
+        """Clique sobre um elemento fixa a dica; outro clique a libera."""
+        if self.pinned:
+            self.pinned = False
+            self._on_motion(event)
+        elif self._last_hit is not None:
+            self.pinned = True
+
+    def _blit(self):
+        if self._background is None:
+            return
+        self.figure_canvas.restore_region(self._background)
+        if self.annotation.get_visible():
+            self.ax.draw_artist(self.annotation)
+        self.figure_canvas.blit(self.figure_canvas.figure.bbox)
+
+
+class TkChartInspector:
+    """
+    Dicas ao passar o mouse (e fixação com clique) sobre o mapa do
+    TkChartRenderer. A dica é um par de itens do canvas (fundo e texto)
+    criado uma vez e apenas movido/reconfigurado: o Tk só repinta a
+    região alterada, o equivalente ao blitting no Matplotlib.
+    """
+
+    def __init__(self, renderer):
+        self.renderer = renderer
+        self.canvas = renderer.canvas
+        self.pinned = False
+        self._last_hit = None
+        self._box = self.canvas.create_rectangle(0, 0, 0, 0, fill='lightyellow', outline='gray',
+                                                 state='hidden', tags=('tooltip',))
+        self._text = self.canvas.create_text(0, 0, anchor='nw', font=("Arial", 9), state='hidden',
+                                             tags=('tooltip',))
+        self.canvas.bind("<Motion>", self._on_motion, add="+")
+        self.canvas.bind("<Button-1>", self._on_click, add="+")
+        self.canvas.bind("<Leave>", self._on_leave, add="+")
+
+    def _on_motion(self, event):
+        if self.pinned or self.renderer.hit_index is None:
+            return
+        lon, radius = self.renderer.from_canvas(event.x, event.y)
+        hit = self.renderer.hit_index.hit(lon, radius)
+        if hit is None and self._last_hit is None:
+            return
+        self._last_hit = hit
+        if hit is None:
+            self._hide()
+            return
+
+        self.canvas.itemconfigure(self._text, text=describe_hit(hit, self.renderer.chart_data), state='normal')
+        self.canvas.coords(self._text, event.x + 15, event.y + 15)
+        x0, y0, x1, y1 = self.canvas.bbox(self._text)
+        self.canvas.coords(self._box, x0 - 4, y0 - 3, x1 + 4, y1 + 3)
+        self.canvas.itemconfigure(self._box, state='normal')
+        self.canvas.tag_raise('tooltip')
+
+    def _on_click(self, event):
+        """Clique sobre um elemento fixa a dica; outro clique a libera."""
+        if self.pinned:
+            self.pinned = False
+            self._on_motion(event)
+        elif self._last_hit is not None:
+            self.pinned = True
+
+    def _on_leave(self, event):
+        if not self.pinned:
+            self._last_hit = None
+            self._hide()
+
+    def _hide(self):
+        self.canvas.itemconfigure(self._box, state='hidden')
+        self.canvas.itemconfigure(self._text, state='hidden')
+
+    def reset(self):
+        """Libera a dica (novo mapa desenhado)."""
+        self.pinned = False
+        self._last_hit = None
+        self._hide()
@@ -1,61 +1,233 @@
+import threading
+
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 import numpy as np
 
 from .constants import (
     ALL_POINT_IMAGES, SIGN_UNICODE_SYMBOLS, PLANET_UNICODE_SYMBOLS,
-    SIGNS, ELEMENT_COLORS, SIGN_ELEMENTS,
+    SIGNS, ELEMENT_COLORS, SIGN_ELEMENTS, CHART_TYPE_TITLES,
     IMAGE_CENTER_R, DEGREE_TEXT_R, MINUTES_TEXT_R, RETROGRADE_TEXT_R,
     POINT_TICK_R_OUTER, POINT_TICK_R_INNER, POINT_TICK_LINEWIDTH, POINT_TICK_LINESTYLE,
     POINT_TICK_R_OUTER_INNER_CIRCLE, POINT_TICK_R_INNER_CIRCLE,
     ANGULAR_OVERLAP_THRESHOLD_DEGREES, ANGULAR_OFFSET_STEP_DEGREES,
     DEGREE_TEXT_FONTSIZE, MINUTES_TEXT_FONTSIZE, RETROGRADE_TEXT_FONTSIZE,
-    HOUSE_NUMBER_R, SIGN_LINE_R_INNER, SIGN_LINE_R_OUTER, ASPECT_RADIAL_POS
+    HOUSE_NUMBER_R, SIGN_LINE_R_INNER, SIGN_LINE_R_OUTER, ASPECT_RADIAL_POS,
+    BIWHEEL_RING_R_INNER, BIWHEEL_RING_R_OUTER, BIWHEEL_IMAGE_CENTER_R,
+    BIWHEEL_DEGREE_TEXT_R, BIWHEEL_MINUTES_TEXT_R, BIWHEEL_RETROGRADE_TEXT_R,
+    CHART_FIGSIZE, FIGURE_POOL_SIZE
 )
+from .chart_inspector import ChartHitIndex
+
+def spread_point_positions(point_positions):
+    """
+    Afasta angularmente os símbolos de pontos próximos para que não se
+    sobreponham no desenho. Retorna, em ordem de longitude, dicionários com
+    'name', 'original_lon', 'adjusted_lon' e 'retrograde'.
+    Compartilhado pelos renderizadores Matplotlib e Tk.
+    """
+    # Prepare points for angular adjustment to avoid overlap
+    processed_points_drawing_info = []
+    sorted_points = sorted(point_positions, key=lambda p: p['lon'])
+    
+    occupied_angular_slots = []
+
+    for p_data in sorted_points:
+        original_lon = p_data['lon']
+        current_lon_adjusted = original_lon
+
+        found_slot = False
+        max_iterations = 30 # Limit iterations to prevent infinite loops
+        iteration = 0
+
+        while not found_slot and iteration < max_iterations:
+            potential_lon_min = (current_lon_adjusted - (ANGULAR_OVERLAP_THRESHOLD_DEGREES / 2)) % 360
+            potential_lon_max = (current_lon_adjusted + (ANGULAR_OVERLAP_THRESHOLD_DEGREES / 2)) % 360
+
+            is_overlapping = False
+            for occupied_lon_min, occupied_lon_max, _ in occupied_angular_slots:
+                # Logic to handle 0/360 degree wrap-around for overlap check
+                if potential_lon_min > potential_lon_max: # e.g., 350-10 degrees
+                    if not ((potential_lon_max < occupied_lon_min and potential_lon_min > occupied_lon_max) or \
+                            (occupied_lon_max < potential_lon_min and occupied_lon_min > potential_lon_max)):
+                        is_overlapping = True
+                        break
+                elif occupied_lon_min > occupied_lon_max: # e.g., occupied is 350-10 degrees
+                    if not ((occupied_lon_max < potential_lon_min and potential_lon_min > potential_lon_max) or \
+                            (potential_lon_max < occupied_lon_min and potential_lon_min > occupied_lon_max)):
+                        is_overlapping = True
+                        break
+                else: # No wrap-around for both
+                    if (potential_lon_min < occupied_lon_max and potential_lon_max > occupied_lon_min):
+                        is_overlapping = True
+                        break
+
+            if is_overlapping:
+                current_lon_adjusted = (current_lon_adjusted + ANGULAR_OFFSET_STEP_DEGREES) % 360
+            else:
+                found_slot = True
+                occupied_angular_slots.append((potential_lon_min, potential_lon_max, current_lon_adjusted))
+
+            iteration += 1
+
+        if not found_slot:
+            print(f"Warning: Could not find a free slot for {p_data['name']}. Using last calculated position.")
+
+        processed_points_drawing_info.append({
+            'name': p_data['name'],
+            'original_lon': original_lon,
+            'adjusted_lon': current_lon_adjusted,
+            'retrograde': p_data['retrograde']
+        })
+
+    return processed_points_drawing_info
+
+
+class FigurePool:
+    """
+    Pool de figuras polares reaproveitáveis. Em vez de fechar a figura e
+    criar outra a cada mapa (plt.close + plt.subplots), a figura e os eixos
+    são criados uma vez e, entre um mapa e outro, os eixos são apenas limpos.
+    As figuras são criadas direto com `Figure`, fora do pyplot, então não
+    ficam registradas no gerenciador global de figuras. Seguro entre threads
+    (workers de renderização podem compartilhar o mesmo pool).
+    """
+
+    def __init__(self, max_idle=FIGURE_POOL_SIZE, figsize=CHART_FIGSIZE):
+        self.max_idle = max_idle
+        self.figsize = figsize
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Retorna (fig, ax) de uma figura ociosa, ou de uma nova se não houver."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        fig = Figure(figsize=self.figsize)
+        ax = fig.add_subplot(projection='polar')
+        return fig, ax
+
+    def release(self, fig, ax):
+        """Devolve a figura ao pool (descartada se o pool já estiver cheio)."""
+        ax.clear()
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append((fig, ax))
+
+    def idle_count(self):
+        """Quantidade de figuras ociosas guardadas (nunca mais que `max_idle`)."""
+        with self._lock:
+            return len(self._idle)
+
+
+FIGURE_POOL = FigurePool()
+
 
 class ChartRenderer:
-    def __init__(self):
+    def __init__(self, pool=None):
+        self.pool = pool or FIGURE_POOL
         self.fig = None
         self.ax = None
+        self.hit_index = None # Índice de acerto do último mapa simples (inspeção interativa)
+        self._needs_layout = False
+
+    def release(self):
+        """Devolve a figura atual ao pool; o próximo mapa usa outra (ou a mesma) figura ociosa."""
+        if self.fig is not None:
+            self.pool.release(self.fig, self.ax)
+            self.fig = None
+            self.ax = None
+            self.hit_index = None
 
     def create_chart_plot(self, chart_data):
         """
         Cria a figura e eixos do Matplotlib para o mapa astral.
         Retorna a figura Matplotlib.
         """
-        if self.fig is not None:
-            plt.close(self.fig) # Fecha a figura anterior se existir
-            self.fig = None
-        
-        self.fig, self.ax = plt.subplots(figsize=(10, 10), subplot_kw={'projection': 'polar'})
-        
-        # Define a direção theta e offset para o Ascendente
-        self.ax.set_theta_direction(1) # Sentido horário
-        # Rotaciona o gráfico para que o Ascendente (casa 1) fique no lado esquerdo (posição 9h)
-        theta_offset_degrees = (180 - chart_data['asc'] + 360) % 360
-        self.ax.set_theta_offset(np.radians(theta_offset_degrees))
-
-        self.ax.set_yticklabels([])
-        self.ax.set_xticklabels([])
-        self.ax.grid(False)
+        self._setup_polar_axes(chart_data['asc'])
 
         self._draw_house_cusps(chart_data['houses'])
         self._draw_circles()
         self._draw_house_numbers(chart_data['houses'])
         self._draw_sign_divisions()
-        self._draw_points(chart_data['point_positions'])
+        drawn_points = self._draw_points(chart_data['point_positions'])
         self._draw_aspect_lines(chart_data['aspects_data'], chart_data['point_positions'])
+        self.hit_index = ChartHitIndex(chart_data, drawn_points)
 
-        chart_title_type = "Mapa Natal" if chart_data['chart_type'] == 'natal' else "Mapa Horário"
+        chart_title_type = CHART_TYPE_TITLES.get(chart_data['chart_type'], "Mapa Astral")
         self.ax.set_title(
             f"{chart_title_type} ({chart_data['house_system']} Casas) para {chart_data['birth_date'].strftime('%Y-%m-%d %H:%M')}\n"
             f"{chart_data['latitude']:.2f}, {chart_data['longitude']:.2f} ({chart_data['timezone_id']})",
             y=1.08, fontsize=14
         )
-        plt.tight_layout()
+        self._apply_layout()
         
         return self.fig
 
+    def create_biwheel_plot(self, inner_chart, outer_chart, cross_aspects_data):
+        """
+        Cria um bi-wheel de sinastria: o mapa interno com suas casas e um
+        segundo anel de pontos, do mapa externo, fora do anel zodiacal.
+        As linhas de aspecto são os aspectos cruzados entre os dois mapas.
+        Retorna a figura Matplotlib.
+        """
+        self._setup_polar_axes(inner_chart['asc'])
+        self.ax.set_ylim(0, BIWHEEL_RING_R_OUTER)
+        self.hit_index = None
+
+        self._draw_house_cusps(inner_chart['houses'])
+        self._draw_circles()
+        self._draw_biwheel_ring()
+        self._draw_house_numbers(inner_chart['houses'])
+        self._draw_sign_divisions()
+        self._draw_points(inner_chart['point_positions'])
+        self._draw_points(outer_chart['point_positions'], image_r=BIWHEEL_IMAGE_CENTER_R,
+                          degree_r=BIWHEEL_DEGREE_TEXT_R, minutes_r=BIWHEEL_MINUTES_TEXT_R,
+                          retrograde_r=BIWHEEL_RETROGRADE_TEXT_R,
+                          tick_r=(BIWHEEL_RING_R_INNER, BIWHEEL_RING_R_INNER + 0.02))
+        self._draw_cross_aspect_lines(cross_aspects_data, inner_chart['point_positions'],
+                                      outer_chart['point_positions'])
+
+        self.ax.set_title(
+            f"Sinastria: {inner_chart['birth_date'].strftime('%Y-%m-%d %H:%M')} (interno) × "
+            f"{outer_chart['birth_date'].strftime('%Y-%m-%d %H:%M')} (externo)\n"
+            f"{inner_chart['house_system']} Casas do mapa interno",
+            y=1.08, fontsize=14
+        )
+        self._apply_layout()
+
+        return self.fig
+
+    def _setup_polar_axes(self, asc):
+        """Prepara os eixos polares (reaproveitados do pool) com o Ascendente à esquerda."""
+        if self.fig is None:
+            self.fig, self.ax = self.pool.acquire()
+            self._needs_layout = True
+        else:
+            self.ax.clear() # Remove os artistas do mapa anterior e restaura os limites automáticos
+
+        # Define a direção theta e offset para o Ascendente
+        self.ax.set_theta_direction(1) # Sentido horário
+        # Rotaciona o gráfico para que o Ascendente (casa 1) fique no lado esquerdo (posição 9h)
+        theta_offset_degrees = (180 - asc + 360) % 360
+        self.ax.set_theta_offset(np.radians(theta_offset_degrees))
+
+        self.ax.set_yticklabels([])
+        self.ax.set_xticklabels([])
+        self.ax.grid(False)
+
+    def _apply_layout(self):
+        """
+        O layout (tight_layout) só é calculado na primeira vez que a figura é
+        usada por este renderizador: o título tem sempre o mesmo tamanho de
+        fonte e de linhas, então as margens não mudam entre um mapa e outro.
+        """
+        if self._needs_layout:
+            self.fig.tight_layout()
+            self._needs_layout = False
+
     def _draw_house_cusps(self, houses):
         """Desenha as linhas das cúspides das casas."""
         for cusp_lon in houses:
@@ -73,6 +245,12 @@ class ChartRenderer:
         circle_inner_outer = plt.Circle((0, 0), 0.65, transform=self.ax.transData._b, fill=False, color='gray', linewidth=1.5)
         self.ax.add_artist(circle_inner_outer)
 
+    def _draw_biwheel_ring(self):
+        """Desenha o anel externo que recebe os pontos do segundo mapa."""
+        for radius in (BIWHEEL_RING_R_INNER, BIWHEEL_RING_R_OUTER):
+            circle = plt.Circle((0, 0), radius, transform=self.ax.transData._b, fill=False, color='gray', linewidth=1.0)
+            self.ax.add_artist(circle)
+
     def _draw_house_numbers(self, houses):
         """Desenha os números das casas no mapa."""
         for i in range(12):
@@ -107,62 +285,15 @@ class ChartRenderer:
 
             self.ax.text(angle_center, 1.040, sign_sym, fontsize=18, ha='center', va='center', weight='bold', color=color)
 
-    def _draw_points(self, point_positions):
-        """Desenha os símbolos dos planetas/pontos com graus, minutos e status retrógrado."""
-        
-        # Prepare points for angular adjustment to avoid overlap
-        processed_points_drawing_info = []
-        sorted_points = sorted(point_positions, key=lambda p: p['lon'])
+    def _draw_points(self, point_positions, image_r=IMAGE_CENTER_R, degree_r=DEGREE_TEXT_R,
+                     minutes_r=MINUTES_TEXT_R, retrograde_r=RETROGRADE_TEXT_R,
+                     tick_r=(POINT_TICK_R_INNER, POINT_TICK_R_OUTER)):
+        """
+        Desenha os símbolos dos planetas/pontos com graus, minutos e status retrógrado.
+        Os raios permitem reutilizar o desenho no anel externo do bi-wheel.
+        """
         
-        occupied_angular_slots = []
-
-        for p_data in sorted_points:
-            original_lon = p_data['lon']
-            current_lon_adjusted = original_lon
-
-            found_slot = False
-            max_iterations = 30 # Limit iterations to prevent infinite loops
-            iteration = 0
-
-            while not found_slot and iteration < max_iterations:
-                potential_lon_min = (current_lon_adjusted - (ANGULAR_OVERLAP_THRESHOLD_DEGREES / 2)) % 360
-                potential_lon_max = (current_lon_adjusted + (ANGULAR_OVERLAP_THRESHOLD_DEGREES / 2)) % 360
-
-                is_overlapping = False
-                for occupied_lon_min, occupied_lon_max, _ in occupied_angular_slots:
-                    # Logic to handle 0/360 degree wrap-around for overlap check
-                    if potential_lon_min > potential_lon_max: # e.g., 350-10 degrees
-                        if not ((potential_lon_max < occupied_lon_min and potential_lon_min > occupied_lon_max) or \
-                                (occupied_lon_max < potential_lon_min and occupied_lon_min > potential_lon_max)):
-                            is_overlapping = True
-                            break
-                    elif occupied_lon_min > occupied_lon_max: # e.g., occupied is 350-10 degrees
-                        if not ((occupied_lon_max < potential_lon_min and potential_lon_min > potential_lon_max) or \
-                                (potential_lon_max < occupied_lon_min and potential_lon_min > occupied_lon_max)):
-                            is_overlapping = True
-                            break
-                    else: # No wrap-around for both
-                        if (potential_lon_min < occupied_lon_max and potential_lon_max > occupied_lon_min):
-                            is_overlapping = True
-                            break
-
-                if is_overlapping:
-                    current_lon_adjusted = (current_lon_adjusted + ANGULAR_OFFSET_STEP_DEGREES) % 360
-                else:
-                    found_slot = True
-                    occupied_angular_slots.append((potential_lon_min, potential_lon_max, current_lon_adjusted))
-
-                iteration += 1
-
-            if not found_slot:
-                print(f"Warning: Could not find a free slot for {p_data['name']}. Using last calculated position.")
-
-            processed_points_drawing_info.append({
-                'name': p_data['name'],
-                'original_lon': original_lon,
-                'adjusted_lon': current_lon_adjusted,
-                'retrograde': p_data['retrograde']
-            })
+        processed_points_drawing_info = spread_point_positions(point_positions)
 
         # Now draw points using adjusted positions
         for p_info in processed_points_drawing_info:
@@ -175,7 +306,7 @@ class ChartRenderer:
             adjusted_angle = np.radians(adjusted_lon)
 
             # 1. Primeira marca de seleção: Perto do anel zodiacal externo
-            self.ax.plot([original_angle, original_angle], [POINT_TICK_R_INNER, POINT_TICK_R_OUTER],
+            self.ax.plot([original_angle, original_angle], list(tick_r),
                     color='black', linewidth=POINT_TICK_LINEWIDTH, linestyle=POINT_TICK_LINESTYLE)
 
             # 2. Segunda marca de seleção: Perto do círculo interno de aspecto
@@ -185,14 +316,14 @@ class ChartRenderer:
             # Use image if available, otherwise use text symbol
             if ALL_POINT_IMAGES.get(point_name) is not None:
                 imagebox = OffsetImage(ALL_POINT_IMAGES[point_name], zoom=0.5)
-                ab = AnnotationBbox(imagebox, (adjusted_angle, IMAGE_CENTER_R),
+                ab = AnnotationBbox(imagebox, (adjusted_angle, image_r),
                                     frameon=False, pad=0.0,
                                     xycoords='data', boxcoords="data")
                 self.ax.add_artist(ab)
             else:
                 # Fallback to text symbol if image not found
                 point_symbol = PLANET_UNICODE_SYMBOLS.get(point_name, '?')
-                self.ax.text(adjusted_angle, IMAGE_CENTER_R, point_symbol,
+                self.ax.text(adjusted_angle, image_r, point_symbol,
                              fontsize=16, ha='center', va='center', weight='bold')
 
             # Display degrees and minutes near the point symbol
@@ -203,17 +334,19 @@ class ChartRenderer:
             degree_text = f"{degrees}°"
             minutes_text = f"{minutes:02d}'"
 
-            self.ax.text(adjusted_angle, DEGREE_TEXT_R, degree_text,
+            self.ax.text(adjusted_angle, degree_r, degree_text,
                     fontsize=DEGREE_TEXT_FONTSIZE, ha='center', va='center')
 
-            self.ax.text(adjusted_angle, MINUTES_TEXT_R, minutes_text,
+            self.ax.text(adjusted_angle, minutes_r, minutes_text,
                     fontsize=MINUTES_TEXT_FONTSIZE, ha='center', va='center')
 
             # Add retrograde 'R' indicator if applicable
             if is_retrograde:
-                self.ax.text(adjusted_angle, RETROGRADE_TEXT_R, "R",
+                self.ax.text(adjusted_angle, retrograde_r, "R",
                         fontsize=RETROGRADE_TEXT_FONTSIZE, ha='center', va='center', color='red', weight='bold')
 
+        return processed_points_drawing_info
+
     def _draw_aspect_lines(self, aspects_data, all_point_positions):
         """Desenha as linhas dos aspectos no mapa."""
         # Create a dictionary for quick lookup of adjusted longitudes
@@ -232,4 +365,17 @@ class ChartRenderer:
                 angle2 = np.radians(lon2)
 
                 self.ax.plot([angle1, angle2], [ASPECT_RADIAL_POS, ASPECT_RADIAL_POS],
-                             color=color, linewidth=1.5, linestyle='-')
\ No newline at end of file
+                             color=color, linewidth=1.5, linestyle='-')
+
+    def _draw_cross_aspect_lines(self, cross_aspects_data, inner_positions, outer_positions):
+        """Desenha os aspectos cruzados: point1 vem do mapa interno e point2 do externo."""
+        inner_lon_map = {p['name']: p['lon'] for p in inner_positions}
+        outer_lon_map = {p['name']: p['lon'] for p in outer_positions}
+
+        for aspect_info in cross_aspects_data:
+            lon1 = inner_lon_map.get(aspect_info['point1'])
+            lon2 = outer_lon_map.get(aspect_info['point2'])
+
+            if lon1 is not None and lon2 is not None:
+                self.ax.plot([np.radians(lon1), np.radians(lon2)], [ASPECT_RADIAL_POS, ASPECT_RADIAL_POS],
+                             color=aspect_info['color'], linewidth=1.0, linestyle='--')
@@ -0,0 +1,210 @@
+import sqlite3
+
+import numpy as np
+
+from .constants import SIGNS, ASPECT_POINTS, CHART_STORE_BATCH_SIZE
+from .angular_math import house_positions
+from .astrological_data import AstrologicalData
+
+# Ordem canônica dos pontos (pares de aspecto e recarga de mapas)
+POINT_ORDER = ASPECT_POINTS + ['True Node', 'Fortune', 'True Node South']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS charts (
+    id INTEGER PRIMARY KEY,
+    label TEXT,
+    chart_type TEXT NOT NULL,
+    house_system TEXT NOT NULL,
+    jd REAL NOT NULL,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    timezone_id TEXT NOT NULL,
+    asc REAL NOT NULL,
+    mc REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS points (
+    chart_id INTEGER NOT NULL,
+    point TEXT NOT NULL,
+    lon REAL NOT NULL,
+    speed REAL NOT NULL,
+    retrograde INTEGER NOT NULL,
+    sign INTEGER NOT NULL,
+    house INTEGER NOT NULL,
+    PRIMARY KEY (chart_id, point)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS cusps (
+    chart_id INTEGER NOT NULL,
+    house INTEGER NOT NULL,
+    lon REAL NOT NULL,
+    sign INTEGER NOT NULL,
+    PRIMARY KEY (chart_id, house)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS aspects (
+    chart_id INTEGER NOT NULL,
+    point1 TEXT NOT NULL,
+    point2 TEXT NOT NULL,
+    aspect TEXT NOT NULL,
+    orb REAL NOT NULL,
+    PRIMARY KEY (chart_id, point1, point2)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_points_sign ON points (point, sign, chart_id);
+CREATE INDEX IF NOT EXISTS idx_points_house ON points (point, house, chart_id);
+CREATE INDEX IF NOT EXISTS idx_aspects_pair ON aspects (aspect, point1, point2, chart_id);
+"""
+
+
+class ChartStore:
+    """
+    Banco persistente de mapas calculados (SQLite) com tabelas normalizadas
+    de pontos, cúspides e aspectos. Signos são gravados como índice em SIGNS
+    (0 = Aries) e casas de 1 a 12.
+    """
+
+    def __init__(self, db_path, astrological_data=None):
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.astrological_data = astrological_data
+
+    def close(self):
+        self.connection.close()
+
+    # --- Inserção ---
+
+    def save_charts(self, charts, labels=None):
+        """
+        Grava vários mapas em massa (uma transação por bloco de CHART_STORE_BATCH_SIZE).
+        Aceita qualquer iterável, inclusive geradores. Retorna a lista de ids criados.
+        Os ids são atribuídos pelo próprio SQLite dentro da transação, então
+        conexões gravando ao mesmo tempo (permitido pelo WAL) não colidem.
+        """
+        labels = iter(labels) if labels is not None else None
+        chart_ids = []
+
+        batch = []
+        for chart in charts:
+            batch.append((next(labels) if labels is not None else None, chart))
+            if len(batch) >= CHART_STORE_BATCH_SIZE:
+                chart_ids.extend(self._insert_batch(batch))
+                batch = []
+        if batch:
+            chart_ids.extend(self._insert_batch(batch))
+        return chart_ids
+
+    def save_chart(self, chart_data, label=None):
+        """Grava um único mapa e retorna seu id."""
+        return self.save_charts([chart_data], [label])[0]
+
+    def _insert_batch(self, batch):
+        with self.connection:
+            chart_ids = [self.connection.execute(
+                "INSERT INTO charts (label, chart_type, house_system, jd, latitude, longitude, timezone_id, asc, mc) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (label, chart['chart_type'], chart['house_system'], chart['jd'], chart['latitude'],
+                 chart['longitude'], chart['timezone_id'], chart['asc'], chart['mc'])
+            ).lastrowid for label, chart in batch]
+
+            point_rows, cusp_rows, aspect_rows = [], [], []
+            for chart_id, (_, chart) in zip(chart_ids, batch):
+                cusps = np.asarray(chart['houses'][:12], dtype=float)
+                lons = np.array([p['lon'] for p in chart['point_positions']], dtype=float)
+                houses = house_positions(lons, cusps) + 1
+                for p, house in zip(chart['point_positions'], houses):
+                    point_rows.append((chart_id, p['name'], p['lon'], p['speed'], int(p['retrograde']),
+                                       int(p['lon'] // 30) % 12, int(house)))
+
+                cusp_rows.extend((chart_id, i + 1, float(lon), int(lon // 30) % 12) for i, lon in enumerate(cusps))
+
+                for aspect in chart['aspects_data']:
+                    point1, point2 = self._normalize_pair(aspect['point1'], aspect['point2'])
+                    aspect_rows.append((chart_id, point1, point2, aspect['aspect'], aspect.get('orb', 0.0)))
+
+            self.connection.executemany("INSERT INTO points VALUES (?, ?, ?, ?, ?, ?, ?)", point_rows)
+            self.connection.executemany("INSERT INTO cusps VALUES (?, ?, ?, ?)", cusp_rows)
+            self.connection.executemany("INSERT OR REPLACE INTO aspects VALUES (?, ?, ?, ?, ?)", aspect_rows)
+        return chart_ids
+
+    # --- Consultas ---
+
+    def find_charts(self, placements=(), aspects=(), chart_type=None, limit=None):
+        """
+        Ids dos mapas que satisfazem TODOS os filtros.
+        `placements`: tuplas (ponto, signo ou None, casa ou None), ex.: ('Mars', 'Aries', 10).
+        `aspects`: tuplas (ponto1, ponto2, aspecto), ex.: ('Sun', 'Moon', 'Trígono').
+        Cada filtro usa um dos índices (point, sign), (point, house) ou (aspect, pair)
+        e os resultados são intersectados no próprio SQLite.
+        """
+        sql, params = self._filter_sql(placements, aspects, chart_type)
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return [row[0] for row in self.connection.execute(sql, params)]
+
+    def count_charts(self, placements=(), aspects=(), chart_type=None):
+        """Quantidade de mapas que satisfazem os filtros de `find_charts`, contada no SQLite."""
+        sql, params = self._filter_sql(placements, aspects, chart_type)
+        return self.connection.execute(f"SELECT COUNT(*) FROM ({sql})", params).fetchone()[0]
+
+    def _filter_sql(self, placements, aspects, chart_type):
+        """SQL (interseção de subconsultas indexadas) e parâmetros dos filtros de `find_charts`."""
+        subqueries, params = [], []
+        for point, sign, house in placements:
+            conditions, values = ["point = ?"], [point]
+            if sign is not None:
+                conditions.append("sign = ?")
+                values.append(SIGNS.index(sign) if isinstance(sign, str) else int(sign))
+            if house is not None:
+                conditions.append("house = ?")
+                values.append(int(house))
+            subqueries.append(f"SELECT chart_id FROM points WHERE {' AND '.join(conditions)}")
+            params.extend(values)
+
+        for point1, point2, aspect in aspects:
+            point1, point2 = self._normalize_pair(point1, point2)
+            subqueries.append("SELECT chart_id FROM aspects WHERE aspect = ? AND point1 = ? AND point2 = ?")
+            params.extend([aspect, point1, point2])
+
+        if chart_type is not None:
+            subqueries.append("SELECT id FROM charts WHERE chart_type = ?")
+            params.append(chart_type)
+
+        if not subqueries:
+            subqueries.append("SELECT id FROM charts")
+        return " INTERSECT ".join(subqueries), params
+
+    def load_chart(self, chart_id):
+        """Recarrega um mapa gravado como dicionário completo (desenhável pelo ChartRenderer)."""
+        row = self.connection.execute(
+            "SELECT chart_type, house_system, jd, latitude, longitude, timezone_id, asc, mc "
+            "FROM charts WHERE id = ?", (chart_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        chart_type, house_system, jd, latitude, longitude, timezone_id, asc, mc = row
+
+        point_positions = [
+            {'name': name, 'lon': lon, 'retrograde': bool(retrograde), 'speed': speed}
+            for name, lon, speed, retrograde in self.connection.execute(
+                "SELECT point, lon, speed, retrograde FROM points WHERE chart_id = ?", (chart_id,)
+            )
+        ]
+        point_positions.sort(key=lambda p: self._point_order(p['name']))
+        houses = tuple(lon for (lon,) in self.connection.execute(
+            "SELECT lon FROM cusps WHERE chart_id = ? ORDER BY house", (chart_id,)
+        ))
+
+        if self.astrological_data is None:
+            self.astrological_data = AstrologicalData()
+        return self.astrological_data.chart_from_positions(
+            chart_type, house_system, jd, latitude, longitude, timezone_id,
+            point_positions, houses, (asc, mc)
+        )
+
+    def _normalize_pair(self, point1, point2):
+        """Ordena o par de pontos pela ordem de ASPECT_POINTS, para um único formato no índice."""
+        if self._point_order(point2) < self._point_order(point1):
+            return point2, point1
+        return point1, point2
+
+    def _point_order(self, name):
+        return POINT_ORDER.index(name) if name in POINT_ORDER else len(POINT_ORDER)
@@ -1,3 +1,5 @@
+import os
+
 import matplotlib.image as mpimg
 
 # --- Constantes Astrológicas ---
@@ -45,6 +47,43 @@ NATAL_POINTS_CALCULABLE = ['Sun', 'Moon', 'Mercury', 'Venus', 'Mars', 'Jupiter',
 HORARY_POINTS_CALCULABLE = ['Sun', 'Moon', 'Mercury', 'Venus', 'Mars', 'Jupiter',
                   'Saturn', 'True Node']
 
+CHART_TYPE_TITLES = {
+    'natal': 'Mapa Natal',
+    'horary': 'Mapa Horário',
+    'composite': 'Mapa Composto',
+    'davison': 'Mapa Davison',
+    'solar_return': 'Revolução Solar',
+    'lunar_return': 'Revolução Lunar',
+}
+
+# Sistemas de casas disponíveis: nome -> código do Swiss Ephemeris
+HOUSE_SYSTEMS = {
+    'Placidus': b'P',
+    'Koch': b'K',
+    'Regiomontanus': b'R',
+    'Campanus': b'C',
+    'Equal': b'A',
+    'Whole Sign': b'W',
+    'Porphyry': b'O',
+    'Alcabitius': b'B',
+    'Morinus': b'M',
+    'Topocentric': b'T',
+    'Meridian': b'X',
+    'Vehlow': b'V',
+    'Krusinski': b'U',
+    'Sripati': b'S',
+}
+HOUSES_CACHE_SIZE = 256 # Quantidade de (jd, lat, lon) mantidos no cache de casas
+
+TRADITIONAL_PLANETS = ['Sun', 'Moon', 'Mercury', 'Venus', 'Mars', 'Jupiter', 'Saturn']
+
+# Velocidade máxima (graus/dia, em módulo) de cada ponto; limite seguro para podar intervalos
+MAX_DAILY_SPEEDS = {
+    'Sun': 1.02, 'Moon': 15.4, 'Mercury': 2.25, 'Venus': 1.27, 'Mars': 0.80,
+    'Jupiter': 0.25, 'Saturn': 0.14, 'Uranus': 0.07, 'Neptune': 0.04, 'Pluto': 0.05,
+    'True Node': 0.06, 'MC': 395.0
+}
+
 RETROGRADE_PLANETS = ['Mercury', 'Venus', 'Mars', 'Jupiter', 'Saturn', 'Uranus', 'Neptune', 'Pluto']
 
 SIGNS = ['Aries', 'Taurus', 'Gemini', 'Cancer', 'Leo', 'Virgo',
@@ -61,7 +100,186 @@ SIGN_ELEMENTS = {
     'Cancer': 'Water', 'Scorpio': 'Water', 'Pisces': 'Water'
 }
 
+SIGN_MODALITIES = {
+    'Aries': 'Cardinal', 'Cancer': 'Cardinal', 'Libra': 'Cardinal', 'Capricorn': 'Cardinal',
+    'Taurus': 'Fixed', 'Leo': 'Fixed', 'Scorpio': 'Fixed', 'Aquarius': 'Fixed',
+    'Gemini': 'Mutable', 'Virgo': 'Mutable', 'Sagittarius': 'Mutable', 'Pisces': 'Mutable'
+}
+
+# Aspectos maiores: nome -> (ângulo, cor da linha)
+ASPECTS = {
+    "Conjunção": (0, 'red'),
+    "Oposição": (180, 'red'),
+    "Trígono": (120, '#008000'), # Green
+    "Quadratura": (90, 'red'),
+    "Sextil": (60, '#008000'), # Green
+}
+DEFAULT_ASPECT_ORB = 8
+
+HARD_ASPECTS = ["Conjunção", "Oposição", "Quadratura"]
+
+# Pontos considerados no cálculo de aspectos (exclui nodos/fortuna)
+ASPECT_POINTS = ['Sun', 'Moon', 'Mercury', 'Venus', 'Mars',
+                 'Jupiter', 'Saturn', 'Uranus', 'Neptune', 'Pluto']
+
+# Aspectos de declinação
+DECLINATION_ASPECTS = ["Paralelo", "Contraparalelo"]
+PARALLEL_ORB_DEGREES = 1.0
+
+# --- Configurações de Aspectos ---
+ASPECT_PATTERNS = ["Grande Trígono", "Quadratura em T", "Grande Cruz", "Yod", "Pipa",
+                   "Retângulo Místico", "Stellium"]
+QUINCUNX_ANGLE = 150 # Só usado no Yod; não entra na lista de aspectos do mapa
+QUINCUNX_ORB_DEGREES = 3.0
+STELLIUM_MIN_POINTS = 3 # Planetas mutuamente conjuntos para formar um stellium
+
+# Pesos de cada aspecto na pontuação de compatibilidade (sinastria)
+SYNASTRY_ASPECT_WEIGHTS = {
+    "Conjunção": 2.0,
+    "Trígono": 1.5,
+    "Sextil": 1.0,
+    "Quadratura": -1.0,
+    "Oposição": -0.5,
+}
+
+# --- Dignidades Essenciais (regências tradicionais) ---
+SIGN_RULERS = {
+    'Aries': 'Mars', 'Taurus': 'Venus', 'Gemini': 'Mercury', 'Cancer': 'Moon',
+    'Leo': 'Sun', 'Virgo': 'Mercury', 'Libra': 'Venus', 'Scorpio': 'Mars',
+    'Sagittarius': 'Jupiter', 'Capricorn': 'Saturn', 'Aquarius': 'Saturn', 'Pisces': 'Jupiter'
+}
+
+PLANET_EXALTATIONS = {
+    'Sun': 'Aries', 'Moon': 'Taurus', 'Mercury': 'Virgo', 'Venus': 'Pisces',
+    'Mars': 'Capricorn', 'Jupiter': 'Cancer', 'Saturn': 'Libra'
+}
+
+# Regentes de triplicidade (doroteanos): elemento -> (diurno, noturno)
+TRIPLICITY_RULERS = {
+    'Fire': ('Sun', 'Jupiter'), 'Earth': ('Venus', 'Moon'),
+    'Air': ('Saturn', 'Mercury'), 'Water': ('Venus', 'Mars')
+}
+
+# Termos egípcios: signo -> [(regente, grau final do termo)]
+EGYPTIAN_TERMS = {
+    'Aries': [('Jupiter', 6), ('Venus', 12), ('Mercury', 20), ('Mars', 25), ('Saturn', 30)],
+    'Taurus': [('Venus', 8), ('Mercury', 14), ('Jupiter', 22), ('Saturn', 27), ('Mars', 30)],
+    'Gemini': [('Mercury', 6), ('Jupiter', 12), ('Venus', 17), ('Mars', 24), ('Saturn', 30)],
+    'Cancer': [('Mars', 7), ('Venus', 13), ('Mercury', 19), ('Jupiter', 26), ('Saturn', 30)],
+    'Leo': [('Jupiter', 6), ('Venus', 11), ('Saturn', 18), ('Mercury', 24), ('Mars', 30)],
+    'Virgo': [('Mercury', 7), ('Venus', 17), ('Jupiter', 21), ('Mars', 28), ('Saturn', 30)],
+    'Libra': [('Saturn', 6), ('Mercury', 14), ('Jupiter', 21), ('Venus', 28), ('Mars', 30)],
+    'Scorpio': [('Mars', 7), ('Venus', 11), ('Mercury', 19), ('Jupiter', 24), ('Saturn', 30)],
+    'Sagittarius': [('Jupiter', 12), ('Venus', 17), ('Mercury', 21), ('Saturn', 26), ('Mars', 30)],
+    'Capricorn': [('Mercury', 7), ('Jupiter', 14), ('Venus', 22), ('Saturn', 26), ('Mars', 30)],
+    'Aquarius': [('Mercury', 7), ('Venus', 13), ('Jupiter', 20), ('Mars', 25), ('Saturn', 30)],
+    'Pisces': [('Venus', 12), ('Jupiter', 16), ('Mercury', 19), ('Mars', 28), ('Saturn', 30)]
+}
+
+# Pontuação de Lilly; as faces seguem a ordem caldeia a partir de Marte em Áries
+ESSENTIAL_DIGNITIES = ["Domicílio", "Exaltação", "Triplicidade", "Termo", "Face"]
+DIGNITY_SCORES = {"Domicílio": 5, "Exaltação": 4, "Triplicidade": 3, "Termo": 2, "Face": 1,
+                  "Exílio": -5, "Queda": -4}
+PEREGRINE_SCORE = -5 # Sem nenhuma dignidade essencial
+
+# --- Progressões e Direções ---
+TROPICAL_YEAR_DAYS = 365.242199
+PROGRESSION_STEPS_PER_YEAR = 12 # Amostras mensais na linha do tempo
+
+# --- Retornos (Revoluções) ---
+RETURN_MEAN_SPEEDS = {'Sun': 0.985647, 'Moon': 13.176358} # graus/dia
+RETURN_TOLERANCE_DEGREES = 1e-7
+RETURN_MAX_ITERATIONS = 8
+
+# --- Pesquisa Estatística ---
+RESEARCH_CHUNK_SIZE = 5000 # Nascimentos por bloco enviado a cada processo
+
+# --- Índice de Similaridade de Mapas ---
+# Peso de cada ponto no embedding circular (cos, sin); Asc/MC dependem da hora exata
+SIMILARITY_WEIGHTS = {
+    'Sun': 3.0, 'Moon': 3.0, 'Asc': 3.0, 'MC': 2.0,
+    'Mercury': 1.5, 'Venus': 1.5, 'Mars': 1.5,
+    'Jupiter': 1.0, 'Saturn': 1.0, 'Uranus': 0.5, 'Neptune': 0.5, 'Pluto': 0.5,
+    'True Node': 0.5,
+}
+SIMILARITY_SEARCH_CHUNK = 262144 # Vetores por bloco na busca exata
+
+# --- Banco de Mapas (SQLite) ---
+CHART_STORE_BATCH_SIZE = 10000 # Mapas por transação na inserção em massa
+
+# --- Exportação ---
+EXPORT_SCHEMA_VERSION = 1 # Incrementar a cada mudança incompatível no formato exportado
+EXPORT_BATCH_SIZE = 10000 # Mapas por lote gravado no Arrow IPC
+
+# --- Busca Eletiva ---
+ELECTIONAL_COARSE_STEP_DAYS = 1 / 24 # Grade inicial de uma hora
+ELECTIONAL_RESOLUTION_DAYS = 1 / 1440 # Fronteiras refinadas até um minuto
+ELECTIONAL_ASC_SAFETY_FACTOR = 2.0 # Margem sobre a velocidade instantânea do Ascendente
+ELECTIONAL_SUBWINDOW_DAYS = 7 # Tamanho das sub-janelas processadas em paralelo
+
+# --- Lua Fora de Curso ---
+VOID_OF_COURSE_STEP_DAYS = 1 / 24 # Grade de detecção de perfeições (a Lua anda ~0,5°/hora)
+VOID_OF_COURSE_MARGIN_DAYS = 3 # Dias antes do mês para conhecer o último aspecto do signo anterior
+
+# --- Lunações e Eclipses ---
+LUNATION_KINDS = ["Lua Nova", "Lua Cheia"]
+ECLIPSE_TYPES = ["", "Solar Total", "Solar Anular", "Solar Híbrido", "Solar Parcial",
+                 "Lunar Total", "Lunar Parcial", "Lunar Penumbral"] # Índice 0: sem eclipse
+LUNATION_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".astrodog", "lunations")
+LUNATION_CACHE_VERSION = 1 # Incrementar ao mudar o conteúdo das tabelas anuais
+LUNATION_STEP_DAYS = 0.5 # Grade de detecção (a elongação anda ~6° a cada 12 horas)
+LUNATION_HIT_ORB_DEGREES = 3.0 # Orbe padrão de uma lunação sobre um ponto natal
+LUNATION_HITS_CHUNK = 20000 # Mapas por bloco na verificação em massa
+LUNATION_NATAL_POINTS = ASPECT_POINTS + ['Asc', 'MC']
+
+# --- Previsão Diária de Trânsitos ---
+TRANSIT_FORECAST_ORB_DEGREES = 1.0 # Orbe dos trânsitos sobre pontos natais
+TRANSIT_FORECAST_SHARD_SIZE = 2000 # Clientes por tarefa enviada a cada processo
+TRANSIT_FORECAST_MAX_CELLS = 2000000 # Células (dias × trânsitos × clientes × pontos) por bloco em memória
+TRANSIT_NATAL_POINTS = ASPECT_POINTS + ['Asc', 'MC']
+
+# --- Serviço de Horária (buffer circular por local) ---
+HORARY_BUFFER_MINUTES = 180 # Minutos à frente mantidos pré-calculados por local
+HORARY_REFRESH_SECONDS = 60 # Intervalo entre as atualizações dos buffers
+HORARY_PRESET_LOCATIONS = [] # Locais do atendimento (texto de busca) registrados ao abrir o programa
+HORARY_MAX_LOCATIONS = 8 # Locais digitados mantidos no serviço (LRU); os fixados não contam
+
+# --- Horas Planetárias ---
+CHALDEAN_ORDER = ['Saturn', 'Jupiter', 'Mars', 'Sun', 'Venus', 'Mercury', 'Moon']
+WEEKDAY_RULERS = ['Moon', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn', 'Sun'] # Segunda (0) a domingo (6), como swe.day_of_week
+HORIZON_REFRACTION_DEGREES = 36.59 / 60 # Refração no horizonte usada pelo swe.rise_trans (1013,25 hPa, 0 °C)
+SUN_RADIUS_AU = 0.0046524726 # Raio do Sol, para o semidiâmetro aparente (borda superior)
+PLANETARY_HOURS_CACHE_SIZE = 1024 # (data, local arredondado) mantidos no cache
+PLANETARY_HOURS_LOCATION_DECIMALS = 2 # Casas decimais das coordenadas na chave do cache (~1 km)
+
+# --- Astrocartografia ---
+ASTROCARTOGRAPHY_ANGLES = ['MC', 'IC', 'ASC', 'DSC']
+ASTROCARTOGRAPHY_LATITUDE_STEP = 0.5 # Passo (graus) das linhas de ASC/DSC
+ASTROCARTOGRAPHY_MAX_LATITUDE = 80.0 # Além disso as linhas de horizonte ficam quase horizontais
+ASTROCARTOGRAPHY_LINE_STYLES = {'MC': '-', 'IC': ':', 'ASC': '--', 'DSC': '-.'}
+ASTROCARTOGRAPHY_PLANET_COLORS = {
+    'Sun': '#e6a700', 'Moon': '#7f7f7f', 'Mercury': '#2ca02c', 'Venus': '#e377c2', 'Mars': '#d62728',
+    'Jupiter': '#1f77b4', 'Saturn': '#8c564b', 'Uranus': '#17becf', 'Neptune': '#9467bd', 'Pluto': '#000000'
+}
+ASTROCARTOGRAPHY_FIGSIZE = (16, 8)
+ASTROCARTOGRAPHY_DPI = 150
+
+# --- Geocodificação (Nominatim) ---
+GEOCODER_USER_AGENT = "astral_chart_app"
+GEOCODER_DOMAIN = "nominatim.openstreetmap.org"
+GEOCODER_SCHEME = "https"
+GEOCODER_RATE_PER_SECOND = 1.0 # Política de uso do Nominatim público: no máximo 1 requisição/s
+GEOCODER_BURST = 1 # Fichas acumuláveis no balde (requisições seguidas sem espera)
+GEOCODER_TIMEOUT_SECONDS = 10
+GEOCODER_MAX_RETRIES = 3 # Repetições em erro de conexão, 429 e 5xx
+GEOCODER_BACKOFF_SECONDS = 1.0 # Base do recuo exponencial entre repetições
+GEOCODER_POOL_SIZE = 4 # Conexões keep-alive mantidas na sessão
+GEOCODER_CACHE_SIZE = 512 # Consultas resolvidas mantidas em memória
+
 # --- Configurações de Plotagem ---
+CHART_FIGSIZE = (10, 10)
+FIGURE_POOL_SIZE = 4 # Figuras polares ociosas mantidas para reaproveitamento
+
 IMAGE_CENTER_R = 0.90
 DEGREE_TEXT_R = 0.80
 MINUTES_TEXT_R = 0.72
@@ -85,4 +303,37 @@ RETROGRADE_TEXT_FONTSIZE = 9
 HOUSE_NUMBER_R = 0.6
 SIGN_LINE_R_INNER = 1
 SIGN_LINE_R_OUTER = 1.05
-ASPECT_RADIAL_POS = 0.53
\ No newline at end of file
+ASPECT_RADIAL_POS = 0.53
+
+# --- Configurações do Bi-wheel (Sinastria) ---
+BIWHEEL_RING_R_INNER = 1.10
+BIWHEEL_RING_R_OUTER = 1.40
+BIWHEEL_IMAGE_CENTER_R = 1.31
+BIWHEEL_DEGREE_TEXT_R = 1.20
+BIWHEEL_MINUTES_TEXT_R = 1.14
+BIWHEEL_RETROGRADE_TEXT_R = 1.25
+
+# --- Renderizador Tk (tk.Canvas) ---
+TK_WHEEL_FIT_R = 1.12 # Raio (unidades do mapa) que deve caber no canvas
+TK_REFERENCE_RADIUS_PX = 400 # Raio em pixels em que fontes e símbolos têm o tamanho nominal
+TK_GLYPH_SIZE_PX = 18 # Lado nominal dos símbolos de planetas (imagens 36px com zoom 0.5)
+TK_TITLE_FONTSIZE = 12
+
+# --- Inspeção Interativa (índice angular de acerto) ---
+INSPECTOR_ANGLE_BIN_DEGREES = 2.0 # Largura angular de cada célula do índice
+INSPECTOR_RADIAL_BIN = 0.02 # Altura radial de cada célula (unidades do raio do mapa)
+INSPECTOR_CENTER_R = 0.2 # Abaixo deste raio as células não são divididas por ângulo
+INSPECTOR_LINE_TOLERANCE = 0.012 # Distância máxima do ponteiro a uma linha de aspecto
+INSPECTOR_POINT_R_RANGE = (0.68, 0.95) # Faixa radial do símbolo, graus e minutos de um ponto
+
+# --- Painel de Mapas (grade) ---
+GRID_MAX_CHARTS = 16
+GRID_CELL_INCHES = 4.5 # Lado de cada célula da grade
+GRID_WHEEL_FIT_R = 1.12 # Raio (unidades do mapa) visível em cada célula
+GRID_TITLE_HEIGHT = 0.22 # Espaço acima da roda para o título da célula
+GRID_BACKGROUND_PX = 720 # Resolução da imagem estática da roda compartilhada pelas células
+GRID_GLYPH_ZOOM = 0.3
+
+# --- Tabela de Detalhes ---
+DETAILS_FIRST_BATCH_ROWS = 200 # Linhas inseridas imediatamente no Treeview
+DETAILS_BATCH_ROWS = 500 # Linhas por lote inserido nos ciclos ociosos seguintes
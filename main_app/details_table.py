@@ -0,0 +1,269 @@
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+
+from .constants import SIGNS, PLANET_UNICODE_SYMBOLS, DETAILS_FIRST_BATCH_ROWS, DETAILS_BATCH_ROWS
+from .angular_math import house_positions, angular_separation
+
+
+def _format_degree(value):
+    """Grau dentro do signo no formato 12°34'."""
+    total_minutes = int((value % 30) * 60)
+    return f"{total_minutes // 60}°{total_minutes % 60:02d}'"
+
+
+def _format_point(name):
+    return f"{name} {PLANET_UNICODE_SYMBOLS.get(name, '')}".rstrip()
+
+
+# Colunas de cada seção: (chave, título, largura, alinhamento, formatador do valor bruto).
+# Os valores guardados nas linhas são numéricos/brutos; o formatador só gera o texto exibido,
+# e a ordenação usa sempre o valor bruto.
+DETAILS_SECTIONS = {
+    'Pontos': [
+        ('name', "Ponto", 140, tk.W, _format_point),
+        ('sign', "Signo", 100, tk.W, lambda v: SIGNS[v]),
+        ('degree', "Grau", 70, tk.E, _format_degree),
+        ('lon', "Longitude", 90, tk.E, lambda v: f"{v:.2f}°"),
+        ('house', "Casa", 50, tk.CENTER, str),
+        ('speed', "Velocidade", 90, tk.E, lambda v: f"{v:.4f}"),
+        ('retrograde', "R", 30, tk.CENTER, lambda v: "R" if v else ""),
+        ('lat', "Latitude", 80, tk.E, lambda v: f"{v:+.2f}°"),
+        ('dec', "Declinação", 90, tk.E, lambda v: f"{v:+.2f}°"),
+        ('oob', "FL", 30, tk.CENTER, lambda v: "FL" if v else ""),
+    ],
+    'Cúspides': [
+        ('house', "Casa", 60, tk.CENTER, str),
+        ('sign', "Signo", 110, tk.W, lambda v: SIGNS[v]),
+        ('degree', "Grau", 80, tk.E, _format_degree),
+        ('lon', "Longitude", 100, tk.E, lambda v: f"{v:.2f}°"),
+    ],
+    'Aspectos': [
+        ('point1', "Ponto 1", 130, tk.W, _format_point),
+        ('aspect', "Aspecto", 100, tk.W, str),
+        ('point2', "Ponto 2", 130, tk.W, _format_point),
+        ('angle', "Ângulo", 60, tk.E, lambda v: f"{v}°"),
+        ('separation', "Separação", 90, tk.E, lambda v: f"{v:.2f}°"),
+        ('orb', "Orbe", 70, tk.E, lambda v: f"{v:.2f}°"),
+    ],
+    'Paralelos': [
+        ('point1', "Ponto 1", 130, tk.W, _format_point),
+        ('aspect', "Aspecto", 120, tk.W, str),
+        ('point2', "Ponto 2", 130, tk.W, _format_point),
+        ('orb', "Orbe", 70, tk.E, lambda v: f"{v:.2f}°"),
+    ],
+    'Configurações': [
+        ('pattern', "Configuração", 140, tk.W, str),
+        ('points', "Pontos", 320, tk.W, lambda v: ", ".join(_format_point(name) for name in v)),
+        ('apex', "Ápice", 110, tk.W, _format_point),
+    ],
+    'Dignidades': [
+        ('name', "Planeta", 130, tk.W, _format_point),
+        ('dignities', "Dignidades", 220, tk.W, ", ".join),
+        ('debilities', "Debilidades", 130, tk.W, ", ".join),
+        ('score', "Pontos", 70, tk.E, lambda v: f"{v:+d}"),
+    ],
+}
+
+
+def point_rows(chart_data):
+    """
+    Linhas da seção de pontos, a partir dos dados numéricos do mapa.
+    Latitude, declinação e "fora dos limites" ficam vazias em mapas sem
+    coordenadas equatoriais (ex.: compostos ou carregados de arquivo).
+    """
+    positions = chart_data['point_positions']
+    out_of_bounds = set(chart_data.get('out_of_bounds', []))
+    lons = np.array([p['lon'] for p in positions], dtype=float)
+    houses = house_positions(lons, np.asarray(chart_data['houses'][:12], dtype=float)) + 1
+    return [{
+        'name': p['name'], 'sign': int(p['lon'] // 30) % 12, 'degree': p['lon'] % 30, 'lon': p['lon'],
+        'house': int(house), 'speed': float(p.get('speed', 0.0)), 'retrograde': bool(p['retrograde']),
+        'lat': p.get('lat'), 'dec': p.get('dec'), 'oob': (p['name'] in out_of_bounds) if 'dec' in p else None
+    } for p, house in zip(positions, houses)]
+
+
+def cusp_rows(chart_data):
+    """Linhas da seção de cúspides."""
+    return [{'house': i + 1, 'sign': int(lon // 30) % 12, 'degree': lon % 30, 'lon': lon}
+            for i, lon in enumerate(chart_data['houses'][:12])]
+
+
+def aspect_rows(chart_data):
+    """Linhas da seção de aspectos (separação calculada das longitudes)."""
+    lon_map = {p['name']: p['lon'] for p in chart_data['point_positions']}
+    return [{
+        'point1': a['point1'], 'aspect': a['aspect'], 'point2': a['point2'], 'angle': a['angle'],
+        'separation': float(angular_separation(lon_map[a['point1']], lon_map[a['point2']])),
+        'orb': float(a.get('orb', 0.0))
+    } for a in chart_data['aspects_data'] if a['point1'] in lon_map and a['point2'] in lon_map]
+
+
+def parallel_rows(chart_data):
+    """Linhas da seção de paralelos e contraparalelos de declinação."""
+    return [{'point1': p['point1'], 'aspect': p['aspect'], 'point2': p['point2'], 'orb': p['orb']}
+            for p in chart_data.get('parallels_data', [])]
+
+
+def pattern_rows(chart_data):
+    """Linhas da seção de configurações de aspectos (grande trígono, yod, ...)."""
+    return [{'pattern': p['pattern'], 'points': p['points'], 'apex': p['apex']}
+            for p in chart_data.get('aspect_patterns', [])]
+
+
+def dignity_rows(chart_data):
+    """Linhas da seção de dignidades essenciais dos planetas tradicionais."""
+    dignities = chart_data.get('dignities')
+    if dignities is None:
+        return []
+    return [{'name': p['name'], 'dignities': p['dignities'], 'debilities': p['debilities'], 'score': p['score']}
+            for p in dignities['points']]
+
+
+class DetailsTable(ttk.Frame):
+    """
+    Aba de detalhes em tabela: um ttk.Treeview com colunas tipadas por seção
+    (pontos, cúspides, aspectos, paralelos, configurações, dignidades e seções extras como a Lua da horária),
+    ordenável pelo cabeçalho e filtrável por texto. As linhas são inseridas
+    em lotes pelo laço de eventos do Tk (o primeiro lote na hora), então
+    mesmo listas com milhares de linhas aparecem sem travar a interface.
+    """
+
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.sections = dict(DETAILS_SECTIONS)
+        self.rows = {name: [] for name in self.sections}
+        self.current_section = next(iter(self.sections))
+        self._sort_key = None
+        self._sort_descending = False
+        self._pending_job = None
+
+        self.summary_label = ttk.Label(self, justify=tk.LEFT, padding=(10, 5))
+        self.summary_label.pack(side=tk.TOP, fill=tk.X)
+
+        controls = ttk.Frame(self, padding=(10, 0))
+        controls.pack(side=tk.TOP, fill=tk.X)
+        ttk.Label(controls, text="Seção:").pack(side=tk.LEFT)
+        self.section_var = tk.StringVar(value=self.current_section)
+        self.section_dropdown = ttk.Combobox(controls, textvariable=self.section_var, state='readonly',
+                                             values=list(self.sections), width=15)
+        self.section_dropdown.pack(side=tk.LEFT, padx=5)
+        self.section_dropdown.bind("<<ComboboxSelected>>", lambda event: self.show_section(self.section_var.get()))
+        ttk.Label(controls, text="Filtro:").pack(side=tk.LEFT, padx=(15, 0))
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add('write', lambda *args: self._refresh())
+        ttk.Entry(controls, textvariable=self.filter_var, width=25).pack(side=tk.LEFT, padx=5)
+        self.count_label = ttk.Label(controls)
+        self.count_label.pack(side=tk.RIGHT)
+
+        table_frame = ttk.Frame(self)
+        table_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(table_frame, show='headings', selectmode='browse')
+        scrollbar = ttk.Scrollbar(table_frame, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+    # --- Dados ---
+
+    def set_summary(self, text):
+        self.summary_label.config(text=text)
+
+    def set_section(self, name, columns, rows):
+        """Define (ou substitui) uma seção extra com suas colunas e linhas."""
+        self.sections[name] = columns
+        self.rows[name] = rows
+        self.section_dropdown.config(values=list(self.sections))
+
+    def remove_section(self, name):
+        if name in DETAILS_SECTIONS or name not in self.sections:
+            return
+        del self.sections[name]
+        del self.rows[name]
+        self.section_dropdown.config(values=list(self.sections))
+        if self.current_section == name:
+            self.show_section(next(iter(self.sections)))
+
+    def populate(self, chart_data, summary):
+        """Preenche as seções padrão a partir dos dados numéricos do mapa."""
+        self.set_summary(summary)
+        self.rows['Pontos'] = point_rows(chart_data)
+        self.rows['Cúspides'] = cusp_rows(chart_data)
+        self.rows['Aspectos'] = aspect_rows(chart_data)
+        self.rows['Paralelos'] = parallel_rows(chart_data)
+        self.rows['Configurações'] = pattern_rows(chart_data)
+        self.rows['Dignidades'] = dignity_rows(chart_data)
+        self._refresh()
+
+    def clear(self):
+        self.set_summary("")
+        for name in list(self.sections):
+            if name in DETAILS_SECTIONS:
+                self.rows[name] = []
+            else:
+                self.remove_section(name)
+        self._refresh()
+
+    # --- Exibição ---
+
+    def show_section(self, name):
+        self.current_section = name
+        self.section_var.set(name)
+        self._sort_key = None
+        self._sort_descending = False
+        self._refresh()
+
+    def _sort_by(self, key):
+        """Clique no cabeçalho: ordena pela coluna; novo clique inverte a ordem."""
+        self._sort_descending = (self._sort_key == key) and not self._sort_descending
+        self._sort_key = key
+        self._refresh()
+
+    def _visible_rows(self, columns):
+        """Linhas da seção atual já filtradas, ordenadas e formatadas."""
+        formatted = [[(fmt(row[key]) if row.get(key) is not None else "") for key, _, _, _, fmt in columns]
+                     for row in self.rows[self.current_section]]
+        order = list(range(len(formatted)))
+
+        needle = self.filter_var.get().strip().lower()
+        if needle:
+            order = [i for i in order if any(needle in cell.lower() for cell in formatted[i])]
+
+        if self._sort_key is not None:
+            rows = self.rows[self.current_section]
+            key = self._sort_key
+            present = [i for i in order if rows[i].get(key) is not None]
+            missing = [i for i in order if rows[i].get(key) is None]
+            present.sort(key=lambda i: rows[i][key], reverse=self._sort_descending)
+            order = present + missing
+        return [formatted[i] for i in order]
+
+    def _refresh(self):
+        """Recria as colunas e reinsere as linhas visíveis em lotes."""
+        if self._pending_job is not None:
+            self.after_cancel(self._pending_job)
+            self._pending_job = None
+
+        columns = self.sections[self.current_section]
+        self.tree.delete(*self.tree.get_children())
+        self.tree.configure(columns=[key for key, *_ in columns])
+        for key, heading, width, anchor, _ in columns:
+            arrow = ""
+            if key == self._sort_key:
+                arrow = " ▼" if self._sort_descending else " ▲"
+            self.tree.heading(key, text=heading + arrow, command=lambda k=key: self._sort_by(k))
+            self.tree.column(key, width=width, anchor=anchor, stretch=True)
+
+        values = self._visible_rows(columns)
+        self.count_label.config(text=f"{len(values)} de {len(self.rows[self.current_section])} linhas")
+        self._insert_batch(values, 0, DETAILS_FIRST_BATCH_ROWS)
+
+    def _insert_batch(self, values, start, size):
+        end = min(start + size, len(values))
+        for row_values in values[start:end]:
+            self.tree.insert('', tk.END, values=row_values)
+        if end < len(values):
+            self._pending_job = self.after_idle(self._insert_batch, values, end, DETAILS_BATCH_ROWS)
+        else:
+            self._pending_job = None
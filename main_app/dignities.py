@@ -0,0 +1,133 @@
+import numpy as np
+
+from .constants import (
+    SIGNS, SIGN_ELEMENTS, SIGN_RULERS, PLANET_EXALTATIONS, TRADITIONAL_PLANETS, TRIPLICITY_RULERS,
+    EGYPTIAN_TERMS, CHALDEAN_ORDER, ESSENTIAL_DIGNITIES, DIGNITY_SCORES, PEREGRINE_SCORE
+)
+
+DAY, NIGHT = 0, 1 # Índice da seita nas tabelas
+_PLANET_INDEX = {name: p for p, name in enumerate(TRADITIONAL_PLANETS)}
+
+
+def is_day_chart(sun_lons, ascs):
+    """Seita vetorizada: o Sol está acima do horizonte (casas 7 a 12, do Descendente ao Ascendente)."""
+    return (np.asarray(sun_lons, dtype=float) - np.asarray(ascs, dtype=float)) % 360 >= 180
+
+
+def _degree_rulers():
+    """
+    Regente de cada dignidade em cada grau inteiro: (seita, dignidade, 360)
+    com índices de TRADITIONAL_PLANETS (-1 onde não há, ex.: signos sem
+    exaltação). Os limites de termos e faces caem em graus inteiros, então
+    o grau truncado basta.
+    """
+    rulers = np.full((2, len(ESSENTIAL_DIGNITIES), 360), -1, dtype=np.int8)
+    exalted_in = {sign: planet for planet, sign in PLANET_EXALTATIONS.items()}
+    for degree in range(360):
+        sign = SIGNS[degree // 30]
+        in_sign = degree % 30
+        term = next(planet for planet, end in EGYPTIAN_TERMS[sign] if in_sign < end)
+        face = CHALDEAN_ORDER[(CHALDEAN_ORDER.index('Mars') + degree // 10) % len(CHALDEAN_ORDER)]
+        for sect in (DAY, NIGHT):
+            by_dignity = {
+                "Domicílio": SIGN_RULERS[sign],
+                "Exaltação": exalted_in.get(sign),
+                "Triplicidade": TRIPLICITY_RULERS[SIGN_ELEMENTS[sign]][sect],
+                "Termo": term,
+                "Face": face,
+            }
+            for d, dignity in enumerate(ESSENTIAL_DIGNITIES):
+                if by_dignity[dignity] is not None:
+                    rulers[sect, d, degree] = _PLANET_INDEX[by_dignity[dignity]]
+    return rulers
+
+
+def _score_tables(rulers):
+    """
+    Tabelas (seita, planeta, 360): pontos positivos (base do almuten),
+    exílio e queda (regente do grau oposto), e a pontuação total, com
+    PEREGRINE_SCORE para quem não tem nenhuma dignidade no grau.
+    """
+    planets = np.arange(len(TRADITIONAL_PLANETS))[None, :, None, None]
+    holds = rulers[:, None, :, :] == planets                           # (2, P, D, 360)
+    weights = np.array([DIGNITY_SCORES[d] for d in ESSENTIAL_DIGNITIES])[None, None, :, None]
+    positive = (holds * weights).sum(axis=2)
+
+    opposite = np.roll(holds, -180, axis=-1)
+    detriment = opposite[:, :, ESSENTIAL_DIGNITIES.index("Domicílio")]
+    fall = opposite[:, :, ESSENTIAL_DIGNITIES.index("Exaltação")]
+    debility = detriment * DIGNITY_SCORES["Exílio"] + fall * DIGNITY_SCORES["Queda"]
+    total = np.where(positive > 0, positive, PEREGRINE_SCORE) + debility
+    return positive.astype(np.int8), detriment, fall, total.astype(np.int8)
+
+
+# Tabelas montadas uma vez na importação (alguns KB): as consultas são só indexação
+DEGREE_RULERS = _degree_rulers()
+POSITIVE_SCORES, DETRIMENT, FALL, DIGNITY_TABLE = _score_tables(DEGREE_RULERS)
+ALMUTEN_TABLE = POSITIVE_SCORES.argmax(axis=1).astype(np.int8) # (seita, 360); empate: ordem de TRADITIONAL_PLANETS
+
+
+def _sect_index(is_day):
+    return np.where(np.asarray(is_day, dtype=bool), DAY, NIGHT)
+
+
+def _degrees(lons):
+    return np.floor(np.asarray(lons, dtype=float) % 360).astype(np.intp) % 360
+
+
+def dignity_scores(lons, is_day, planets=TRADITIONAL_PLANETS):
+    """
+    Pontuação essencial de cada planeta na sua longitude, vetorizada:
+    `lons` (..., P) na ordem de `planets` e `is_day` (...,).
+    Retorna inteiros (..., P); planetas fora de TRADITIONAL_PLANETS ou NaN ficam com 0.
+    """
+    lons = np.asarray(lons, dtype=float)
+    planet_idx = np.array([_PLANET_INDEX.get(name, -1) for name in planets])
+    sect = _sect_index(is_day)[..., None]
+    valid = (planet_idx >= 0) & ~np.isnan(lons)
+    scores = DIGNITY_TABLE[sect, np.maximum(planet_idx, 0), _degrees(np.where(valid, lons, 0.0))]
+    return np.where(valid, scores, 0)
+
+
+def almuten(lons, is_day):
+    """Almuten de cada grau (o planeta com mais pontos de dignidade positiva ali), vetorizado: índices de TRADITIONAL_PLANETS."""
+    return ALMUTEN_TABLE[_sect_index(is_day), _degrees(lons)]
+
+
+def point_dignities(planet, lon, is_day):
+    """
+    Dignidades de um planeta tradicional num grau: {'dignities', 'debilities',
+    'score'}, ou None para pontos sem dignidade essencial.
+    """
+    if planet not in _PLANET_INDEX:
+        return None
+    p, degree, sect = _PLANET_INDEX[planet], int(_degrees(lon)), int(_sect_index(is_day))
+    dignities = [d for k, d in enumerate(ESSENTIAL_DIGNITIES) if DEGREE_RULERS[sect, k, degree] == p]
+    debilities = [name for name, table in (("Exílio", DETRIMENT), ("Queda", FALL)) if table[sect, p, degree]]
+    return {'dignities': dignities or ["Peregrino"], 'debilities': debilities,
+            'score': int(DIGNITY_TABLE[sect, p, degree])}
+
+
+def describe_dignity(dignity):
+    """Texto curto de `point_dignities`: "Domicílio, Termo (+7)"."""
+    return f"{', '.join(dignity['dignities'] + dignity['debilities'])} ({dignity['score']:+d})"
+
+
+def chart_dignities(point_positions, is_day, asc=None, mc=None):
+    """
+    Dignidades de um mapa: 'points' (uma entrada por planeta tradicional,
+    como `point_dignities` mais 'name'), 'score' (soma do mapa), 'is_day' e
+    'almuten' dos ângulos informados.
+    """
+    points = []
+    for p in point_positions:
+        dignity = point_dignities(p['name'], p['lon'], is_day)
+        if dignity is not None:
+            points.append({'name': p['name'], **dignity})
+    angles = {name: lon for name, lon in (('Asc', asc), ('MC', mc)) if lon is not None}
+    return {
+        'points': points,
+        'score': sum(p['score'] for p in points),
+        'is_day': bool(is_day),
+        'almuten': {name: TRADITIONAL_PLANETS[almuten(lon, is_day)] for name, lon in angles.items()},
+    }
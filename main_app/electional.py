@@ -0,0 +1,238 @@
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .constants import (
+    SIGNS, SIGN_ELEMENTS, SIGN_MODALITIES, ASPECTS, ASPECT_POINTS, HARD_ASPECTS,
+    DEFAULT_ASPECT_ORB, NATAL_POINTS_CALCULABLE, MAX_DAILY_SPEEDS,
+    ELECTIONAL_COARSE_STEP_DAYS, ELECTIONAL_RESOLUTION_DAYS, ELECTIONAL_ASC_SAFETY_FACTOR,
+    ELECTIONAL_SUBWINDOW_DAYS
+)
+from .angular_math import angular_separation
+from .ephemeris import EphemerisSampler
+from .void_of_course import moon_void_of_course
+
+# =============================================================================
+# DSL DE CRITÉRIOS
+# Cada critério avalia um lote de amostras e devolve, por instante, o valor
+# booleano e por quantos dias esse valor certamente não muda ("safe days"),
+# calculado a partir da distância até a fronteira e da velocidade máxima.
+# Critérios são combinados com &, | e ~.
+# =============================================================================
+
+
+class Criterion(ABC):
+    @abstractmethod
+    def evaluate(self, samples):
+        """Retorna (valores (T,) bool, dias seguros (T,) float)."""
+
+    def __and__(self, other):
+        return AllOf(self, other)
+
+    def __or__(self, other):
+        return AnyOf(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+
+class AllOf(Criterion):
+    def __init__(self, *criteria):
+        self.criteria = [c for crit in criteria for c in (crit.criteria if isinstance(crit, AllOf) else [crit])]
+
+    def evaluate(self, samples):
+        results = [c.evaluate(samples) for c in self.criteria]
+        values = np.stack([v for v, _ in results])
+        safe = np.stack([s for _, s in results])
+        result = values.all(axis=0)
+        # Verdadeiro: vale até o primeiro componente mudar; falso: enquanto algum falso persistir
+        safe_true = safe.min(axis=0)
+        safe_false = np.where(values, 0.0, safe).max(axis=0)
+        return result, np.where(result, safe_true, safe_false)
+
+
+class AnyOf(Criterion):
+    def __init__(self, *criteria):
+        self.criteria = [c for crit in criteria for c in (crit.criteria if isinstance(crit, AnyOf) else [crit])]
+
+    def evaluate(self, samples):
+        results = [c.evaluate(samples) for c in self.criteria]
+        values = np.stack([v for v, _ in results])
+        safe = np.stack([s for _, s in results])
+        result = values.any(axis=0)
+        safe_true = np.where(values, safe, 0.0).max(axis=0)
+        safe_false = safe.min(axis=0)
+        return result, np.where(result, safe_true, safe_false)
+
+
+class Not(Criterion):
+    def __init__(self, criterion):
+        self.criterion = criterion
+
+    def evaluate(self, samples):
+        values, safe = self.criterion.evaluate(samples)
+        return ~values, safe
+
+
+def _point_lon(samples, name):
+    """Longitude de um ponto nas amostras ('Asc' e 'MC' incluídos)."""
+    if name == 'Asc':
+        return samples['asc']
+    if name == 'MC':
+        return samples['mc']
+    return samples['lons'][name]
+
+
+def _point_rate(samples, name):
+    """Limite superior da velocidade (graus/dia) de um ponto em cada amostra."""
+    if name == 'Asc':
+        return np.abs(samples['asc_speed']) * ELECTIONAL_ASC_SAFETY_FACTOR
+    return np.full(len(samples['jds']), MAX_DAILY_SPEEDS[name])
+
+
+class MoonWaxing(Criterion):
+    """Lua crescente: elongação Lua-Sol entre 0° e 180°."""
+
+    def evaluate(self, samples):
+        elongation = (samples['lons']['Moon'] - samples['lons']['Sun']) % 360
+        margin = np.minimum(elongation % 180, 180 - elongation % 180)
+        rate = MAX_DAILY_SPEEDS['Moon'] + MAX_DAILY_SPEEDS['Sun']
+        return elongation < 180, margin / rate
+
+
+class MoonNotVoid(Criterion):
+    """Lua dentro de curso: a Lua ainda aperfeiçoa algum aspecto antes de mudar de signo."""
+
+    def evaluate(self, samples):
+        is_void, safe = moon_void_of_course(samples)
+        return ~is_void, safe
+
+
+class SignOf(Criterion):
+    """
+    Ponto em um conjunto de signos, ex.: SignOf('Asc', modality='Fixed'),
+    SignOf('Moon', element='Water') ou SignOf('Venus', signs=['Taurus', 'Libra']).
+    """
+
+    def __init__(self, point, signs=None, modality=None, element=None):
+        self.point = point
+        allowed = set(signs or SIGNS)
+        if modality is not None:
+            allowed &= {s for s in SIGNS if SIGN_MODALITIES[s] == modality.capitalize()}
+        if element is not None:
+            allowed &= {s for s in SIGNS if SIGN_ELEMENTS[s] == element.capitalize()}
+        self.allowed = np.array([s in allowed for s in SIGNS])
+
+    def evaluate(self, samples):
+        lon = _point_lon(samples, self.point)
+        in_sign = lon % 30
+        margin = np.minimum(in_sign, 30 - in_sign)
+        return self.allowed[(lon // 30).astype(int) % 12], margin / _point_rate(samples, self.point)
+
+
+class AspectBetween(Criterion):
+    """Dois pontos em algum dos aspectos indicados, dentro do orbe."""
+
+    def __init__(self, point1, point2, aspects=tuple(ASPECTS), orb=DEFAULT_ASPECT_ORB):
+        self.point1 = point1
+        self.point2 = point2
+        self.angles = np.array([ASPECTS[name][0] for name in aspects], dtype=float)
+        self.orb = orb
+
+    def evaluate(self, samples):
+        separation = angular_separation(_point_lon(samples, self.point1), _point_lon(samples, self.point2))
+        deviation = np.abs(separation[:, None] - self.angles[None, :])
+        within = deviation <= self.orb
+
+        values = within.any(axis=1)
+        margin = np.where(values, (self.orb - deviation).max(axis=1), (deviation - self.orb).min(axis=1))
+        rate = _point_rate(samples, self.point1) + _point_rate(samples, self.point2)
+        return values, margin / rate
+
+
+def NoAspect(point, aspects=HARD_ASPECTS, from_points=ASPECT_POINTS, orb=DEFAULT_ASPECT_ORB):
+    """Nenhum ponto de `from_points` em aspecto (por padrão, tenso) com `point`."""
+    return ~AnyOf(*[AspectBetween(other, point, aspects, orb) for other in from_points if other != point])
+
+
+# =============================================================================
+# MOTOR DE BUSCA
+# =============================================================================
+
+
+def _search_window(args):
+    """Tarefa de um processo: busca grossa-para-fina numa sub-janela."""
+    criteria, latitude, longitude, jd_start, jd_end, coarse_step, resolution = args
+    sampler = EphemerisSampler(jd_start, jd_end, NATAL_POINTS_CALCULABLE, latitude, longitude)
+
+    knots = np.append(np.arange(jd_start, jd_end, coarse_step), jd_end)
+    values, safe = criteria.evaluate(sampler.sample(knots))
+
+    while True:
+        width = np.diff(knots)
+        certain = (values[:-1] == values[1:]) & (safe[:-1] + safe[1:] >= width)
+        uncertain = ~certain & (width > resolution)
+        if not uncertain.any():
+            break
+        # Todos os pontos médios incertos do nível são avaliados num único lote
+        mids = (knots[:-1][uncertain] + knots[1:][uncertain]) / 2
+        mid_values, mid_safe = criteria.evaluate(sampler.sample(mids))
+        knots = np.concatenate([knots, mids])
+        order = np.argsort(knots, kind='stable')
+        knots = knots[order]
+        values = np.concatenate([values, mid_values])[order]
+        safe = np.concatenate([safe, mid_safe])[order]
+
+    # Fronteiras no meio do último intervalo refinado (erro ≤ resolução / 2)
+    changes = np.nonzero(values[1:] != values[:-1])[0]
+    boundaries = (knots[changes] + knots[changes + 1]) / 2
+    edges = np.concatenate([[jd_start], boundaries, [jd_end]])
+    run_values = np.concatenate([[values[0]], values[changes + 1]])
+    return [(float(edges[i]), float(edges[i + 1])) for i in np.nonzero(run_values)[0]]
+
+
+class ElectionalSearch:
+    """
+    Busca eletiva: encontra as janelas de tempo, num local fixo, em que todos
+    os critérios da DSL são satisfeitos. Ex.:
+
+        criteria = MoonWaxing() & MoonNotVoid() & SignOf('Asc', modality='Fixed') & NoAspect('Mars')
+        windows = ElectionalSearch(lat, lon).search(criteria, jd_start, jd_start + 90)
+
+    Começa numa grade grossa; intervalos cujo valor não pode mudar (pelos
+    limites de velocidade dos planetas) são podados e só os demais são
+    subdivididos até `resolution`. Sub-janelas rodam em processos paralelos.
+    """
+
+    def __init__(self, latitude, longitude):
+        self.latitude = latitude
+        self.longitude = longitude
+
+    def search(self, criteria, jd_start, jd_end, coarse_step=ELECTIONAL_COARSE_STEP_DAYS,
+               resolution=ELECTIONAL_RESOLUTION_DAYS, subwindow_days=ELECTIONAL_SUBWINDOW_DAYS, workers=None):
+        """Retorna a lista de janelas (jd_inicio, jd_fim) em ordem cronológica."""
+        edges = np.append(np.arange(jd_start, jd_end, subwindow_days), jd_end)
+        tasks = [(criteria, self.latitude, self.longitude, float(a), float(b), coarse_step, resolution)
+                 for a, b in zip(edges[:-1], edges[1:])]
+
+        if len(tasks) <= 1 or workers == 1:
+            results = [_search_window(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+                results = list(executor.map(_search_window, tasks))
+
+        # Junta janelas que continuam de uma sub-janela para a seguinte
+        windows = []
+        for start, end in (w for result in results for w in result):
+            if windows and start <= windows[-1][1]:
+                windows[-1] = (windows[-1][0], end)
+            else:
+                windows.append((start, end))
+        return windows
+
+    def best_windows(self, criteria, jd_start, jd_end, top_n=5, **kwargs):
+        """As `top_n` janelas mais longas, das maiores para as menores."""
+        windows = self.search(criteria, jd_start, jd_end, **kwargs)
+        return sorted(windows, key=lambda w: w[1] - w[0], reverse=True)[:top_n]
@@ -0,0 +1,168 @@
+import datetime
+
+import swisseph as swe
+import numpy as np
+import pytz
+
+from .angular_math import signed_difference
+
+SWE_POINTS_MAP = {
+    'Sun': swe.SUN, 'Moon': swe.MOON, 'Mercury': swe.MERCURY,
+    'Venus': swe.VENUS, 'Mars': swe.MARS, 'Jupiter': swe.JUPITER,
+    'Saturn': swe.SATURN, 'Uranus': swe.URANUS, 'Neptune': swe.NEPTUNE,
+    'Pluto': swe.PLUTO, 'True Node': swe.MEAN_NODE # Ou swe.TRUE_NODE se preferir
+}
+
+DEFAULT_FLAGS = swe.FLG_SWIEPH | swe.FLG_SPEED
+SIDEREAL_DEGREES_PER_DAY = 360.98564736629
+
+
+def jd_to_datetime(jd, timezone_id):
+    """Converte um Dia Juliano (UT) em datetime localizado no fuso `timezone_id`."""
+    year, month, day, hour = swe.revjul(jd)
+    utc_date = datetime.datetime(year, month, day, tzinfo=pytz.utc) + datetime.timedelta(seconds=round(hour * 3600))
+    return utc_date.astimezone(pytz.timezone(timezone_id))
+
+
+def sample_positions(jds, names, flags=DEFAULT_FLAGS):
+    """
+    Amostra longitudes e velocidades de vários pontos em vários instantes.
+    Retorna dois arrays (T, P): longitudes (graus) e velocidades (graus/dia).
+    Pontos sem correspondência no Swiss Ephemeris ficam como NaN.
+    """
+    jds = np.atleast_1d(np.asarray(jds, dtype=float))
+    lons = np.full((len(jds), len(names)), np.nan)
+    speeds = np.full((len(jds), len(names)), np.nan)
+
+    for p, name in enumerate(names):
+        swe_id = SWE_POINTS_MAP.get(name)
+        if swe_id is None:
+            continue
+        for t, jd in enumerate(jds):
+            xx = swe.calc_ut(jd, swe_id, flags)[0]
+            lons[t, p] = xx[0]
+            speeds[t, p] = xx[3]
+    return lons, speeds
+
+
+def sample_coordinates(jds, names, flags=DEFAULT_FLAGS):
+    """
+    Como `sample_positions`, mas com as coordenadas completas: uma chamada
+    eclíptica e uma equatorial (FLG_EQUATORIAL) por ponto e instante.
+    Retorna quatro arrays (T, P): longitudes, velocidades, latitudes
+    eclípticas e declinações. Pontos sem correspondência ficam como NaN.
+    """
+    jds = np.atleast_1d(np.asarray(jds, dtype=float))
+    lons, speeds, lats, decs = (np.full((len(jds), len(names)), np.nan) for _ in range(4))
+
+    for p, name in enumerate(names):
+        swe_id = SWE_POINTS_MAP.get(name)
+        if swe_id is None:
+            continue
+        for t, jd in enumerate(jds):
+            xx = swe.calc_ut(jd, swe_id, flags)[0]
+            lons[t, p], lats[t, p], speeds[t, p] = xx[0], xx[1], xx[3]
+            decs[t, p] = swe.calc_ut(jd, swe_id, flags | swe.FLG_EQUATORIAL)[0][1]
+    return lons, speeds, lats, decs
+
+
+def interpolate_positions(sample_jds, sample_lons, sample_speeds, query_jds):
+    """
+    Interpola longitudes amostradas (T, P) em novos instantes usando Hermite
+    cúbico com as velocidades do próprio Swiss Ephemeris como derivadas.
+    Com amostras diárias o erro fica bem abaixo de um segundo de arco para
+    todos os planetas, inclusive a Lua. Retorna (longitudes, velocidades) (Q, P).
+    """
+    sample_jds = np.asarray(sample_jds, dtype=float)
+    query_jds = np.asarray(query_jds, dtype=float)
+
+    idx = np.clip(np.searchsorted(sample_jds, query_jds, side='right') - 1, 0, len(sample_jds) - 2)
+    t0 = sample_jds[idx]
+    h = (sample_jds[idx + 1] - t0)[:, None]
+    s = ((query_jds - t0)[:, None]) / h
+
+    lon0 = sample_lons[idx]
+    # Desenrola o intervalo para que o cruzamento de 0/360 não quebre a interpolação
+    delta = signed_difference(sample_lons[idx + 1], lon0)
+    v0 = sample_speeds[idx] * h
+    v1 = sample_speeds[idx + 1] * h
+
+    s2, s3 = s * s, s * s * s
+    h10 = s3 - 2 * s2 + s
+    h01 = -2 * s3 + 3 * s2
+    h11 = s3 - s2
+    lons = (lon0 + h10 * v0 + h01 * delta + h11 * v1) % 360
+
+    # Derivada do polinômio de Hermite (graus/dia)
+    d10 = 3 * s2 - 4 * s + 1
+    d01 = -6 * s2 + 6 * s
+    d11 = 3 * s2 - 2 * s
+    speeds = (d10 * v0 + d01 * delta + d11 * v1) / h
+    return lons, speeds
+
+
+def sidereal_armc(jds, longitude, jd_reference=None):
+    """
+    ARMC (tempo sideral local em graus) vetorizado: um único swe.sidtime na
+    referência e a taxa sideral constante a partir dela. A variação da nutação
+    ao longo de alguns meses é desprezível para a escala de minutos.
+    """
+    jds = np.asarray(jds, dtype=float)
+    if jd_reference is None:
+        jd_reference = float(np.min(jds))
+    base = swe.sidtime(jd_reference) * 15 + longitude
+    return (base + SIDEREAL_DEGREES_PER_DAY * (jds - jd_reference)) % 360
+
+
+def ascendant_from_armc(armc, latitude, eps):
+    """Longitude do Ascendente a partir do ARMC, latitude geográfica e obliquidade (vetorizado)."""
+    r, e, f = np.radians(armc), np.radians(eps), np.radians(latitude)
+    return np.degrees(np.arctan2(np.cos(r), -(np.sin(r) * np.cos(e) + np.tan(f) * np.sin(e)))) % 360
+
+
+def mc_from_armc(armc, eps):
+    """Longitude do Meio do Céu a partir do ARMC e da obliquidade (vetorizado)."""
+    r, e = np.radians(armc), np.radians(eps)
+    return np.degrees(np.arctan2(np.sin(r), np.cos(r) * np.cos(e))) % 360
+
+
+class EphemerisSampler:
+    """
+    Amostrador vetorizado para buscas em janelas de tempo: as efemérides são
+    calculadas uma vez por dia na janela e qualquer conjunto de instantes é
+    obtido por interpolação de Hermite; Ascendente e MC vêm das fórmulas
+    analíticas sobre o ARMC, sem chamar swe.houses por amostra.
+    """
+
+    def __init__(self, jd_start, jd_end, points, latitude=None, longitude=None):
+        self.points = list(points)
+        self.latitude = latitude
+        self.longitude = longitude
+        self.jd_start = jd_start
+
+        self.sample_jds = np.arange(np.floor(jd_start) - 1, np.ceil(jd_end) + 2)
+        self.sample_lons, self.sample_speeds = sample_positions(self.sample_jds, self.points)
+        self.eps = swe.calc_ut(jd_start, swe.ECL_NUT)[0][0]
+
+    def sample(self, jds, with_angles=True):
+        """
+        Retorna um dicionário com 'jds', 'lons' e 'speeds' {nome: (T,)} e,
+        se houver local, 'asc', 'mc' e 'asc_speed' (graus/dia) por instante.
+        """
+        jds = np.asarray(jds, dtype=float)
+        lons, speeds = interpolate_positions(self.sample_jds, self.sample_lons, self.sample_speeds, jds)
+        samples = {
+            'jds': jds,
+            'lons': {name: lons[:, p] for p, name in enumerate(self.points)},
+            'speeds': {name: speeds[:, p] for p, name in enumerate(self.points)},
+        }
+        if with_angles and self.latitude is not None:
+            armc = sidereal_armc(jds, self.longitude, self.jd_start)
+            samples['asc'] = ascendant_from_armc(armc, self.latitude, self.eps)
+            samples['mc'] = mc_from_armc(armc, self.eps)
+            # Velocidade do Ascendente por diferença central no ARMC (1 minuto de tempo)
+            step = SIDEREAL_DEGREES_PER_DAY / 1440
+            ahead = ascendant_from_armc(armc + step, self.latitude, self.eps)
+            behind = ascendant_from_armc(armc - step, self.latitude, self.eps)
+            samples['asc_speed'] = signed_difference(ahead, behind) / (2 / 1440)
+        return samples
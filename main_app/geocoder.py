@@ -0,0 +1,178 @@
+import threading
+import time
+from collections import OrderedDict
+
+from geopy.adapters import RequestsAdapter, get_retry_after
+from geopy.exc import GeocoderServiceError, GeocoderUnavailable, GeocoderTimedOut
+from geopy.geocoders import Nominatim
+
+from .constants import (
+    GEOCODER_USER_AGENT, GEOCODER_DOMAIN, GEOCODER_SCHEME, GEOCODER_RATE_PER_SECOND, GEOCODER_BURST,
+    GEOCODER_TIMEOUT_SECONDS, GEOCODER_MAX_RETRIES, GEOCODER_BACKOFF_SECONDS, GEOCODER_POOL_SIZE,
+    GEOCODER_CACHE_SIZE
+)
+
+
+class TokenBucket:
+    """
+    Balde de fichas compartilhado entre threads: `rate` fichas por segundo,
+    no máximo `capacity` acumuladas. `acquire` bloqueia até haver uma ficha
+    e dorme fora do lock, então esperas longas não travam as outras threads.
+    """
+
+    def __init__(self, rate=GEOCODER_RATE_PER_SECOND, capacity=GEOCODER_BURST, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Consome uma ficha, esperando o necessário. Retorna o tempo esperado (s)."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class _InFlight:
+    """Uma consulta em andamento: quem chega depois espera o mesmo resultado."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def normalize_query(query):
+    """Chave de coalescência e cache: sem diferença de caixa e de espaços."""
+    return " ".join(query.split()).casefold()
+
+
+def _is_retryable(error):
+    """
+    Erros transitórios: 408, 429, 5xx, timeout e falhas de conexão. A decisão
+    vem do status HTTP quando houver resposta, porque o geopy levanta o
+    GeocoderServiceError genérico também para 4xx sem classe própria (404, 410...).
+    """
+    status = getattr(error.__cause__, 'status_code', None)
+    if status is not None:
+        return status in (408, 429) or status >= 500
+    return isinstance(error, (GeocoderTimedOut, GeocoderUnavailable)) or type(error) is GeocoderServiceError
+
+
+def _retry_after(error):
+    """Segundos pedidos pelo servidor no Retry-After da resposta de erro (0 se ausente)."""
+    retry_after = getattr(error, 'retry_after', None)
+    if retry_after is None and getattr(error.__cause__, 'headers', None) is not None:
+        retry_after = get_retry_after(error.__cause__.headers)
+    return retry_after or 0
+
+
+class GeocoderClient:
+    """
+    Cliente Nominatim para várias threads/usuários ao mesmo tempo:
+    - todas as requisições passam por um único TokenBucket (1/s por padrão,
+      a política de uso do Nominatim público);
+    - consultas iguais simultâneas viram uma só requisição em voo, e as
+      demais threads recebem o mesmo resultado (ou a mesma exceção);
+    - respostas ficam num cache LRU, como o de casas em AstrologicalData;
+    - a sessão `requests` do geopy é reaproveitada (keep-alive, pool de
+      conexões) com timeout; as repetições em 429/5xx/timeout são feitas
+      aqui e não no urllib3, então cada tentativa também consome uma ficha
+      do balde e espera o Retry-After (ou o backoff exponencial).
+    `domain` e `scheme` permitem apontar para outro servidor (ex.:
+    StubNominatimServer nos testes, ou uma instância própria do Nominatim).
+    """
+
+    def __init__(self, domain=GEOCODER_DOMAIN, scheme=GEOCODER_SCHEME, user_agent=GEOCODER_USER_AGENT,
+                 rate=GEOCODER_RATE_PER_SECOND, burst=GEOCODER_BURST, timeout=GEOCODER_TIMEOUT_SECONDS,
+                 max_retries=GEOCODER_MAX_RETRIES, backoff=GEOCODER_BACKOFF_SECONDS,
+                 pool_size=GEOCODER_POOL_SIZE, cache_size=GEOCODER_CACHE_SIZE, bucket=None):
+        def adapter_factory(proxies, ssl_context):
+            # Sem repetições no urllib3: elas sairiam sem passar pelo balde de fichas
+            return RequestsAdapter(proxies=proxies, ssl_context=ssl_context, pool_connections=1,
+                                   pool_maxsize=pool_size, max_retries=0)
+
+        self.geolocator = Nominatim(user_agent=user_agent, domain=domain, scheme=scheme, timeout=timeout,
+                                    adapter_factory=adapter_factory)
+        self.bucket = bucket or TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.cache_size = cache_size
+        self.requests_sent = 0
+        self._cache = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def geocode(self, query):
+        """Location do geopy para `query`, ou None se não encontrada. Erros de rede são propagados."""
+        key = normalize_query(query)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            pending = self._in_flight.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._in_flight[key] = _InFlight()
+
+        if not leader:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.result
+
+        try:
+            pending.result = self._request(query)
+        except Exception as e:
+            pending.error = e
+            raise
+        else:
+            with self._lock:
+                self._cache[key] = pending.result
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            return pending.result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            pending.done.set()
+
+    def _request(self, query):
+        """Consulta o servidor, repetindo erros transitórios; toda tentativa passa pelo balde."""
+        delay = 0
+        for attempt in range(self.max_retries + 1):
+            if delay:
+                time.sleep(delay)
+            self.bucket.acquire()
+            with self._lock:
+                self.requests_sent += 1
+            try:
+                return self.geolocator.geocode(query)
+            except GeocoderServiceError as e:
+                if attempt == self.max_retries or not _is_retryable(e):
+                    raise
+                delay = max(self.backoff * 2 ** attempt, _retry_after(e))
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def default_geocoder():
+    """Cliente compartilhado pelo processo inteiro, para que o limite de taxa seja global."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = GeocoderClient()
+        return _default_client
@@ -0,0 +1,108 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from .geocoder import normalize_query
+
+# Lugares respondidos por padrão: consulta normalizada -> (latitude, longitude, nome completo)
+DEFAULT_STUB_PLACES = {
+    "são paulo": (-23.5506507, -46.6333824, "São Paulo, Região Metropolitana de São Paulo, Brasil"),
+    "rio de janeiro": (-22.9110137, -43.2093727, "Rio de Janeiro, Região Sudeste, Brasil"),
+    "lisboa": (38.7077507, -9.1365919, "Lisboa, Portugal"),
+    "london": (51.5074456, -0.1277653, "London, Greater London, England, United Kingdom"),
+}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Responde /search como o Nominatim (format=json) a partir dos lugares do servidor."""
+
+    def do_GET(self):
+        stub = self.server.stub
+        url = urlsplit(self.path)
+        query = parse_qs(url.query).get('q', [''])[0]
+        status = stub._record(query)
+        if stub.delay:
+            time.sleep(stub.delay)
+
+        if status == 503 or status == 429:
+            self._send(status, {'error': 'stub'}, {'Retry-After': '0'})
+        elif status != 200:
+            self._send(status, {'error': 'stub'})
+        elif url.path.rstrip('/') != '/search':
+            self._send(404, {'error': 'not found'})
+        else:
+            place = stub.places.get(normalize_query(query))
+            results = [] if place is None else [{
+                'place_id': abs(hash(query)) % 10 ** 8, 'lat': str(place[0]), 'lon': str(place[1]),
+                'display_name': place[2], 'class': 'place', 'type': 'city', 'importance': 0.8,
+                'boundingbox': [str(place[0] - 0.1), str(place[0] + 0.1), str(place[1] - 0.1), str(place[1] + 0.1)],
+            }]
+            self._send(200, results)
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # Silencioso: os testes inspecionam `requests_log`
+
+
+class StubNominatimServer:
+    """
+    Servidor local que imita o /search do Nominatim, para exercitar o
+    GeocoderClient sem rede: conta e registra o instante de cada requisição
+    (para conferir o limite de taxa e a coalescência), pode atrasar as
+    respostas (`delay`) e devolver `failures` erros (`failure_status`, 503
+    por padrão) antes de responder normalmente (para as repetições).
+    Funciona como gerenciador de contexto:
+
+        with StubNominatimServer() as stub:
+            client = GeocoderClient(domain=stub.domain, scheme='http')
+    """
+
+    def __init__(self, places=None, delay=0.0, failures=0, failure_status=503, host='127.0.0.1', port=0):
+        self.places = {normalize_query(name): place for name, place in (places or DEFAULT_STUB_PLACES).items()}
+        self.delay = delay
+        self.failures = failures
+        self.failure_status = failure_status
+        self.requests_log = [] # (instante monotônico, consulta, status)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def domain(self):
+        host, port = self._server.server_address[:2]
+        return f"{host}:{port}"
+
+    def _record(self, query):
+        with self._lock:
+            status = self.failure_status if self.failures > 0 else 200
+            self.failures = max(0, self.failures - 1)
+            self.requests_log.append((time.monotonic(), query, status))
+            return status
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,247 @@
+import datetime
+import threading
+from collections import OrderedDict
+
+import swisseph as swe
+import numpy as np
+
+from .constants import (
+    HORARY_POINTS_CALCULABLE, HOUSE_SYSTEMS, HORARY_BUFFER_MINUTES, HORARY_REFRESH_SECONDS,
+    HORARY_MAX_LOCATIONS
+)
+from .ephemeris import sample_coordinates, interpolate_positions
+
+MINUTES_PER_DAY = 1440
+
+
+def current_jd():
+    """Dia Juliano (UT) do instante atual, com segundos."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return swe.julday(now.year, now.month, now.day,
+                      now.hour + now.minute / 60 + (now.second + now.microsecond / 1e6) / 3600)
+
+
+def _minute_of(jd):
+    """Número do minuto (UT) que contém `jd`, contado desde o início da escala juliana."""
+    return int(np.floor(jd * MINUTES_PER_DAY + 1e-6))
+
+
+class _LocationBuffer:
+    """
+    Buffer circular de um local: um slot por minuto, no índice
+    minuto % capacidade, com as posições e as cúspides daquele minuto.
+    Um slot só vale para o minuto gravado em `minutes`; o resto é lixo antigo.
+    """
+
+    def __init__(self, latitude, longitude, timezone_id, house_system, capacity):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.timezone_id = timezone_id
+        self.house_system = house_system
+        self.capacity = capacity
+        self.minutes = np.full(capacity, -1, dtype=np.int64)
+        self.lons = np.full((capacity, len(HORARY_POINTS_CALCULABLE)), np.nan)
+        self.speeds = np.full((capacity, len(HORARY_POINTS_CALCULABLE)), np.nan)
+        self.lats = np.full((capacity, len(HORARY_POINTS_CALCULABLE)), np.nan)
+        self.decs = np.full((capacity, len(HORARY_POINTS_CALCULABLE)), np.nan)
+        self.cusps = np.full((capacity, 12), np.nan)
+        self.ascmc = np.full((capacity, 8), np.nan)
+        self.lock = threading.Lock()
+
+    def missing(self, minutes):
+        with self.lock:
+            return [m for m in minutes if self.minutes[m % self.capacity] != m]
+
+    def fill(self, minutes):
+        """Calcula e grava os minutos pedidos (fora do lock; só a gravação é travada)."""
+        if not minutes:
+            return 0
+        jds = np.array(minutes, dtype=float) / MINUTES_PER_DAY
+        lons, speeds, lats, decs = sample_coordinates(jds, HORARY_POINTS_CALCULABLE)
+        code = HOUSE_SYSTEMS[self.house_system]
+        cusps, ascmc = [], []
+        for jd in jds:
+            # Mesmo caminho de AstrologicalData.calculate_houses_all (ARMC aparente e obliquidade verdadeira)
+            armc = (swe.sidtime(jd) * 15 + self.longitude) % 360
+            eps = swe.calc_ut(jd, swe.ECL_NUT)[0][0]
+            house_cusps, house_ascmc = swe.houses_armc(armc, self.latitude, eps, code)
+            cusps.append(house_cusps[:12])
+            ascmc.append(house_ascmc[:8])
+
+        slots = np.array(minutes) % self.capacity
+        with self.lock:
+            self.lons[slots], self.speeds[slots] = lons, speeds
+            self.lats[slots], self.decs[slots] = lats, decs
+            self.cusps[slots], self.ascmc[slots] = cusps, ascmc
+            self.minutes[slots] = minutes
+        return len(minutes)
+
+    def read(self, minute):
+        """Cópia do slot do minuto, ou None se ele não estiver no buffer."""
+        slot = minute % self.capacity
+        with self.lock:
+            if self.minutes[slot] != minute:
+                return None
+            return (self.lons[slot].copy(), self.speeds[slot].copy(), self.lats[slot].copy(),
+                    self.decs[slot].copy(), tuple(self.cusps[slot]), tuple(self.ascmc[slot]))
+
+
+class HoraryService:
+    """
+    Mapas horários instantâneos para locais fixos (ex.: o escritório).
+    Para cada local registrado, uma thread em segundo plano mantém
+    pré-calculados os mapas de cada minuto das próximas `horizon_minutes`
+    num buffer circular (posições e cúspides), então um pedido de horária
+    não geocodifica, não chama o Swiss Ephemeris e só monta o dicionário.
+    Com `exact=True` o mapa é refinado ao segundo: as posições são
+    interpoladas (Hermite) entre os dois minutos vizinhos e as casas
+    recalculadas no instante exato.
+    Locais fixados (`pinned`, ex.: HORARY_PRESET_LOCATIONS) ficam até serem
+    removidos; dos demais ficam só os `max_locations` usados mais
+    recentemente, para que cada local digitado não custe pré-cálculo para sempre.
+    """
+
+    def __init__(self, astrological_data, horizon_minutes=HORARY_BUFFER_MINUTES,
+                 refresh_seconds=HORARY_REFRESH_SECONDS, max_locations=HORARY_MAX_LOCATIONS):
+        self.astrological_data = astrological_data
+        self.horizon_minutes = horizon_minutes
+        self.refresh_seconds = refresh_seconds
+        self.max_locations = max_locations
+        self._buffers = OrderedDict() # Do menos ao mais recentemente usado
+        self._pinned = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- Locais ---
+
+    def add_location(self, key, latitude, longitude, timezone_id, house_system='Regiomontanus', pinned=False):
+        """
+        Registra um local (ex.: o texto digitado na interface) e acorda a thread
+        de pré-cálculo. Sem `pinned` (e se a chave já não estiver fixada), o
+        local não fixado menos usado é removido quando passam de
+        `max_locations`. Retorna as chaves removidas.
+        """
+        with self._lock:
+            self._buffers[key] = _LocationBuffer(latitude, longitude, timezone_id, house_system,
+                                                 self.horizon_minutes + 1)
+            self._buffers.move_to_end(key)
+            if pinned:
+                self._pinned.add(key)
+            unpinned = [k for k in self._buffers if k not in self._pinned]
+            evicted = unpinned[:max(0, len(unpinned) - self.max_locations)]
+            for k in evicted:
+                del self._buffers[k]
+        self._wake.set()
+        return evicted
+
+    def remove_location(self, key):
+        """Remove um local e o seu buffer (a thread de pré-cálculo deixa de atualizá-lo)."""
+        with self._lock:
+            self._pinned.discard(key)
+            return self._buffers.pop(key, None) is not None
+
+    def has_location(self, key):
+        with self._lock:
+            return key in self._buffers
+
+    def location(self, key):
+        """(latitude, longitude, fuso) de um local registrado."""
+        buffer = self._buffer(key)
+        return buffer.latitude, buffer.longitude, buffer.timezone_id
+
+    def _buffer(self, key):
+        with self._lock:
+            self._buffers.move_to_end(key)
+            return self._buffers[key]
+
+    # --- Pré-cálculo ---
+
+    def fill(self, key, jd=None):
+        """Completa o buffer do local do minuto de `jd` (agora) em diante. Retorna quantos minutos calculou."""
+        return self._fill_buffer(self._buffer(key), jd)
+
+    def _fill_buffer(self, buffer, jd=None):
+        first = _minute_of(current_jd() if jd is None else jd)
+        return buffer.fill(buffer.missing(range(first, first + self.horizon_minutes + 1)))
+
+    def start(self):
+        """Inicia a thread que mantém os buffers de todos os locais em dia."""
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Cópia dos buffers: um local removido no meio da volta só é descartado na próxima
+            with self._lock:
+                buffers = list(self._buffers.values())
+            for buffer in buffers:
+                self._fill_buffer(buffer)
+            self._wake.wait(self.refresh_seconds)
+            self._wake.clear()
+
+    # --- Consulta ---
+
+    def chart(self, key, house_system=None, exact=False, jd=None):
+        """
+        Mapa horário do local `key` no instante `jd` (agora, se None), como
+        (dados do mapa, erro). Sem `exact`, o mapa é o do minuto corrente,
+        como em AstrologicalData.calculate_chart_data; minutos fora do
+        buffer são calculados na hora.
+        """
+        if not self.has_location(key):
+            return None, "Local não registrado no serviço de horária."
+        try:
+            buffer = self._buffer(key)
+            jd = current_jd() if jd is None else jd
+            house_system = house_system or buffer.house_system
+            minute = _minute_of(jd)
+            needed = [minute, minute + 1] if exact else [minute]
+            slots = [buffer.read(m) for m in needed]
+            if any(slot is None for slot in slots):
+                # Fora do buffer (a thread ainda não chegou, ou instante passado): calcula só para
+                # este pedido, sem sobrescrever os minutos futuros do buffer compartilhado
+                scratch = _LocationBuffer(buffer.latitude, buffer.longitude, buffer.timezone_id,
+                                          buffer.house_system, len(needed))
+                scratch.fill(needed)
+                slots = [scratch.read(m) for m in needed]
+
+            lons, speeds, lats, decs, cusps, ascmc = slots[0]
+            houses_by_system = {buffer.house_system: (cusps, ascmc)}
+            if exact:
+                minute_jds = np.array(needed, dtype=float) / MINUTES_PER_DAY
+                lons, speeds = interpolate_positions(
+                    minute_jds, np.stack([slots[0][0], slots[1][0]]) % 360,
+                    np.stack([slots[0][1], slots[1][1]]), np.array([jd])
+                )
+                lons, speeds = lons[0] % 360, speeds[0]
+                # Latitude e declinação variam devagar: interpolação linear entre os dois minutos
+                fraction = (jd - minute_jds[0]) / (minute_jds[1] - minute_jds[0])
+                lats = slots[0][2] + (slots[1][2] - slots[0][2]) * fraction
+                decs = slots[0][3] + (slots[1][3] - slots[0][3]) * fraction
+                houses_by_system = self.astrological_data.calculate_houses_all(
+                    jd, buffer.latitude, buffer.longitude, [buffer.house_system]
+                )
+            else:
+                jd = minute / MINUTES_PER_DAY
+            if house_system not in houses_by_system:
+                houses_by_system = {**houses_by_system, **self.astrological_data.calculate_houses_all(
+                    jd, buffer.latitude, buffer.longitude, [house_system]
+                )}
+
+            return self.astrological_data.chart_from_samples(
+                'horary', house_system, jd, buffer.latitude, buffer.longitude, buffer.timezone_id,
+                HORARY_POINTS_CALCULABLE, lons, speeds, houses_by_system, lats=lats, decs=decs
+            ), None
+
+        except Exception as e:
+            return None, f"Erro inesperado no cálculo astrológico: {e}"
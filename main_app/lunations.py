@@ -0,0 +1,229 @@
+import os
+import tempfile
+import threading
+
+import swisseph as swe
+import numpy as np
+
+from .constants import (
+    LUNATION_KINDS, ECLIPSE_TYPES, LUNATION_CACHE_DIR, LUNATION_CACHE_VERSION,
+    LUNATION_STEP_DAYS, LUNATION_HIT_ORB_DEGREES, LUNATION_HITS_CHUNK, LUNATION_NATAL_POINTS
+)
+from .angular_math import signed_difference, longitudes_array
+from .ephemeris import EphemerisSampler
+
+# Bits do Swiss Ephemeris -> índice em ECLIPSE_TYPES (o primeiro bit presente vence)
+_SOLAR_ECLIPSE_FLAGS = [(swe.ECL_ANNULAR_TOTAL, 3), (swe.ECL_TOTAL, 1), (swe.ECL_ANNULAR, 2), (swe.ECL_PARTIAL, 4)]
+_LUNAR_ECLIPSE_FLAGS = [(swe.ECL_TOTAL, 5), (swe.ECL_PARTIAL, 6), (swe.ECL_PENUMBRAL, 7)]
+_TABLE_FIELDS = ('jds', 'kinds', 'lons', 'signs', 'eclipses', 'eclipse_jds')
+
+
+def lunation_events(jd_start, jd_end, step=LUNATION_STEP_DAYS):
+    """
+    Luas Novas e Cheias entre `jd_start` e `jd_end`. A elongação Lua-Sol é
+    amostrada numa grade vetorizada; os cruzamentos de 0° e 180° são
+    refinados por três iterações de Newton sobre as efemérides interpoladas.
+    Retorna arrays ordenados por tempo: 'jds', 'kinds' (índices de
+    LUNATION_KINDS), 'lons' (longitude da Lua) e 'signs'.
+    """
+    sampler = EphemerisSampler(jd_start, jd_end, ['Sun', 'Moon'])
+    grid = np.append(np.arange(jd_start, jd_end, step), jd_end)
+    samples = sampler.sample(grid, with_angles=False)
+    elongation = (samples['lons']['Moon'] - samples['lons']['Sun']) % 360
+
+    # g = elongação - alvo cruza zero subindo (a elongação só cresce)
+    targets = np.array([0.0, 180.0])
+    g = signed_difference(elongation[:, None], targets[None, :]) # (T, 2)
+    crossing = (g[:-1] < 0) & (g[1:] >= 0) & (g[1:] - g[:-1] < 90)
+    t, kinds = np.nonzero(crossing)
+    jds = grid[t] + (-g[t, kinds]) / (g[t + 1, kinds] - g[t, kinds]) * step
+
+    for _ in range(3):
+        refined = sampler.sample(jds, with_angles=False)
+        residual = signed_difference(refined['lons']['Moon'] - refined['lons']['Sun'], targets[kinds])
+        jds = jds - residual / (refined['speeds']['Moon'] - refined['speeds']['Sun'])
+
+    # A grade inclui as duas pontas; descarta o que o refinamento empurrou para fora da janela
+    inside = (jds >= jd_start) & (jds < jd_end)
+    jds, kinds = jds[inside], kinds[inside]
+    order = np.argsort(jds)
+    jds, kinds = jds[order], kinds[order]
+    lons = sampler.sample(jds, with_angles=False)['lons']['Moon'] % 360
+    return {'jds': jds, 'kinds': kinds.astype(np.int8), 'lons': lons, 'signs': (lons // 30).astype(np.int8)}
+
+
+def eclipse_events(jd_start, jd_end):
+    """
+    Eclipses solares e lunares (globais) entre `jd_start` e `jd_end`, pelo
+    Swiss Ephemeris. Retorna uma lista de (jd do máximo, índice de ECLIPSE_TYPES).
+    """
+    eclipses = []
+    for when, type_flags in ((swe.sol_eclipse_when_glob, _SOLAR_ECLIPSE_FLAGS),
+                             (swe.lun_eclipse_when, _LUNAR_ECLIPSE_FLAGS)):
+        jd = jd_start
+        while True:
+            retflags, tret = when(jd, swe.FLG_SWIEPH)
+            if tret[0] >= jd_end:
+                break
+            eclipse_type = next((index for flag, index in type_flags if retflags & flag), 0)
+            eclipses.append((tret[0], eclipse_type))
+            jd = tret[0] + 1 # Dois eclipses do mesmo tipo ficam a pelo menos ~1 lunação
+    return sorted(eclipses)
+
+
+def lunation_table(jd_start, jd_end):
+    """
+    Tabela de lunações da janela com a classificação de eclipse: cada
+    eclipse é associado à lunação mais próxima (o máximo fica a poucas horas
+    da sizígia). Acrescenta 'eclipses' (índices de ECLIPSE_TYPES, 0 = nenhum)
+    e 'eclipse_jds' (instante do máximo, NaN sem eclipse).
+    """
+    table = lunation_events(jd_start, jd_end)
+    table['eclipses'] = np.zeros(len(table['jds']), dtype=np.int8)
+    table['eclipse_jds'] = np.full(len(table['jds']), np.nan)
+    for jd, eclipse_type in eclipse_events(jd_start, jd_end):
+        if not len(table['jds']):
+            break
+        k = int(np.argmin(np.abs(table['jds'] - jd)))
+        if abs(table['jds'][k] - jd) < 1:
+            table['eclipses'][k] = eclipse_type
+            table['eclipse_jds'][k] = jd
+    return table
+
+
+def lunation_hits(lunation_lons, natal_lons, orb=LUNATION_HIT_ORB_DEGREES, chunk=LUNATION_HITS_CHUNK):
+    """
+    Verificação em massa: quais lunações caem (em conjunção) sobre quais
+    pontos natais. `lunation_lons` (L,) e `natal_lons` (N, P), com NaN para
+    pontos ausentes. Processado em blocos de mapas para limitar a memória.
+    Retorna arrays paralelos (lunação, mapa, ponto, orbe) de todos os contatos.
+    """
+    lunation_lons = np.asarray(lunation_lons, dtype=float)
+    natal_lons = np.atleast_2d(np.asarray(natal_lons, dtype=float))
+    lunation_idx, chart_idx, point_idx, orbs = [], [], [], []
+    for start in range(0, len(natal_lons), chunk):
+        block = natal_lons[start:start + chunk]
+        distance = np.abs(signed_difference(block[None, :, :], lunation_lons[:, None, None])) # (L, n, P)
+        l, n, p = np.nonzero(distance <= orb) # NaN nunca passa no teste
+        lunation_idx.append(l)
+        chart_idx.append(n + start)
+        point_idx.append(p)
+        orbs.append(distance[l, n, p])
+    if not orbs:
+        return np.array([], dtype=int), np.array([], dtype=int), np.array([], dtype=int), np.array([])
+    return np.concatenate(lunation_idx), np.concatenate(chart_idx), np.concatenate(point_idx), np.concatenate(orbs)
+
+
+def natal_matrix(charts, points=LUNATION_NATAL_POINTS):
+    """Matriz (N, P) de longitudes natais; 'Asc' e 'MC' vêm dos ângulos do mapa."""
+    matrix = np.array([longitudes_array(chart['point_positions'], points) for chart in charts], dtype=float)
+    matrix = matrix.reshape(len(charts), len(points))
+    for p, name in enumerate(points):
+        if name in ('Asc', 'MC'):
+            matrix[:, p] = [chart[name.lower()] for chart in charts]
+    return matrix
+
+
+class LunationCalendar:
+    """
+    Calendário de lunações e eclipses. As tabelas são calculadas por ano
+    civil (UT), guardadas em memória e, se houver `cache_dir`, também em
+    disco (um .npz por ano), de modo que consultas por intervalo só recortam
+    arrays já prontos com searchsorted. `cache_dir=None` desliga o disco.
+    """
+
+    def __init__(self, cache_dir=LUNATION_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._years = {}
+        self._lock = threading.Lock()
+
+    # --- Tabelas anuais ---
+
+    def year_table(self, year):
+        """Lunações e eclipses do ano (memória, depois disco, depois cálculo)."""
+        with self._lock:
+            table = self._years.get(year)
+        if table is None:
+            table = self._load_year(year)
+            if table is None:
+                table = lunation_table(swe.julday(year, 1, 1, 0.0), swe.julday(year + 1, 1, 1, 0.0))
+                self._save_year(year, table)
+            with self._lock:
+                self._years[year] = table
+        return table
+
+    def precompute(self, first_year, last_year):
+        """Calcula (ou carrega) em segundo plano as tabelas de um intervalo de anos."""
+        def worker():
+            for year in range(first_year, last_year + 1):
+                self.year_table(year)
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        return thread
+
+    def _year_path(self, year):
+        return os.path.join(self.cache_dir, f"lunations_{year}.npz")
+
+    def _load_year(self, year):
+        if self.cache_dir is None or not os.path.exists(self._year_path(year)):
+            return None
+        try:
+            with np.load(self._year_path(year)) as data:
+                if int(data['version']) != LUNATION_CACHE_VERSION:
+                    return None
+                return {field: data[field] for field in _TABLE_FIELDS}
+        except (OSError, ValueError, KeyError):
+            return None # Arquivo corrompido ou de outro formato: recalcula
+
+    def _save_year(self, year, table):
+        """Grava o .npz de forma atômica (arquivo temporário + os.replace)."""
+        if self.cache_dir is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, version=LUNATION_CACHE_VERSION, **table)
+            os.replace(tmp_path, self._year_path(year))
+        except OSError:
+            pass # Sem cache em disco a tabela continua válida em memória
+
+    # --- Consultas ---
+
+    def lunations(self, jd_start, jd_end, eclipses_only=False):
+        """Lunações (e eclipses) no intervalo [jd_start, jd_end), como arrays paralelos."""
+        first_year = swe.revjul(jd_start)[0]
+        last_year = swe.revjul(jd_end)[0]
+        tables = [self.year_table(year) for year in range(first_year, last_year + 1)]
+        merged = {field: np.concatenate([t[field] for t in tables]) for field in _TABLE_FIELDS}
+
+        jds = merged['jds']
+        window = slice(np.searchsorted(jds, jd_start, side='left'), np.searchsorted(jds, jd_end, side='left'))
+        result = {field: values[window] for field, values in merged.items()}
+        if eclipses_only:
+            mask = result['eclipses'] > 0
+            result = {field: values[mask] for field, values in result.items()}
+        return result
+
+    def eclipses(self, jd_start, jd_end):
+        return self.lunations(jd_start, jd_end, eclipses_only=True)
+
+    def natal_hits(self, charts, jd_start, jd_end, orb=LUNATION_HIT_ORB_DEGREES,
+                   points=LUNATION_NATAL_POINTS, eclipses_only=False):
+        """
+        Lunações do intervalo que caem sobre pontos de vários mapas natais.
+        `charts` pode ser uma lista de dicionários de mapa ou uma matriz (N, P)
+        de longitudes já na ordem de `points` (ex.: load_point_matrix).
+        Retorna a tabela do intervalo e os arrays paralelos dos contatos:
+        'lunation' (índice na tabela), 'chart', 'point' e 'orb'.
+        """
+        table = self.lunations(jd_start, jd_end, eclipses_only=eclipses_only)
+        matrix = charts if isinstance(charts, np.ndarray) else natal_matrix(charts, points)
+        lunation_idx, chart_idx, point_idx, orbs = lunation_hits(table['lons'], matrix, orb)
+        return {'table': table, 'points': list(points), 'lunation': lunation_idx,
+                'chart': chart_idx, 'point': point_idx, 'orb': orbs}
+
+
+def describe_lunation(kind, eclipse):
+    """Rótulo de uma lunação, com o tipo de eclipse se houver."""
+    return f"{LUNATION_KINDS[kind]} (Eclipse {ECLIPSE_TYPES[eclipse]})" if eclipse else LUNATION_KINDS[kind]
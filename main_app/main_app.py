@@ -1,14 +1,33 @@
+import csv
+import datetime
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
+import swisseph as swe
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-import matplotlib.pyplot as plt
 from .astrological_data import AstrologicalData
 from PIL import Image, ImageTk
 
 # Importar as classes e constantes dos outros arquivos
 from .astrological_data import AstrologicalData
 from .chart_renderer import ChartRenderer
-from .constants import PLANET_UNICODE_SYMBOLS # Para símbolos na aba de detalhes
+from .tk_chart_renderer import TkChartRenderer
+from .chart_inspector import MatplotlibChartInspector, TkChartInspector
+from .chart_grid_renderer import ChartGridRenderer
+from .chart_export import export_charts
+from .void_of_course import VoidOfCourseCalendar, MOON_ASPECT_PLANETS
+from .lunations import LunationCalendar, describe_lunation
+from .horary_service import HoraryService
+from .planetary_hours import PlanetaryHours
+from .astrocartography import angle_lines, render_astrocartography
+from .details_table import DetailsTable
+from .ephemeris import jd_to_datetime
+from .constants import (  # Para símbolos na aba de detalhes
+    PLANET_UNICODE_SYMBOLS, CHART_TYPE_TITLES, HOUSE_SYSTEMS, GRID_MAX_CHARTS, SIGNS, HORARY_PRESET_LOCATIONS
+)
+
+MOON_SECTION = "Lua (Horária)"
+LUNATION_SECTION = "Lunações"
 
 class ChartGUI:
     def __init__(self, master):
@@ -19,12 +38,24 @@ class ChartGUI:
 
         self.astrological_data_calculator = AstrologicalData()
         self.chart_renderer = ChartRenderer()
+        self.void_of_course = VoidOfCourseCalendar()
+        self.lunation_calendar = LunationCalendar()
+        self.horary_service = HoraryService(self.astrological_data_calculator)
+        self.planetary_hours = PlanetaryHours()
 
         self._configure_styles()
         self._create_widgets()
         self._setup_layout()
         self._update_input_fields_state() # Set initial state
 
+        # Tabelas de Lua fora de curso do mês atual e do seguinte, prontas para a horária
+        now = datetime.datetime.now(datetime.timezone.utc)
+        self.void_of_course.precompute(now.year, now.month)
+        self.lunation_calendar.precompute(now.year, now.year + 1)
+        # Buffers de horária dos locais do atendimento, mantidos em dia por uma thread
+        self.horary_service.start()
+        threading.Thread(target=self._register_horary_presets, daemon=True).start()
+
     def _configure_styles(self):
         """Configura os estilos para os widgets Tkinter."""
         style = ttk.Style()
@@ -76,7 +107,7 @@ class ChartGUI:
         ttk.Label(self.input_fields_frame, text="Sistema de Casas:").grid(row=5, column=0, sticky=tk.W, pady=5, padx=5)
         self.house_system_var = tk.StringVar(value='Placidus')
         self.house_system_dropdown = ttk.Combobox(self.input_fields_frame, textvariable=self.house_system_var,
-                                                   values=['Placidus', 'Regiomontanus'], state='readonly', width=28)
+                                                   values=list(HOUSE_SYSTEMS), state='readonly', width=28)
         self.house_system_dropdown.grid(row=5, column=1, sticky=tk.W, pady=5, padx=5)
 
         # Calculate Button
@@ -89,11 +120,53 @@ class ChartGUI:
         # Chart Tab
         self.chart_tab = ttk.Frame(self.notebook)
         self.notebook.add(self.chart_tab, text="Mapa Astral")
+        # Troca de sistema de casas sem recalcular o mapa (cúspides já em cache)
+        self.chart_options_frame = ttk.Frame(self.chart_tab, padding="5")
+        self.chart_options_frame.pack(side=tk.TOP, fill=tk.X)
+        ttk.Label(self.chart_options_frame, text="Sistema de Casas:").pack(side=tk.LEFT, padx=5)
+        self.chart_house_system_var = tk.StringVar(value='Placidus')
+        self.chart_house_system_dropdown = ttk.Combobox(self.chart_options_frame, textvariable=self.chart_house_system_var,
+                                                         values=list(HOUSE_SYSTEMS), state='readonly', width=20)
+        self.chart_house_system_dropdown.pack(side=tk.LEFT, padx=5)
+        self.chart_house_system_dropdown.bind("<<ComboboxSelected>>", self._on_house_system_switched)
+        # Renderizador do mapa: Matplotlib (com barra de ferramentas) ou tk.Canvas nativo (mais leve)
+        ttk.Label(self.chart_options_frame, text="Renderizador:").pack(side=tk.LEFT, padx=5)
+        self.renderer_var = tk.StringVar(value='Matplotlib')
+        self.renderer_dropdown = ttk.Combobox(self.chart_options_frame, textvariable=self.renderer_var,
+                                              values=['Matplotlib', 'Tk Canvas'], state='readonly', width=12)
+        self.renderer_dropdown.pack(side=tk.LEFT, padx=5)
+        self.renderer_dropdown.bind("<<ComboboxSelected>>", self._on_renderer_switched)
+        ttk.Button(self.chart_options_frame, text="Adicionar ao Painel", command=self._on_add_to_dashboard).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.chart_options_frame, text="Exportar...", command=self._on_export_chart).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.chart_options_frame, text="Astrocartografia...",
+                   command=self._on_export_astrocartography).pack(side=tk.LEFT, padx=5)
+
         self.chart_frame = ttk.Frame(self.chart_tab)
         self.chart_frame.pack(fill=tk.BOTH, expand=True)
 
+        self.current_chart_data = None
+        self.current_location_input = None
+
         self.canvas = None
         self.toolbar = None
+        self.tk_chart_canvas = tk.Canvas(self.chart_frame, bg='white', width=800, height=800, highlightthickness=0)
+        self.tk_chart_renderer = TkChartRenderer(self.tk_chart_canvas)
+        # Dicas ao passar o mouse sobre pontos e linhas de aspecto (clique fixa a dica)
+        self.tk_chart_inspector = TkChartInspector(self.tk_chart_renderer)
+        self.chart_inspector = None
+
+        # Dashboard Tab (vários mapas numa só figura; cada novo mapa repinta só a sua célula)
+        self.dashboard_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.dashboard_tab, text="Painel de Mapas")
+        self.dashboard_options_frame = ttk.Frame(self.dashboard_tab, padding="5")
+        self.dashboard_options_frame.pack(side=tk.TOP, fill=tk.X)
+        ttk.Button(self.dashboard_options_frame, text="Carregar Lista...", command=self._on_load_dashboard_list).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.dashboard_options_frame, text="Limpar Painel", command=self._on_clear_dashboard).pack(side=tk.LEFT, padx=5)
+        self.dashboard_frame = ttk.Frame(self.dashboard_tab)
+        self.dashboard_frame.pack(fill=tk.BOTH, expand=True)
+        self.dashboard_renderer = ChartGridRenderer()
+        self.dashboard_charts = []
+        self.dashboard_canvas = None
 
         # Details Tab
         self.details_tab = ttk.Frame(self.notebook)
@@ -101,13 +174,8 @@ class ChartGUI:
         self.details_frame = ttk.Frame(self.details_tab)
         self.details_frame.pack(fill=tk.BOTH, expand=True)
 
-        self.details_text_widget = tk.Text(self.details_frame, wrap=tk.WORD, state=tk.DISABLED,
-                                          font=("Courier New", 10), padx=10, pady=10)
-        self.details_text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-        self.scrollbar = ttk.Scrollbar(self.details_frame, command=self.details_text_widget.yview)
-        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.details_text_widget.config(yscrollcommand=self.scrollbar.set)
+        self.details_table = DetailsTable(self.details_frame)
+        self.details_table.pack(fill=tk.BOTH, expand=True)
 
         # --- Back Button ---
         self.back_button = ttk.Button(self.master, text="←", command=self._show_input_frame, width=5)
@@ -145,20 +213,14 @@ class ChartGUI:
         self.input_frame.pack(fill=tk.BOTH, expand=True)
         self.back_button.place_forget()
 
-        # Clean up previous chart/details
-        if self.chart_renderer.fig is not None:
-            plt.close(self.chart_renderer.fig)
-            self.chart_renderer.fig = None
-        if self.canvas is not None:
-            self.canvas.get_tk_widget().destroy()
-            self.canvas = None
-        if self.toolbar is not None:
-            self.toolbar.destroy()
-            self.toolbar = None
+        # Clean up previous chart/details (a figura, o canvas e a barra de ferramentas ficam para o próximo mapa)
+        self._hide_matplotlib_chart()
+        self.tk_chart_renderer.clear()
+        self.tk_chart_inspector.reset()
+        self.tk_chart_canvas.pack_forget()
         
-        self.details_text_widget.config(state=tk.NORMAL)
-        self.details_text_widget.delete(1.0, tk.END)
-        self.details_text_widget.config(state=tk.DISABLED)
+        self.details_table.clear()
+        self.current_chart_data = None
 
     def _on_calculate(self):
         """Manipulador para o botão 'Gerar Mapa Astral'."""
@@ -176,16 +238,23 @@ class ChartGUI:
             messagebox.showwarning("Entrada Inválida", "Para o Mapa Natal, a data e a hora são obrigatórias.")
             return
 
-        # Step 1: Get Location Details
-        latitude, longitude, timezone_id, loc_error = self.astrological_data_calculator.get_location_details(location_input)
-        if loc_error:
-            messagebox.showerror("Erro de Localização", loc_error)
-            return
-
-        # Step 2: Calculate Chart Data
-        chart_data, calc_error = self.astrological_data_calculator.calculate_chart_data(
-            chart_type, house_system, date_input, time_input, latitude, longitude, timezone_id
-        )
+        if chart_type == 'horary' and self.horary_service.has_location(location_input):
+            # Local já registrado: o mapa sai do buffer pré-calculado, sem geocodificar
+            chart_data, calc_error = self.horary_service.chart(location_input, house_system)
+        else:
+            # Step 1: Get Location Details
+            latitude, longitude, timezone_id, loc_error = self.astrological_data_calculator.get_location_details(location_input)
+            if loc_error:
+                messagebox.showerror("Erro de Localização", loc_error)
+                return
+
+            # Step 2: Calculate Chart Data
+            chart_data, calc_error = self.astrological_data_calculator.calculate_chart_data(
+                chart_type, house_system, date_input, time_input, latitude, longitude, timezone_id
+            )
+            if chart_type == 'horary' and not calc_error:
+                # Só os HORARY_MAX_LOCATIONS locais digitados mais recentes ficam no serviço
+                self.horary_service.add_location(location_input, latitude, longitude, timezone_id, house_system)
 
         if calc_error:
             messagebox.showerror("Erro de Cálculo", calc_error)
@@ -193,66 +262,317 @@ class ChartGUI:
 
         # If all calculations are successful, hide input frame and show chart/details
         self.input_frame.pack_forget()
+        self._display_chart(chart_data, location_input)
 
-        # Step 3: Render Chart
-        fig = self.chart_renderer.create_chart_plot(chart_data)
+        # Show notebook and back button
+        self.notebook.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.notebook.select(self.chart_tab)
+        self.back_button.place(relx=1.0, rely=0.0, anchor=tk.NE, x=-10, y=10)
+
+    def _register_horary_presets(self):
+        """Geocodifica e registra no serviço de horária os locais de HORARY_PRESET_LOCATIONS."""
+        for location_input in HORARY_PRESET_LOCATIONS:
+            latitude, longitude, timezone_id, loc_error = self.astrological_data_calculator.get_location_details(location_input)
+            if latitude is not None:
+                self.horary_service.add_location(location_input, latitude, longitude, timezone_id, pinned=True)
 
-        # Clear previous canvas/toolbar if they exist
-        if self.canvas:
-            self.canvas.get_tk_widget().destroy()
-        if self.toolbar:
-            self.toolbar.destroy()
+    def _on_house_system_switched(self, event=None):
+        """Redesenha o mapa atual com outro sistema de casas, sem recalcular planetas."""
+        if self.current_chart_data is None:
+            return
+        chart_data, error = self.astrological_data_calculator.switch_house_system(
+            self.current_chart_data, self.chart_house_system_var.get()
+        )
+        if error:
+            messagebox.showerror("Erro de Cálculo", error)
+            self.chart_house_system_var.set(self.current_chart_data['house_system'])
+            return
+        self._display_chart(chart_data, self.current_location_input)
 
-        self.canvas = FigureCanvasTkAgg(fig, master=self.chart_frame)
-        self.canvas_widget = self.canvas.get_tk_widget()
-        self.canvas_widget.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+    def _display_chart(self, chart_data, location_input):
+        """Renderiza o mapa na aba do gráfico e preenche a aba de detalhes."""
+        self.current_chart_data = chart_data
+        self.current_location_input = location_input
+        self.chart_house_system_var.set(chart_data['house_system'])
 
-        self.toolbar = NavigationToolbar2Tk(self.canvas, self.chart_frame)
-        self.toolbar.update()
-        self.canvas_widget.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        # Step 3: Render Chart
+        if self.renderer_var.get() == 'Tk Canvas':
+            self._render_tk_chart(chart_data)
+        else:
+            self._render_matplotlib_chart(chart_data)
 
         # Step 4: Populate Details Tab
         self._populate_details_tab(chart_data, location_input)
 
-        # Show notebook and back button
-        self.notebook.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
-        self.notebook.select(self.chart_tab)
-        self.back_button.place(relx=1.0, rely=0.0, anchor=tk.NE, x=-10, y=10)
+    def _render_matplotlib_chart(self, chart_data):
+        """Desenha o mapa com o ChartRenderer (Matplotlib) embutido via FigureCanvasTkAgg."""
+        self.tk_chart_renderer.clear()
+        self.tk_chart_canvas.pack_forget()
 
-    def _populate_details_tab(self, chart_data, location_input_str):
-        """Preenche o widget de texto de detalhes com os dados do mapa."""
-        self.details_text_widget.config(state=tk.NORMAL)
-        self.details_text_widget.delete(1.0, tk.END)
-
-        chart_title_type = "Mapa Natal" if chart_data['chart_type'] == 'natal' else "Mapa Horário"
-        self.details_text_widget.insert(tk.END, f"--- Detalhes do {chart_title_type} ({chart_data['house_system']} Casas) ---\n\n")
-        self.details_text_widget.insert(tk.END, f"Data/Hora: {chart_data['birth_date'].strftime('%Y-%m-%d %H:%M')}\n")
-        self.details_text_widget.insert(tk.END, f"Local: {location_input_str} (Lat: {chart_data['latitude']:.2f}, Lon: {chart_data['longitude']:.2f}, Fuso: {chart_data['timezone_id']})\n\n")
-
-        self.details_text_widget.insert(tk.END, "=== Posições de Pontos Astrológicos ===\n")
-        for pos_str in chart_data['textual_point_positions']:
-            # Add unicode symbol from constants
-            for p_name, p_symbol in PLANET_UNICODE_SYMBOLS.items():
-                if pos_str.startswith(f"{p_name}:"):
-                    pos_str = pos_str.replace(f"{p_name}:", f"{p_name} {p_symbol}:")
-                    break
-            self.details_text_widget.insert(tk.END, f"- {pos_str}\n")
-        self.details_text_widget.insert(tk.END, "\n")
-
-        self.details_text_widget.insert(tk.END, "=== Cúspides das Casas ===\n")
-        for cusp_str in chart_data['textual_house_cusps']:
-            self.details_text_widget.insert(tk.END, f"- {cusp_str}\n")
-        self.details_text_widget.insert(tk.END, "\n")
-
-        self.details_text_widget.insert(tk.END, "=== Aspectos ===\n")
-        if chart_data['textual_aspects']:
-            for aspect_str in chart_data['textual_aspects']:
-                self.details_text_widget.insert(tk.END, f"- {aspect_str}\n")
+        fig = self.chart_renderer.create_chart_plot(chart_data)
+
+        # O ChartRenderer reaproveita a mesma figura entre mapas; o canvas, a barra
+        # de ferramentas e o inspetor só são criados na primeira vez (ou se a figura mudar)
+        if self.canvas is None or self.canvas.figure is not fig:
+            if self.chart_inspector is not None:
+                self.chart_inspector.disconnect()
+                self.chart_inspector = None
+            if self.canvas is not None:
+                self.canvas.get_tk_widget().destroy()
+            if self.toolbar is not None:
+                self.toolbar.destroy()
+            self.canvas = FigureCanvasTkAgg(fig, master=self.chart_frame)
+            self.canvas_widget = self.canvas.get_tk_widget()
+            self.toolbar = NavigationToolbar2Tk(self.canvas, self.chart_frame, pack_toolbar=False)
+
+        if self.canvas_widget.winfo_manager() != 'pack':
+            self.toolbar.pack(side=tk.BOTTOM, fill=tk.X)
+            self.canvas_widget.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.toolbar.update() # Zera o histórico de zoom/pan do mapa anterior
+
+        if self.chart_inspector is None:
+            self.chart_inspector = MatplotlibChartInspector(self.canvas, self.chart_renderer.ax, self.chart_renderer.hit_index)
         else:
-            self.details_text_widget.insert(tk.END, "Nenhum aspecto maior encontrado com orbe de 8°.\n")
-        self.details_text_widget.insert(tk.END, "\n")
+            self.chart_inspector.attach(self.chart_renderer.ax, self.chart_renderer.hit_index)
+        self.canvas.draw_idle()
+
+    def _hide_matplotlib_chart(self):
+        """Esconde o canvas Matplotlib e a barra de ferramentas sem destruí-los."""
+        if self.canvas is not None:
+            self.canvas_widget.pack_forget()
+            self.toolbar.pack_forget()
+
+    def _render_tk_chart(self, chart_data):
+        """Desenha o mapa no tk.Canvas nativo, reaproveitando os itens do desenho anterior."""
+        self._hide_matplotlib_chart()
+
+        if self.tk_chart_canvas.winfo_manager() != 'pack':
+            self.tk_chart_canvas.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.tk_chart_renderer.render(chart_data)
+        self.tk_chart_inspector.reset()
+
+    def _on_renderer_switched(self, event=None):
+        """Redesenha o mapa atual com o renderizador escolhido."""
+        if self.current_chart_data is not None:
+            self._display_chart(self.current_chart_data, self.current_location_input)
+
+    def _on_add_to_dashboard(self):
+        """Acrescenta o mapa atual ao painel, repintando só a célula nova quando há espaço."""
+        if self.current_chart_data is None:
+            return
+        if len(self.dashboard_charts) >= GRID_MAX_CHARTS:
+            messagebox.showwarning("Painel Cheio", f"O painel comporta no máximo {GRID_MAX_CHARTS} mapas.")
+            return
+        self.dashboard_charts.append(self.current_chart_data)
+        index = len(self.dashboard_charts) - 1
 
-        self.details_text_widget.config(state=tk.DISABLED)
+        if self.dashboard_canvas is not None and index < len(self.dashboard_renderer.axes):
+            self.dashboard_renderer.update_cell(index, self.current_chart_data)
+            self.notebook.tab(self.dashboard_tab, text=f"Painel de Mapas ({len(self.dashboard_charts)})")
+        else:
+            self._rebuild_dashboard()
+
+    def _rebuild_dashboard(self):
+        """Recria a grade com a próxima capacidade quadrada (4, 9 ou 16 células) para os mapas do painel."""
+        capacity = next(n * n for n in range(2, 5) if n * n >= len(self.dashboard_charts))
+        fig = self.dashboard_renderer.create_grid_plot(self.dashboard_charts, capacity=capacity)
+        if self.dashboard_canvas is not None:
+            self.dashboard_canvas.get_tk_widget().destroy()
+        self.dashboard_canvas = FigureCanvasTkAgg(fig, master=self.dashboard_frame)
+        self.dashboard_canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.dashboard_canvas.draw()
+        self.notebook.tab(self.dashboard_tab, text=f"Painel de Mapas ({len(self.dashboard_charts)})")
+
+    def _on_load_dashboard_list(self):
+        """
+        Carrega no painel uma lista de nascimentos (CSV com as colunas date,
+        time e location; house_system opcional). Os locais são geocodificados
+        um a um e todos os mapas saem de uma única chamada a calculate_charts_batch.
+        """
+        path = filedialog.askopenfilename(filetypes=[("CSV", "*.csv")])
+        if not path:
+            return
+        free = GRID_MAX_CHARTS - len(self.dashboard_charts)
+        try:
+            with open(path, encoding='utf-8', newline='') as f:
+                rows = list(csv.DictReader(f))
+            specs = []
+            for row in rows[:free]:
+                location_input = row['location']
+                latitude, longitude, timezone_id, loc_error = self.astrological_data_calculator.get_location_details(location_input)
+                if loc_error:
+                    messagebox.showerror("Erro de Localização", f"{location_input}: {loc_error}")
+                    return
+                house_system = row.get('house_system') or self.house_system_var.get()
+                specs.append(('natal', house_system, row['date'], row['time'], latitude, longitude, timezone_id))
+        except (KeyError, OSError, csv.Error) as e:
+            messagebox.showerror("Erro de Leitura", f"Lista inválida ({e}). Use as colunas date, time e location.")
+            return
+
+        charts, calc_error = self.astrological_data_calculator.calculate_charts_batch(specs)
+        if calc_error:
+            messagebox.showerror("Erro de Cálculo", calc_error)
+            return
+        if len(rows) > free:
+            messagebox.showwarning("Painel Cheio", f"O painel comporta no máximo {GRID_MAX_CHARTS} mapas; "
+                                                   f"{len(rows) - free} da lista ficaram de fora.")
+        if charts:
+            self.dashboard_charts.extend(charts)
+            self._rebuild_dashboard()
+
+    def _on_clear_dashboard(self):
+        """Remove todos os mapas do painel."""
+        self.dashboard_charts = []
+        if self.dashboard_canvas is not None:
+            self.dashboard_canvas.get_tk_widget().destroy()
+            self.dashboard_canvas = None
+        self.dashboard_renderer.fig = None
+        self.notebook.tab(self.dashboard_tab, text="Painel de Mapas")
+
+    def _on_export_chart(self):
+        """Exporta o mapa atual (JSON Lines, CSV ou Arrow, pela extensão escolhida)."""
+        if self.current_chart_data is None:
+            return
+        path = filedialog.asksaveasfilename(
+            defaultextension=".jsonl",
+            filetypes=[("JSON Lines", "*.jsonl"), ("CSV", "*.csv"), ("Arrow IPC", "*.arrow"),
+                       ("Arrow IPC (fluxo)", "*.arrows")]
+        )
+        if not path:
+            return
+        try:
+            export_charts(path, [self.current_chart_data], labels=[self.current_location_input])
+        except (ImportError, ValueError, OSError) as e:
+            messagebox.showerror("Erro de Exportação", str(e))
+
+    def _on_export_astrocartography(self):
+        """Grava o mapa de astrocartografia do instante do mapa atual (PNG, SVG ou PDF)."""
+        if self.current_chart_data is None:
+            return
+        path = filedialog.asksaveasfilename(
+            defaultextension=".png",
+            filetypes=[("PNG", "*.png"), ("SVG", "*.svg"), ("PDF", "*.pdf")]
+        )
+        if not path:
+            return
+        chart_data = self.current_chart_data
+        try:
+            render_astrocartography(
+                angle_lines(chart_data['jd']), path,
+                locations=[(self.current_location_input, chart_data['latitude'], chart_data['longitude'])],
+                title=f"Astrocartografia - {chart_data['birth_date'].strftime('%Y-%m-%d %H:%M')}"
+            )
+        except (ValueError, OSError) as e:
+            messagebox.showerror("Erro de Exportação", str(e))
+
+    def _populate_details_tab(self, chart_data, location_input_str):
+        """Preenche a tabela de detalhes a partir dos dados numéricos do mapa."""
+        chart_title_type = CHART_TYPE_TITLES.get(chart_data['chart_type'], "Mapa Astral")
+        summary = [
+            f"{chart_title_type} ({chart_data['house_system']} Casas)",
+            f"Data/Hora: {chart_data['birth_date'].strftime('%Y-%m-%d %H:%M')}",
+            f"Local: {location_input_str} (Lat: {chart_data['latitude']:.2f}, Lon: {chart_data['longitude']:.2f}, Fuso: {chart_data['timezone_id']})",
+        ]
+        if not chart_data['aspects_data']:
+            summary.append("Nenhum aspecto maior encontrado com orbe de 8°.")
+        dignities = chart_data.get('dignities')
+        if dignities is not None:
+            almutens = ", ".join(f"{angle}: {planet}" for angle, planet in dignities['almuten'].items())
+            summary.append(f"Mapa {'diurno' if dignities['is_day'] else 'noturno'}; dignidades: "
+                           f"{dignities['score']:+d}; almuten {almutens}")
+        if chart_data.get('out_of_bounds'):
+            summary.append(f"Fora dos limites (declinação além de {chart_data['obliquity']:.2f}°): "
+                           f"{', '.join(chart_data['out_of_bounds'])}")
+
+        if chart_data['chart_type'] == 'horary':
+            summary.extend(self._planetary_hour_summary(chart_data))
+            summary.extend(self._set_void_of_course_section(chart_data))
+        else:
+            self.details_table.remove_section(MOON_SECTION)
+        if chart_data['chart_type'] == 'natal':
+            summary.extend(self._set_lunation_section(chart_data))
+        else:
+            self.details_table.remove_section(LUNATION_SECTION)
+        self.details_table.populate(chart_data, "\n".join(summary))
+
+    def _set_lunation_section(self, chart_data):
+        """
+        Seção das lunações e eclipses dos próximos 12 meses que caem sobre
+        pontos do mapa natal. Retorna as linhas de resumo.
+        """
+        jd_now = swe.julday(*datetime.datetime.now(datetime.timezone.utc).timetuple()[:3], 0.0)
+        hits = self.lunation_calendar.natal_hits([chart_data], jd_now, jd_now + 365.25)
+        table, timezone_id = hits['table'], chart_data['timezone_id']
+
+        columns = [
+            ('jd', "Data", 130, tk.CENTER, lambda v: jd_to_datetime(v, timezone_id).strftime('%Y-%m-%d %H:%M')),
+            ('lunation', "Lunação", 200, tk.W, str),
+            ('lon', "Posição", 110, tk.W, lambda v: f"{int(v % 30)}° {SIGNS[int(v // 30) % 12]}"),
+            ('point', "Ponto natal", 120, tk.W, lambda v: f"{v} {PLANET_UNICODE_SYMBOLS.get(v, '')}".rstrip()),
+            ('orb', "Orbe", 70, tk.E, lambda v: f"{v:.2f}°"),
+        ]
+        rows = [{
+            'jd': float(table['jds'][k]),
+            'lunation': describe_lunation(table['kinds'][k], table['eclipses'][k]),
+            'lon': float(table['lons'][k]),
+            'point': hits['points'][p],
+            'orb': float(orb),
+        } for k, p, orb in zip(hits['lunation'], hits['point'], hits['orb'])]
+        self.details_table.set_section(LUNATION_SECTION, columns, rows)
+
+        eclipse_hits = sum(1 for k in hits['lunation'] if table['eclipses'][k])
+        return [f"Lunações sobre pontos natais nos próximos 12 meses: {len(rows)} (eclipses: {eclipse_hits})."]
+
+    def _planetary_hour_summary(self, chart_data):
+        """Linhas de resumo com a hora planetária e o nascer/pôr do Sol da horária."""
+        hour = self.planetary_hours.hour_at(chart_data['jd'], chart_data['latitude'], chart_data['longitude'])
+        if hour is None:
+            return ["Hora planetária indefinida (o Sol não nasce ou não se põe nesta data)."]
+        timezone_id = chart_data['timezone_id']
+        period = "dia" if hour['is_day'] else "noite"
+        return [
+            f"Hora planetária: {hour['ruler']} {PLANET_UNICODE_SYMBOLS.get(hour['ruler'], '')} "
+            f"({hour['number']}ª hora, {period}; regente do dia: {hour['day_ruler']}), "
+            f"das {jd_to_datetime(hour['start'], timezone_id).strftime('%H:%M')} "
+            f"às {jd_to_datetime(hour['end'], timezone_id).strftime('%H:%M')}",
+            f"Nascer do Sol: {jd_to_datetime(hour['sunrise'], timezone_id).strftime('%H:%M')} — "
+            f"Pôr do Sol: {jd_to_datetime(hour['sunset'], timezone_id).strftime('%H:%M')}",
+        ]
+
+    def _set_void_of_course_section(self, chart_data):
+        """
+        Seção da Lua na horária (último/próximo aspecto com cada planeta).
+        Retorna as linhas de resumo sobre a Lua fora de curso.
+        """
+        report = self.void_of_course.moon_report(chart_data['jd'])
+        timezone_id = chart_data['timezone_id']
+
+        def format_jd(jd):
+            return jd_to_datetime(jd, timezone_id).strftime('%Y-%m-%d %H:%M')
+
+        columns = [
+            ('planet', "Planeta", 120, tk.W, lambda v: f"{v} {PLANET_UNICODE_SYMBOLS.get(v, '')}"),
+            ('last_aspect', "Último aspecto", 110, tk.W, str),
+            ('last_jd', "Quando", 130, tk.CENTER, format_jd),
+            ('next_aspect', "Próximo aspecto", 110, tk.W, str),
+            ('next_jd', "Quando", 130, tk.CENTER, format_jd),
+        ]
+        rows = []
+        for planet in MOON_ASPECT_PLANETS:
+            last, following = report['last_aspects'].get(planet, {}), report['next_aspects'].get(planet, {})
+            rows.append({
+                'planet': planet, 'last_aspect': last.get('aspect'), 'last_jd': last.get('jd'),
+                'next_aspect': following.get('aspect'), 'next_jd': following.get('jd'),
+            })
+        self.details_table.set_section(MOON_SECTION, columns, rows)
+
+        if report['is_void']:
+            summary = [f"Lua FORA DE CURSO desde {format_jd(report['void_start_jd'])} até {format_jd(report['void_end_jd'])}."]
+        else:
+            summary = ["A Lua não está fora de curso."]
+        if report['sign_exit_jd'] is not None:
+            summary.append(f"Saída do signo atual: {format_jd(report['sign_exit_jd'])}")
+        return summary
 
     def run(self):
         """Inicia o loop principal do Tkinter."""
@@ -261,8 +581,8 @@ class ChartGUI:
 
     def _on_closing(self):
         """Lida com o fechamento da janela, garantindo que as figuras Matplotlib sejam fechadas."""
-        if self.chart_renderer.fig is not None:
-            plt.close(self.chart_renderer.fig)
+        self.horary_service.stop()
+        self.chart_renderer.release()
         self.master.destroy()
 
 if __name__ == "__main__":
@@ -0,0 +1,212 @@
+import threading
+from collections import OrderedDict
+
+import swisseph as swe
+import numpy as np
+
+from .constants import (
+    CHALDEAN_ORDER, WEEKDAY_RULERS, HORIZON_REFRACTION_DEGREES, SUN_RADIUS_AU,
+    PLANETARY_HOURS_CACHE_SIZE, PLANETARY_HOURS_LOCATION_DECIMALS
+)
+from .angular_math import signed_difference
+from .ephemeris import sidereal_armc
+
+SOLAR_HOUR_ANGLE_DEGREES_PER_DAY = 360.0 # Ângulo horário do Sol: taxa sideral menos o avanço do Sol em AR
+
+
+def day_rulers(weekdays):
+    """Índices (em CHALDEAN_ORDER) dos regentes das 24 horas de cada dia da semana (0 = segunda)."""
+    first = np.array([CHALDEAN_ORDER.index(WEEKDAY_RULERS[w]) for w in np.atleast_1d(weekdays)])
+    return (first[:, None] + np.arange(24)[None, :]) % len(CHALDEAN_ORDER)
+
+
+def hour_boundaries(sunrise, sunset, next_sunrise):
+    """
+    Início das 24 horas planetárias e fim da última (..., 25): doze horas
+    desiguais do nascer ao pôr do Sol e doze do pôr ao nascer seguinte.
+    """
+    sunrise, sunset, next_sunrise = (np.asarray(a, dtype=float)[..., None] for a in (sunrise, sunset, next_sunrise))
+    steps = np.arange(12) / 12
+    return np.concatenate([sunrise + (sunset - sunrise) * steps,
+                           sunset + (next_sunrise - sunset) * steps,
+                           next_sunrise], axis=-1)
+
+
+def _local_midnight(year, month, day, longitude):
+    """Meia-noite em tempo médio local (UT) da data civil no local; dispensa o fuso horário."""
+    return swe.julday(year, month, day, 0.0) - longitude / 360
+
+
+# =============================================================================
+# MODO INDIVIDUAL (swe.rise_trans, com cache por data e local)
+# =============================================================================
+
+
+class PlanetaryHours:
+    """
+    Nascer e pôr do Sol e as 24 horas planetárias por (data, local). Os
+    instantes vêm do swe.rise_trans (borda superior com refração) e cada
+    dia fica em cache pela data e pelas coordenadas arredondadas a
+    PLANETARY_HOURS_LOCATION_DECIMALS casas, então consultas repetidas
+    (ex.: várias horárias no mesmo escritório) não refazem a busca.
+    """
+
+    def __init__(self, cache_size=PLANETARY_HOURS_CACHE_SIZE, decimals=PLANETARY_HOURS_LOCATION_DECIMALS):
+        self.cache_size = cache_size
+        self.decimals = decimals
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def day_table(self, year, month, day, latitude, longitude):
+        """
+        Tabela do dia planetário que começa no nascer do Sol da data local:
+        'sunrise', 'sunset', 'next_sunrise', 'hour_starts' (25 instantes) e
+        'rulers' (24 nomes), além de 'day_ruler'. None onde o Sol não nasce
+        ou não se põe (círculos polares).
+        """
+        latitude, longitude = round(latitude, self.decimals), round(longitude, self.decimals)
+        key = (year, month, day, latitude, longitude)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        table = self._compute_day(year, month, day, latitude, longitude)
+        with self._lock:
+            self._cache[key] = table
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return table
+
+    def _compute_day(self, year, month, day, latitude, longitude):
+        geopos = (longitude, latitude, 0.0)
+        jd = _local_midnight(year, month, day, longitude)
+        events = []
+        for rsmi in (swe.CALC_RISE, swe.CALC_SET, swe.CALC_RISE):
+            res, tret = swe.rise_trans(jd, swe.SUN, rsmi, geopos)
+            if res != 0:
+                return None # Sol circumpolar nesta data
+            jd = tret[0]
+            events.append(jd)
+
+        sunrise, sunset, next_sunrise = events
+        weekday = swe.day_of_week(swe.julday(year, month, day, 12.0))
+        rulers = day_rulers(weekday)[0]
+        return {
+            'sunrise': sunrise,
+            'sunset': sunset,
+            'next_sunrise': next_sunrise,
+            'hour_starts': hour_boundaries(sunrise, sunset, next_sunrise),
+            'rulers': [CHALDEAN_ORDER[r] for r in rulers],
+            'day_ruler': WEEKDAY_RULERS[weekday],
+        }
+
+    def hour_at(self, jd, latitude, longitude):
+        """
+        Hora planetária em vigor no instante `jd` (UT): 'ruler', 'number'
+        (1 a 24), 'is_day', 'start', 'end', 'day_ruler', 'sunrise' e 'sunset'.
+        Antes do nascer do Sol vale o dia planetário da véspera.
+        None em dias sem nascer/pôr do Sol.
+        """
+        year, month, day, _ = swe.revjul(jd + longitude / 360) # Data em tempo médio local
+        table = self.day_table(year, month, day, latitude, longitude)
+        if table is not None and jd < table['sunrise']:
+            year, month, day, _ = swe.revjul(jd + longitude / 360 - 1)
+            table = self.day_table(year, month, day, latitude, longitude)
+        if table is None:
+            return None
+
+        index = int(np.clip(np.searchsorted(table['hour_starts'], jd, side='right') - 1, 0, 23))
+        return {
+            'ruler': table['rulers'][index],
+            'number': index + 1,
+            'is_day': index < 12,
+            'start': float(table['hour_starts'][index]),
+            'end': float(table['hour_starts'][index + 1]),
+            'day_ruler': table['day_ruler'],
+            'sunrise': table['sunrise'],
+            'sunset': table['sunset'],
+        }
+
+    def is_daytime(self, jd, latitude, longitude):
+        """Sol acima do horizonte (entre o nascer e o pôr) no instante `jd`; None nos dias polares."""
+        hour = self.hour_at(jd, latitude, longitude)
+        return None if hour is None else hour['is_day']
+
+
+# =============================================================================
+# MODO VETORIZADO (um ano para muitos locais)
+# =============================================================================
+
+
+def _sun_equatorial(jd_start, jd_end):
+    """
+    AR (desenrolada), declinação e altura do nascer/pôr (graus) diárias do Sol,
+    para interpolação linear. A altura é a da borda superior com a refração
+    do swe.rise_trans, então os dois modos concordam em poucos segundos.
+    """
+    jds = np.arange(np.floor(jd_start) - 1, np.ceil(jd_end) + 2)
+    ra, dec, distance = np.empty(len(jds)), np.empty(len(jds)), np.empty(len(jds))
+    for t, jd in enumerate(jds):
+        xx = swe.calc_ut(jd, swe.SUN, swe.FLG_SWIEPH | swe.FLG_EQUATORIAL)[0]
+        ra[t], dec[t], distance[t] = xx[0], xx[1], xx[2]
+    horizon = -(HORIZON_REFRACTION_DEGREES + np.degrees(np.arcsin(SUN_RADIUS_AU / distance)))
+    return jds, np.degrees(np.unwrap(np.radians(ra))), dec, horizon
+
+
+def _solar_event(midnight, latitudes, longitudes, sun, direction, iterations=4):
+    """
+    Nascer (direction=-1) ou pôr (+1) do Sol em cada (dia, local), pela
+    fórmula do ângulo horário: cos H0 = (sen h0 - sen φ sen δ) / (cos φ cos δ).
+    Parte do meio-dia médio local e corrige pelo ângulo horário com AR e
+    declinação interpoladas no instante estimado. NaN onde o Sol não cruza o horizonte.
+    """
+    sun_jds, sun_ra, sun_dec, sun_horizon = sun
+    phi = np.radians(latitudes)[None, :]
+    jd_reference = float(sun_jds[0])
+
+    jd = midnight + 0.5
+    polar = np.zeros(midnight.shape, dtype=bool)
+    for _ in range(iterations):
+        ra = np.interp(jd, sun_jds, sun_ra) % 360
+        dec = np.radians(np.interp(jd, sun_jds, sun_dec))
+        sin_h0 = np.sin(np.radians(np.interp(jd, sun_jds, sun_horizon)))
+        cos_h0 = (sin_h0 - np.sin(phi) * np.sin(dec)) / (np.cos(phi) * np.cos(dec))
+        polar |= np.abs(cos_h0) > 1
+        h0 = np.degrees(np.arccos(np.clip(cos_h0, -1, 1)))
+        hour_angle = sidereal_armc(jd, longitudes[None, :], jd_reference) - ra
+        jd = jd + signed_difference(direction * h0, hour_angle) / SOLAR_HOUR_ANGLE_DEGREES_PER_DAY
+    return np.where(polar, np.nan, jd)
+
+
+def planetary_hours_year(year, latitudes, longitudes):
+    """
+    Tabelas de um ano inteiro para muitos locais de uma vez: a AR e a
+    declinação do Sol são amostradas uma vez por dia e o ângulo horário é
+    resolvido vetorizado sobre (dias × locais). Retorna 'jds' (meia-noite UT
+    de cada data, (D,)), 'sunrise', 'sunset', 'next_sunrise' (D, L),
+    'hour_starts' (D, L, 25) e 'rulers' (D, 24) em índices de CHALDEAN_ORDER
+    (só dependem do dia da semana). Dias polares ficam como NaN.
+    """
+    latitudes = np.atleast_1d(np.asarray(latitudes, dtype=float))
+    longitudes = np.atleast_1d(np.asarray(longitudes, dtype=float))
+    jd_first = swe.julday(year, 1, 1, 0.0)
+    days = int(round(swe.julday(year + 1, 1, 1, 0.0) - jd_first))
+    jds = jd_first + np.arange(days + 1) # Um dia a mais para o nascer do Sol seguinte
+
+    midnight = jds[:, None] - longitudes[None, :] / 360
+    sun = _sun_equatorial(midnight.min(), midnight.max() + 1)
+    sunrise = _solar_event(midnight, latitudes, longitudes, sun, -1)
+    sunset = _solar_event(midnight, latitudes, longitudes, sun, +1)
+
+    weekdays = [swe.day_of_week(jd + 0.5) for jd in jds[:days]]
+    return {
+        'jds': jds[:days],
+        'latitudes': latitudes,
+        'longitudes': longitudes,
+        'sunrise': sunrise[:days],
+        'sunset': sunset[:days],
+        'next_sunrise': sunrise[1:],
+        'hour_starts': hour_boundaries(sunrise[:days], sunset[:days], sunrise[1:]),
+        'rulers': day_rulers(weekdays),
+    }
@@ -0,0 +1,136 @@
+import numpy as np
+
+from .constants import NATAL_POINTS_CALCULABLE, ASPECTS, TROPICAL_YEAR_DAYS, PROGRESSION_STEPS_PER_YEAR
+from .angular_math import signed_difference
+from .ephemeris import sample_positions, interpolate_positions
+
+
+class ProgressionEngine:
+    """
+    Progressões secundárias (um dia após o nascimento = um ano de vida) e
+    direções por arco solar para toda a vida do cliente de uma só vez.
+    As efemérides são amostradas uma vez por dia progressado e interpoladas
+    no NumPy, em vez de recalcular um mapa completo por passo.
+    """
+
+    def __init__(self, points=NATAL_POINTS_CALCULABLE):
+        self.points = list(points)
+
+    def secondary_progressions(self, natal_chart, years=90, steps_per_year=PROGRESSION_STEPS_PER_YEAR):
+        """
+        Calcula as posições progressadas de `self.points` ao longo de `years` anos.
+        Retorna um dicionário de arrays compactos:
+        'ages' (T,), 'jds' (T,) dias progressados, 'calendar_jds' (T,) datas reais
+        correspondentes a cada idade, 'lons' e 'speeds' (T, P) e 'names'.
+        """
+        natal_jd = natal_chart['jd']
+        ages = np.arange(int(years * steps_per_year) + 1) / steps_per_year
+        progressed_jds = natal_jd + ages # 1 dia de efeméride por ano de vida
+
+        # Uma amostra por dia progressado (≈ uma por ano de vida) basta para a interpolação
+        sample_jds = natal_jd + np.arange(int(np.ceil(years)) + 2)
+        sample_lons, sample_speeds = sample_positions(sample_jds, self.points)
+        lons, speeds = interpolate_positions(sample_jds, sample_lons, sample_speeds, progressed_jds)
+
+        return {
+            'names': list(self.points),
+            'ages': ages,
+            'jds': progressed_jds,
+            'calendar_jds': natal_jd + ages * TROPICAL_YEAR_DAYS,
+            'lons': lons,
+            'speeds': speeds,
+        }
+
+    def solar_arc_directions(self, natal_chart, years=90, steps_per_year=PROGRESSION_STEPS_PER_YEAR,
+                             progressions=None):
+        """
+        Direções por arco solar: todos os pontos natais avançam pelo arco
+        percorrido pelo Sol progressado. Inclui Ascendente e MC.
+        Retorna 'ages' (T,), 'arcs' (T,), 'lons' (T, P) e 'names'.
+        """
+        if progressions is None:
+            progressions = self.secondary_progressions(natal_chart, years, steps_per_year)
+
+        natal_names, natal_lons = self._natal_targets(natal_chart)
+        natal_sun = natal_lons[natal_names.index('Sun')]
+        sun_index = progressions['names'].index('Sun')
+
+        # Arco acumulado (sem o salto de 360°) do Sol progressado em relação ao natal
+        arcs = np.degrees(np.unwrap(np.radians(progressions['lons'][:, sun_index] - natal_sun)))
+        lons = (natal_lons[None, :] + arcs[:, None]) % 360
+
+        return {
+            'names': natal_names,
+            'ages': progressions['ages'],
+            'arcs': arcs,
+            'lons': lons,
+        }
+
+    def find_aspect_perfections(self, timeline, natal_chart, aspects=ASPECTS):
+        """
+        Encontra as perfeições de aspecto entre pontos móveis (progressados ou
+        dirigidos) e os pontos natais, vetorizado sobre (tempo, móvel, natal, aspecto).
+        A idade exata é obtida por interpolação linear entre as amostras.
+        Retorna arrays paralelos: 'ages', 'moving', 'natal', 'aspect' (índices)
+        e as listas de nomes correspondentes.
+        """
+        natal_names, natal_lons = self._natal_targets(natal_chart)
+        aspect_names = list(aspects)
+        angles = np.array([angle for angle, _ in aspects.values()], dtype=float)
+
+        # Alvos: natal ± ângulo (conjunção e oposição aparecem duplicadas e são filtradas)
+        targets = (natal_lons[:, None, None] + np.array([1.0, -1.0])[None, None, :] * angles[None, :, None]) % 360
+        deltas = signed_difference(timeline['lons'][:, :, None, None, None], targets[None, None])
+
+        before, after = deltas[:-1], deltas[1:]
+        crossing = ((before < 0) & (after >= 0)) | ((before > 0) & (after <= 0))
+        crossing &= np.abs(before - after) < 90 # descarta o salto de ±180°
+        crossing[..., 1] &= (angles % 180 != 0)[None, None, None, :] # sem duplicatas
+
+        t, moving, natal, aspect, side = np.nonzero(crossing)
+        b = before[t, moving, natal, aspect, side]
+        a = after[t, moving, natal, aspect, side]
+        fraction = np.where(b != a, b / (b - a), 0.0)
+        ages = timeline['ages'][t] + fraction * (timeline['ages'][t + 1] - timeline['ages'][t])
+
+        order = np.argsort(ages, kind='stable')
+        return {
+            'ages': ages[order],
+            'moving': moving[order],
+            'natal': natal[order],
+            'aspect': aspect[order],
+            'moving_names': list(timeline['names']),
+            'natal_names': natal_names,
+            'aspect_names': aspect_names,
+        }
+
+    def find_sign_changes(self, timeline):
+        """
+        Detecta as mudanças de signo dos pontos móveis ao longo da linha do tempo.
+        Retorna arrays paralelos 'ages', 'point', 'sign' (índice do novo signo) e 'names'.
+        """
+        signs = np.floor(timeline['lons'] / 30).astype(int) % 12
+        t, point = np.nonzero(signs[1:] != signs[:-1])
+        new_sign = signs[t + 1, point]
+
+        # A cúspide cruzada depende do sentido do movimento (direto ou retrógrado)
+        forward = signed_difference(timeline['lons'][t + 1, point], timeline['lons'][t, point]) >= 0
+        boundary = np.where(forward, new_sign * 30, ((new_sign + 1) % 12) * 30)
+        b = signed_difference(timeline['lons'][t, point], boundary)
+        a = signed_difference(timeline['lons'][t + 1, point], boundary)
+        fraction = np.where(b != a, b / (b - a), 0.0)
+        ages = timeline['ages'][t] + fraction * (timeline['ages'][t + 1] - timeline['ages'][t])
+
+        order = np.argsort(ages, kind='stable')
+        return {
+            'ages': ages[order],
+            'point': point[order],
+            'sign': new_sign[order],
+            'names': list(timeline['names']),
+        }
+
+    def _natal_targets(self, natal_chart):
+        """Nomes e longitudes natais usados como alvo: pontos do mapa mais Ascendente e MC."""
+        names = [p['name'] for p in natal_chart['point_positions']] + ['Asc', 'MC']
+        lons = np.array([p['lon'] for p in natal_chart['point_positions']] + [natal_chart['asc'], natal_chart['mc']])
+        return names, lons
@@ -0,0 +1,147 @@
+import os
+import itertools
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import swisseph as swe
+import numpy as np
+
+from .constants import (
+    NATAL_POINTS_CALCULABLE, ASPECTS, ASPECT_POINTS, DEFAULT_ASPECT_ORB,
+    HOUSE_SYSTEMS, RESEARCH_CHUNK_SIZE, ASPECT_PATTERNS
+)
+from .angular_math import separation_matrix, match_aspects, house_positions
+from .aspect_patterns import find_patterns
+from .ephemeris import sample_positions
+
+
+def _empty_partial(n_points, n_aspect_points, n_aspects):
+    """Contadores zerados no formato de um resultado parcial."""
+    return {
+        'charts': 0,
+        'house_failures': 0,
+        'sign_counts': np.zeros((n_points, 12), dtype=np.int64),
+        'house_counts': np.zeros((n_points, 12), dtype=np.int64),
+        'aspect_counts': np.zeros((n_aspect_points, n_aspect_points, n_aspects), dtype=np.int64),
+        'pattern_counts': np.zeros(len(ASPECT_PATTERNS), dtype=np.int64),
+    }
+
+
+def _aggregate_chunk(args):
+    """
+    Tarefa de um processo: calcula um bloco de nascimentos (N, 3) = (jd, lat, lon)
+    e devolve apenas os histogramas parciais, nunca os mapas.
+    """
+    chunk, points, house_code, orb = args
+    aspect_idx = [i for i, name in enumerate(points) if name in ASPECT_POINTS]
+    partial = _empty_partial(len(points), len(aspect_idx), len(ASPECTS))
+    if len(chunk) == 0:
+        return partial
+
+    jds, lats, lons_geo = chunk[:, 0], chunk[:, 1], chunk[:, 2]
+    lons, _ = sample_positions(jds, points)
+
+    cusps = np.full((len(chunk), 12), np.nan)
+    for n in range(len(chunk)):
+        try:
+            cusps[n] = swe.houses(jds[n], lats[n], lons_geo[n], house_code)[0][:12]
+        except swe.Error:
+            pass # Sistema indefinido nesta latitude: fica fora das contagens de casas
+
+    # Signos: histograma por ponto com bincount sobre índice (ponto, signo)
+    signs = (lons // 30).astype(np.int64) % 12
+    flat = np.arange(len(points))[None, :] * 12 + signs
+    partial['sign_counts'] += np.bincount(flat.ravel(), minlength=len(points) * 12).reshape(len(points), 12)
+
+    houses = house_positions(lons, cusps)
+    valid = houses >= 0
+    flat = (np.arange(len(points))[None, :] * 12 + houses)[valid]
+    partial['house_counts'] += np.bincount(flat, minlength=len(points) * 12).reshape(len(points), 12)
+    partial['house_failures'] = int((~valid.all(axis=1)).sum())
+
+    # Aspectos: uma matriz de separações por mapa, (N, P, P), classificada de uma vez
+    aspect_lons = lons[:, aspect_idx]
+    aspect_index, _ = match_aspects(separation_matrix(aspect_lons, aspect_lons), orb)
+    i, j = np.triu_indices(len(aspect_idx), k=1)
+    pair_aspects = aspect_index[:, i, j]
+    found = pair_aspects >= 0
+    pair_ids = np.broadcast_to(np.arange(len(i)), pair_aspects.shape)[found]
+    counts = np.bincount(pair_ids * len(ASPECTS) + pair_aspects[found],
+                         minlength=len(i) * len(ASPECTS)).reshape(len(i), len(ASPECTS))
+    partial['aspect_counts'][i, j] += counts
+
+    # Configurações (grande trígono, quadratura em T, ...) pelo grafo de aspectos em bitsets
+    partial['pattern_counts'] += np.bincount(find_patterns(aspect_lons, orb)['pattern'],
+                                             minlength=len(ASPECT_PATTERNS))
+
+    partial['charts'] = len(chunk)
+    return partial
+
+
+def iter_chunks(records, chunk_size=RESEARCH_CHUNK_SIZE):
+    """Agrupa um iterável de registros (jd, lat, lon) em arrays (N, 3) sem materializar a entrada."""
+    iterator = iter(records)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield np.asarray(chunk, dtype=float).reshape(-1, 3)
+
+
+class ResearchAggregator:
+    """
+    Modo de pesquisa estatística em fluxo (map-reduce): a entrada é lida em
+    blocos, cada processo devolve histogramas parciais em NumPy e o processo
+    principal apenas os soma. A memória não depende do tamanho da entrada:
+    no máximo `2 * workers` blocos ficam em trânsito ao mesmo tempo.
+    """
+
+    def __init__(self, points=NATAL_POINTS_CALCULABLE, house_system='Placidus',
+                 orb=DEFAULT_ASPECT_ORB, chunk_size=RESEARCH_CHUNK_SIZE, workers=None):
+        self.points = list(points)
+        self.aspect_points = [name for name in self.points if name in ASPECT_POINTS]
+        self.house_code = HOUSE_SYSTEMS[house_system]
+        self.orb = orb
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count()
+
+    def run(self, records):
+        """
+        Processa um iterável (possivelmente infinito ou lido de disco) de
+        registros (jd_ut, latitude, longitude) e devolve os totais agregados.
+        """
+        totals = _empty_partial(len(self.points), len(self.aspect_points), len(ASPECTS))
+        tasks = ((chunk, self.points, self.house_code, self.orb)
+                 for chunk in iter_chunks(records, self.chunk_size))
+
+        if self.workers == 1:
+            for task in tasks:
+                self.merge(totals, _aggregate_chunk(task))
+            return self._finalize(totals)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            in_flight = set()
+            for task in tasks:
+                in_flight.add(executor.submit(_aggregate_chunk, task))
+                if len(in_flight) >= 2 * self.workers:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self.merge(totals, future.result())
+            for future in in_flight:
+                self.merge(totals, future.result())
+        return self._finalize(totals)
+
+    def merge(self, totals, partial):
+        """Soma um resultado parcial aos totais (in-place)."""
+        for key, value in partial.items():
+            totals[key] += value
+        return totals
+
+    def _finalize(self, totals):
+        """Anexa os rótulos dos eixos aos contadores agregados."""
+        return {
+            **totals,
+            'points': list(self.points),
+            'aspect_points': list(self.aspect_points),
+            'aspect_names': list(ASPECTS),
+            'pattern_names': list(ASPECT_PATTERNS),
+        }
@@ -0,0 +1,144 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import swisseph as swe
+import numpy as np
+
+from .constants import RETURN_MEAN_SPEEDS, RETURN_TOLERANCE_DEGREES, RETURN_MAX_ITERATIONS
+from .angular_math import signed_difference
+from .ephemeris import SWE_POINTS_MAP, DEFAULT_FLAGS
+from .astrological_data import AstrologicalData
+
+
+def newton_returns(body, target_lons, guess_jds, tolerance=RETURN_TOLERANCE_DEGREES,
+                   max_iterations=RETURN_MAX_ITERATIONS):
+    """
+    Refina, pelo método de Newton, os instantes em que `body` volta às
+    longitudes `target_lons`, partindo de `guess_jds` (arrays do mesmo formato).
+    A velocidade de swe.calc_ut é a derivada, então poucas iterações bastam.
+    Entradas NaN são ignoradas e permanecem NaN.
+    """
+    swe_id = SWE_POINTS_MAP[body]
+    target_lons = np.asarray(target_lons, dtype=float)
+    jds = np.array(guess_jds, dtype=float)
+    flat_jds = jds.reshape(-1)
+    flat_targets = np.broadcast_to(target_lons, jds.shape).reshape(-1)
+    pending = np.nonzero(~np.isnan(flat_jds))[0]
+
+    for _ in range(max_iterations):
+        if len(pending) == 0:
+            break
+        still_pending = []
+        for k in pending:
+            xx = swe.calc_ut(flat_jds[k], swe_id, DEFAULT_FLAGS)[0]
+            delta = float(signed_difference(xx[0], flat_targets[k]))
+            flat_jds[k] -= delta / xx[3]
+            if abs(delta) > tolerance:
+                still_pending.append(k)
+        pending = still_pending
+    return flat_jds.reshape(jds.shape)
+
+
+def _returns_shard(args):
+    """Tarefa de um processo: todos os retornos de um bloco de clientes."""
+    body, natal_lons, jd_start, jd_end = args
+    return ReturnFinder().find_returns_between(body, natal_lons, jd_start, jd_end)
+
+
+class ReturnFinder:
+    def __init__(self, astrological_data=None):
+        # Só é necessário para montar os mapas completos dos retornos
+        self.astrological_data = astrological_data
+
+    def find_return(self, body, natal_lon, jd_start):
+        """Primeiro instante (Dia Juliano UT) após `jd_start` em que `body` retorna a `natal_lon`."""
+        return float(self.find_returns_between(body, [natal_lon], jd_start, jd_start + 400)[0, 0])
+
+    def find_returns_between(self, body, natal_lons, jd_start, jd_end):
+        """
+        Todos os retornos de `body` entre `jd_start` e `jd_end` para cada longitude natal.
+        As estimativas iniciais usam o movimento médio e são refinadas juntas por Newton.
+        Retorna um array (C, K) de Dias Julianos, completado com NaN (K é o máximo entre clientes).
+        """
+        natal_lons = np.atleast_1d(np.asarray(natal_lons, dtype=float))
+        mean_speed = RETURN_MEAN_SPEEDS[body]
+        period = 360.0 / mean_speed
+
+        # Primeira passagem após jd_start pela distância angular ainda a percorrer
+        start_lon = swe.calc_ut(jd_start, SWE_POINTS_MAP[body], DEFAULT_FLAGS)[0][0]
+        first_guess = jd_start + ((natal_lons - start_lon) % 360) / mean_speed
+        count = int(np.ceil((jd_end - jd_start) / period)) + 1
+        guesses = first_guess[:, None] + period * np.arange(count)[None, :]
+
+        jds = newton_returns(body, natal_lons[:, None], guesses)
+        jds[(jds < jd_start) | (jds >= jd_end)] = np.nan
+
+        # Compacta cada linha para que os retornos válidos fiquem à esquerda
+        order = np.argsort(np.isnan(jds), axis=1, kind='stable')
+        jds = np.take_along_axis(jds, order, axis=1)
+        keep = max(int((~np.isnan(jds)).sum(axis=1).max(initial=0)), 1)
+        return jds[:, :keep]
+
+    def find_returns_batch(self, body, natal_lons, start_year, end_year, workers=None, shard_size=256):
+        """
+        Retornos de muitos clientes ao longo de vários anos, em paralelo por blocos de clientes.
+        Ex.: body='Sun' gera um retorno por ano; body='Moon' gera ~13 por ano.
+        Retorna um array (C, K) de Dias Julianos completado com NaN.
+        """
+        natal_lons = np.asarray(natal_lons, dtype=float)
+        jd_start = swe.julday(start_year, 1, 1, 0.0)
+        jd_end = swe.julday(end_year + 1, 1, 1, 0.0)
+
+        shards = [(body, natal_lons[i:i + shard_size], jd_start, jd_end)
+                  for i in range(0, len(natal_lons), shard_size)]
+        if len(shards) <= 1 or workers == 1:
+            results = [_returns_shard(shard) for shard in shards]
+        else:
+            with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+                results = list(executor.map(_returns_shard, shards))
+
+        if not results:
+            return np.empty((0, 0))
+        width = max(r.shape[1] for r in results)
+        return np.vstack([np.pad(r, ((0, 0), (0, width - r.shape[1])), constant_values=np.nan)
+                          for r in results])
+
+    def solar_return_chart(self, natal_chart, year, latitude=None, longitude=None, timezone_id=None):
+        """
+        Mapa da revolução solar do ano `year`, opcionalmente relocado.
+        Retorna (dados do mapa, erro).
+        """
+        natal_sun = next(p['lon'] for p in natal_chart['point_positions'] if p['name'] == 'Sun')
+        jd_start = swe.julday(year, 1, 1, 0.0)
+        jd = self.find_returns_between('Sun', [natal_sun], jd_start, swe.julday(year + 1, 1, 1, 0.0))[0, 0]
+        return self._return_chart('solar_return', natal_chart, jd, latitude, longitude, timezone_id)
+
+    def lunar_return_charts(self, natal_chart, jd_start, jd_end, latitude=None, longitude=None, timezone_id=None):
+        """
+        Mapas de todas as revoluções lunares entre `jd_start` e `jd_end`.
+        Retorna (lista de mapas, erro).
+        """
+        natal_moon = next(p['lon'] for p in natal_chart['point_positions'] if p['name'] == 'Moon')
+        jds = self.find_returns_between('Moon', [natal_moon], jd_start, jd_end)[0]
+
+        charts = []
+        for jd in jds[~np.isnan(jds)]:
+            chart, error = self._return_chart('lunar_return', natal_chart, jd, latitude, longitude, timezone_id)
+            if error:
+                return [], error
+            charts.append(chart)
+        return charts, None
+
+    def _return_chart(self, chart_type, natal_chart, jd, latitude, longitude, timezone_id):
+        """Monta o mapa completo no instante do retorno, no local natal ou relocado."""
+        if np.isnan(jd):
+            return None, "Retorno não encontrado no período solicitado."
+        if self.astrological_data is None:
+            self.astrological_data = AstrologicalData()
+
+        return self.astrological_data.calculate_chart_data_for_jd(
+            chart_type, natal_chart['house_system'], float(jd),
+            natal_chart['latitude'] if latitude is None else latitude,
+            natal_chart['longitude'] if longitude is None else longitude,
+            timezone_id or natal_chart['timezone_id']
+        )
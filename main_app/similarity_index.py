@@ -0,0 +1,245 @@
+import os
+import json
+import tempfile
+
+import numpy as np
+
+from .constants import SIMILARITY_WEIGHTS, SIMILARITY_SEARCH_CHUNK
+
+
+class ChartSimilarityIndex:
+    """
+    Índice de "mapas mais parecidos com este" sobre milhões de mapas.
+
+    Cada mapa vira um vetor float32 com (w·cos θ, w·sin θ) por ponto, de modo
+    que a distância euclidiana entre vetores cresce com a diferença angular
+    ponderada entre os pontos, sem problema no cruzamento de 0/360.
+
+    Arquivos no diretório (todos mapeáveis em memória):
+    vectors.f32 (N, D), norms.f32 (N,), ids.i64 (N,), meta.json e, após
+    `train`, centroids.f32 / assignments.i32 para a busca aproximada (IVF).
+    """
+
+    def __init__(self, directory, weights=SIMILARITY_WEIGHTS):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+        meta_path = self._path('meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding='utf-8') as f:
+                self.meta = json.load(f)
+        else:
+            self.meta = {'points': list(weights), 'weights': [float(w) for w in weights.values()],
+                         'count': 0, 'capacity': 0, 'n_lists': 0}
+        self.points = self.meta['points']
+        self.weights = np.array(self.meta['weights'], dtype=np.float32)
+        self.dim = 2 * len(self.points)
+
+        self._open_arrays()
+        self._inverted_lists = None
+
+    # --- Codificação ---
+
+    def encode(self, point_positions, asc=None, mc=None):
+        """Codifica um `point_positions` (mais Asc/MC opcionais) no vetor circular ponderado."""
+        lon_map = {p['name']: p['lon'] for p in point_positions}
+        lon_map.update({name: value for name, value in (('Asc', asc), ('MC', mc)) if value is not None})
+        lons = np.array([lon_map.get(name, np.nan) for name in self.points], dtype=float)
+        return self.encode_longitudes(lons[None, :])[0]
+
+    def encode_chart(self, chart_data):
+        """Codifica um dicionário de mapa de `AstrologicalData.calculate_chart_data`."""
+        return self.encode(chart_data['point_positions'], chart_data.get('asc'), chart_data.get('mc'))
+
+    def encode_longitudes(self, lons):
+        """
+        Codifica longitudes (K, P) na ordem de `self.points`. Pontos ausentes (NaN)
+        contribuem com zero, o que equivale a ignorá-los na comparação.
+        """
+        radians = np.radians(np.asarray(lons, dtype=float))
+        vectors = np.empty((len(radians), self.dim), dtype=np.float32)
+        vectors[:, 0::2] = np.nan_to_num(np.cos(radians)) * self.weights
+        vectors[:, 1::2] = np.nan_to_num(np.sin(radians)) * self.weights
+        return vectors
+
+    # --- Inserção ---
+
+    def add(self, chart_ids, vectors):
+        """Insere vetores já codificados (K, D) com seus ids (K,) ao final do índice."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        chart_ids = np.asarray(chart_ids, dtype=np.int64).reshape(-1)
+        start = self.meta['count']
+        end = start + len(vectors)
+        if end > self.meta['capacity']:
+            self._grow(max(end, 2 * self.meta['capacity'], 1024))
+
+        self.vectors[start:end] = vectors
+        self.norms[start:end] = np.einsum('ij,ij->i', vectors, vectors)
+        self.ids[start:end] = chart_ids
+        if self.meta['n_lists']:
+            # Índice já treinado: novos vetores vão para a lista do centróide mais próximo
+            self.assignments[start:end] = self._nearest_centroids(vectors, 1)[:, 0]
+            self._inverted_lists = None
+
+        # Os vetores vão para o disco antes do meta.json: um 'count' gravado
+        # nunca aponta para linhas que ainda não foram escritas
+        self.meta['count'] = end
+        self.flush()
+
+    def add_charts(self, chart_ids, charts):
+        """Codifica e insere uma sequência de dicionários de mapa."""
+        self.add(chart_ids, np.vstack([self.encode_chart(c) for c in charts]))
+
+    def flush(self):
+        """Grava em disco as páginas alteradas dos arquivos mapeados e, depois delas, o meta.json."""
+        for array in (self.vectors, self.norms, self.ids, self.assignments):
+            if isinstance(array, np.memmap):
+                array.flush()
+        self._save_meta()
+
+    # --- Busca ---
+
+    def search(self, query_vector, k=10, exact=True, nprobe=8):
+        """
+        Retorna (ids, distâncias) dos `k` mapas mais próximos de `query_vector`.
+        `exact=True` percorre todos os vetores em blocos (produto matriz-vetor);
+        `exact=False` consulta só as `nprobe` listas mais próximas (requer `train`).
+        """
+        query = np.asarray(query_vector, dtype=np.float32).reshape(self.dim)
+        count = self.meta['count']
+        if count == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        if exact or not self.meta['n_lists']:
+            candidates = None
+        else:
+            candidates = self._probe_candidates(query, nprobe)
+
+        best_rows, best_dist = self._scan(query, k, candidates)
+        return np.asarray(self.ids[best_rows]), np.sqrt(np.maximum(best_dist, 0))
+
+    def _scan(self, query, k, candidates):
+        """Varre as linhas candidatas (ou todas) em blocos, mantendo só o top-k parcial."""
+        query_norm = float(query @ query)
+        best_rows = np.empty(0, dtype=np.int64)
+        best_dist = np.empty(0, dtype=np.float32)
+
+        total = self.meta['count'] if candidates is None else len(candidates)
+        for start in range(0, total, SIMILARITY_SEARCH_CHUNK):
+            if candidates is None:
+                rows = np.arange(start, min(start + SIMILARITY_SEARCH_CHUNK, total))
+                block, norms = self.vectors[rows[0]:rows[-1] + 1], self.norms[rows[0]:rows[-1] + 1]
+            else:
+                rows = candidates[start:start + SIMILARITY_SEARCH_CHUNK]
+                block, norms = self.vectors[rows], self.norms[rows]
+
+            # ||q - x||² = ||q||² + ||x||² - 2 q·x
+            dist = query_norm + norms - 2 * (block @ query)
+            rows = np.concatenate([best_rows, rows])
+            dist = np.concatenate([best_dist, dist])
+            if len(dist) > k:
+                keep = np.argpartition(dist, k - 1)[:k]
+                rows, dist = rows[keep], dist[keep]
+            best_rows, best_dist = rows, dist
+
+        order = np.argsort(best_dist)
+        return best_rows[order], best_dist[order]
+
+    # --- Busca aproximada (IVF) ---
+
+    def train(self, n_lists=1024, sample_size=100000, iterations=10, seed=0):
+        """
+        Treina os centróides da busca aproximada com k-means sobre uma amostra
+        e distribui todos os vetores existentes nas listas invertidas.
+        """
+        count = self.meta['count']
+        n_lists = min(n_lists, count)
+        rng = np.random.default_rng(seed)
+        sample = np.asarray(self.vectors[np.sort(rng.choice(count, min(sample_size, count), replace=False))])
+
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            labels = self._nearest(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            sizes = np.bincount(labels, minlength=n_lists)
+            filled = sizes > 0
+            centroids[filled] = sums[filled] / sizes[filled, None]
+
+        self.meta['n_lists'] = n_lists
+        self._write_array('centroids.f32', centroids)
+        self.centroids = centroids
+        for start in range(0, count, SIMILARITY_SEARCH_CHUNK):
+            block = np.asarray(self.vectors[start:start + SIMILARITY_SEARCH_CHUNK])
+            self.assignments[start:start + len(block)] = self._nearest(block, centroids)
+        self._inverted_lists = None
+        self.flush()
+
+    def _probe_candidates(self, query, nprobe):
+        """Linhas pertencentes às `nprobe` listas cujos centróides estão mais perto da consulta."""
+        if self._inverted_lists is None:
+            assignments = np.asarray(self.assignments[:self.meta['count']])
+            order = np.argsort(assignments, kind='stable')
+            offsets = np.searchsorted(assignments[order], np.arange(self.meta['n_lists'] + 1))
+            self._inverted_lists = (order, offsets)
+        order, offsets = self._inverted_lists
+
+        lists = self._nearest_centroids(query[None, :], nprobe)[0]
+        return np.sort(np.concatenate([order[offsets[l]:offsets[l + 1]] for l in lists]))
+
+    def _nearest_centroids(self, vectors, n):
+        """Índices dos `n` centróides mais próximos de cada vetor."""
+        dist = (self.centroids ** 2).sum(axis=1)[None, :] - 2 * (vectors @ self.centroids.T)
+        n = min(n, len(self.centroids))
+        nearest = np.argpartition(dist, n - 1, axis=1)[:, :n]
+        return np.take_along_axis(nearest, np.argsort(np.take_along_axis(dist, nearest, axis=1), axis=1), axis=1)
+
+    def _nearest(self, vectors, centroids):
+        """Centróide mais próximo de cada vetor."""
+        dist = (centroids ** 2).sum(axis=1)[None, :] - 2 * (vectors @ centroids.T)
+        return dist.argmin(axis=1)
+
+    # --- Armazenamento ---
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _open_arrays(self):
+        """Mapeia os arquivos existentes em memória (ou cria arrays vazios)."""
+        capacity = self.meta['capacity']
+        self.vectors = self._memmap('vectors.f32', np.float32, (capacity, self.dim))
+        self.norms = self._memmap('norms.f32', np.float32, (capacity,))
+        self.ids = self._memmap('ids.i64', np.int64, (capacity,))
+        self.assignments = self._memmap('assignments.i32', np.int32, (capacity,))
+        self.centroids = None
+        if self.meta['n_lists']:
+            self.centroids = np.fromfile(self._path('centroids.f32'), dtype=np.float32).reshape(-1, self.dim)
+
+    def _memmap(self, name, dtype, shape):
+        if shape[0] == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(self._path(name), dtype=dtype, mode='r+', shape=shape)
+
+    def _grow(self, capacity):
+        """Aumenta os arquivos para `capacity` linhas e os remapeia."""
+        self.flush()
+        for name, dtype, width in (('vectors.f32', np.float32, self.dim), ('norms.f32', np.float32, 1),
+                                   ('ids.i64', np.int64, 1), ('assignments.i32', np.int32, 1)):
+            with open(self._path(name), 'ab') as f:
+                f.truncate(capacity * width * np.dtype(dtype).itemsize)
+        self.meta['capacity'] = capacity
+        self._open_arrays()
+
+    def _write_array(self, name, array):
+        np.ascontiguousarray(array).tofile(self._path(name))
+
+    def _save_meta(self):
+        """Grava o meta.json de forma atômica (arquivo temporário + os.replace)."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.meta, f)
+            os.replace(tmp_path, self._path('meta.json'))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
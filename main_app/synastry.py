@@ -0,0 +1,82 @@
+import numpy as np
+
+from .constants import ASPECTS, ASPECT_POINTS, DEFAULT_ASPECT_ORB, SYNASTRY_ASPECT_WEIGHTS
+from .angular_math import separation_matrix, match_aspects, longitudes_array
+
+
+class SynastryCalculator:
+    def __init__(self, orb=DEFAULT_ASPECT_ORB, points=ASPECT_POINTS):
+        self.orb = orb
+        self.points = list(points)
+        self.aspect_names = list(ASPECTS)
+        # Vetor de pesos alinhado à ordem de ASPECTS (usado na pontuação em lote)
+        self.aspect_weights = np.array(
+            [SYNASTRY_ASPECT_WEIGHTS.get(name, 0.0) for name in self.aspect_names], dtype=float
+        )
+
+    def cross_aspects(self, inner_chart, outer_chart):
+        """
+        Calcula os aspectos cruzados entre dois mapas (sinastria).
+        Os pontos do mapa interno formam as linhas e os do externo as colunas
+        de uma única matriz de separações N×M.
+        Retorna (aspects_data, textual_aspects) no mesmo formato de `_calculate_aspects`.
+        """
+        inner_lons = longitudes_array(inner_chart['point_positions'], self.points)
+        outer_lons = longitudes_array(outer_chart['point_positions'], self.points)
+
+        separations = separation_matrix(inner_lons, outer_lons)
+        aspect_index, exact_orb = match_aspects(separations, self.orb)
+
+        aspect_lines_info = []
+        textual_aspects = []
+        for i, j in zip(*np.nonzero(aspect_index >= 0)):
+            name1 = self.points[i]
+            name2 = self.points[j]
+            aspect_name = self.aspect_names[aspect_index[i, j]]
+            angle, color = ASPECTS[aspect_name]
+
+            aspect_lines_info.append({
+                'point1': name1, 'point2': name2, 'color': color,
+                'aspect': aspect_name, 'angle': angle, 'orb': float(exact_orb[i, j])
+            })
+            textual_aspects.append(
+                f"{name1} (1) - {name2} (2): {aspect_name} ({separations[i, j]:.2f}°)"
+            )
+        return aspect_lines_info, textual_aspects
+
+    def longitudes_matrix(self, charts):
+        """Empilha as longitudes de vários mapas em um array (K, P) para pontuação em lote."""
+        return np.vstack([longitudes_array(c['point_positions'], self.points) for c in charts])
+
+    def score_batch(self, reference_chart, candidate_longitudes, chunk_size=4096):
+        """
+        Pontua a compatibilidade de um mapa contra muitos outros de uma vez.
+        `candidate_longitudes` é um array (K, P) na ordem de `self.points`
+        (ver `longitudes_matrix`). Cada aspecto cruzado contribui com o peso do
+        aspecto multiplicado pela exatidão (1 - orbe/orbe máximo).
+        Retorna um array (K,) de pontuações.
+        """
+        reference_lons = longitudes_array(reference_chart['point_positions'], self.points)
+        candidate_longitudes = np.asarray(candidate_longitudes, dtype=float)
+        scores = np.empty(len(candidate_longitudes), dtype=float)
+
+        # Processa em blocos para limitar a memória do tensor (bloco, N, M, aspectos)
+        for start in range(0, len(candidate_longitudes), chunk_size):
+            block = candidate_longitudes[start:start + chunk_size]
+            separations = separation_matrix(np.broadcast_to(reference_lons, block.shape), block)
+            aspect_index, exact_orb = match_aspects(separations, self.orb)
+
+            # Pares com ponto ausente (NaN) não formam aspecto; o orbe NaN não pode contaminar a soma
+            exactness = np.clip(1.0 - exact_orb / self.orb, 0.0, 1.0)
+            contributions = np.where(aspect_index >= 0,
+                                     self.aspect_weights[np.maximum(aspect_index, 0)] * exactness, 0.0)
+            scores[start:start + chunk_size] = contributions.sum(axis=(1, 2))
+        return scores
+
+    def best_matches(self, reference_chart, candidate_longitudes, top_n=10):
+        """Retorna (índices, pontuações) dos `top_n` candidatos mais compatíveis."""
+        scores = self.score_batch(reference_chart, candidate_longitudes)
+        top_n = min(top_n, len(scores))
+        best = np.argpartition(-scores, top_n - 1)[:top_n]
+        best = best[np.argsort(-scores[best])]
+        return best, scores[best]
@@ -0,0 +1,249 @@
+import math
+
+import tkinter as tk
+from PIL import Image, ImageTk
+
+from .constants import (
+    PLANET_SYMBOLS_PATHS, ADDITIONAL_POINT_SYMBOLS_PATHS, ALL_POINT_IMAGES,
+    SIGN_UNICODE_SYMBOLS, PLANET_UNICODE_SYMBOLS, SIGNS, ELEMENT_COLORS, SIGN_ELEMENTS, CHART_TYPE_TITLES,
+    IMAGE_CENTER_R, DEGREE_TEXT_R, MINUTES_TEXT_R, RETROGRADE_TEXT_R,
+    POINT_TICK_R_OUTER, POINT_TICK_R_INNER, POINT_TICK_LINEWIDTH,
+    POINT_TICK_R_OUTER_INNER_CIRCLE, POINT_TICK_R_INNER_CIRCLE,
+    DEGREE_TEXT_FONTSIZE, MINUTES_TEXT_FONTSIZE, RETROGRADE_TEXT_FONTSIZE,
+    HOUSE_NUMBER_R, SIGN_LINE_R_INNER, SIGN_LINE_R_OUTER, ASPECT_RADIAL_POS,
+    TK_WHEEL_FIT_R, TK_REFERENCE_RADIUS_PX, TK_GLYPH_SIZE_PX, TK_TITLE_FONTSIZE
+)
+from .chart_renderer import spread_point_positions
+from .chart_inspector import ChartHitIndex
+
+ALL_POINT_SYMBOLS_PATHS = {**PLANET_SYMBOLS_PATHS, **ADDITIONAL_POINT_SYMBOLS_PATHS}
+
+
+class TkChartRenderer:
+    """
+    Renderizador do mapa direto num tk.Canvas, alternativa leve ao Matplotlib
+    na interface. Cada elemento do desenho tem uma chave estável (ex.:
+    'cusp:3', 'glyph:Sun', 'aspect:5'); ao redesenhar — novo mapa, troca de
+    sistema de casas ou redimensionamento — os itens existentes só são
+    movidos (`coords`) e reconfigurados, nunca recriados. Itens que sobram
+    ficam ocultos para reuso. Usa os mesmos raios e fontes de constants.py
+    que o ChartRenderer, medidos em unidades do raio do mapa.
+
+    Tags: cada item leva sua chave e o grupo ('wheel', 'cusp', 'point',
+    'aspect', ...); pontos levam também 'point:<nome>' e linhas de aspecto
+    'pair:<ponto1>|<ponto2>', atualizadas a cada desenho.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.chart_data = None
+        self._items = {} # chave -> id do item no canvas
+        self._used = set()
+        self._pair_tags = {} # chave da linha de aspecto -> tag do par atual
+        self._photo_cache = {} # (nome, lado em px) -> PhotoImage
+        self._geometry = None
+        self.hit_index = None # Índice de acerto do mapa desenhado (inspeção interativa)
+        self.canvas.bind("<Configure>", self._on_resize, add="+")
+
+    # --- API pública ---
+
+    def render(self, chart_data):
+        """Desenha (ou redesenha, reaproveitando os itens) o mapa `chart_data`."""
+        self.chart_data = chart_data
+        self._update_geometry()
+        self._used = set()
+
+        self._draw_title(chart_data)
+        self._draw_house_cusps(chart_data['houses'])
+        self._draw_circles()
+        self._draw_house_numbers(chart_data['houses'])
+        self._draw_sign_divisions()
+        drawn_points = self._draw_points(chart_data['point_positions'])
+        self._draw_aspect_lines(chart_data['aspects_data'], chart_data['point_positions'])
+        self.hit_index = ChartHitIndex(chart_data, drawn_points)
+
+        for key, item in self._items.items():
+            if key not in self._used:
+                self.canvas.itemconfigure(item, state=tk.HIDDEN)
+        # Símbolos sempre por cima das linhas
+        self.canvas.tag_raise('point')
+
+    def clear(self):
+        """Oculta todos os itens (mantidos para o próximo desenho)."""
+        self.chart_data = None
+        self.hit_index = None
+        for item in self._items.values():
+            self.canvas.itemconfigure(item, state=tk.HIDDEN)
+
+    def to_canvas(self, lon, radius):
+        """Coordenadas (x, y) no canvas de uma longitude eclíptica num raio do mapa."""
+        cx, cy, scale_px, rotation = self._geometry
+        angle = math.radians(lon + rotation)
+        return cx + radius * scale_px * math.cos(angle), cy - radius * scale_px * math.sin(angle)
+
+    def from_canvas(self, x, y):
+        """Inverso de `to_canvas`: (longitude eclíptica, raio do mapa) de um pixel do canvas."""
+        cx, cy, scale_px, rotation = self._geometry
+        dx, dy = x - cx, cy - y
+        return (math.degrees(math.atan2(dy, dx)) - rotation) % 360, math.hypot(dx, dy) / scale_px
+
+    # --- Geometria e reuso de itens ---
+
+    def _on_resize(self, event):
+        if self.chart_data is not None:
+            self.render(self.chart_data)
+
+    def _update_geometry(self):
+        """Centro, pixels por unidade de raio e rotação (Ascendente à esquerda)."""
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if width <= 1 or height <= 1: # Canvas ainda não mapeado: usa o tamanho pedido
+            width, height = int(self.canvas.cget('width')), int(self.canvas.cget('height'))
+        title_px = 4 * TK_TITLE_FONTSIZE
+        scale_px = max(min(width, height - title_px) / 2 / TK_WHEEL_FIT_R, 1.0)
+        # Mesmo sentido e offset do eixo polar do ChartRenderer: lon = Asc aparece em 180°
+        rotation = 180 - self.chart_data['asc']
+        self._geometry = (width / 2, title_px + (height - title_px) / 2, scale_px, rotation)
+        self._scale = scale_px / TK_REFERENCE_RADIUS_PX
+
+    def _font(self, size, weight=None):
+        font_size = max(int(round(size * self._scale)), 6)
+        return ("Arial", font_size, weight) if weight else ("Arial", font_size)
+
+    def _item(self, key, kind, coords, group, **options):
+        """Cria o item `key` na primeira vez; depois só o move e o reconfigura."""
+        item = self._items.get(key)
+        if item is None:
+            create = getattr(self.canvas, f"create_{kind}")
+            item = create(*coords, tags=(key, group), **options)
+            self._items[key] = item
+        else:
+            self.canvas.coords(item, *coords)
+            self.canvas.itemconfigure(item, state=tk.NORMAL, **options)
+        self._used.add(key)
+        return item
+
+    def _retag(self, key, new_tag):
+        """Troca a tag variável de um item reaproveitado (ex.: o par de um aspecto)."""
+        old_tag = self._pair_tags.get(key)
+        if old_tag == new_tag:
+            return
+        item = self._items[key]
+        if old_tag is not None:
+            self.canvas.dtag(item, old_tag)
+        self.canvas.addtag_withtag(new_tag, item)
+        self._pair_tags[key] = new_tag
+
+    def _radial_line(self, key, lon, r_inner, r_outer, group, **options):
+        x0, y0 = self.to_canvas(lon, r_inner)
+        x1, y1 = self.to_canvas(lon, r_outer)
+        return self._item(key, 'line', (x0, y0, x1, y1), group, **options)
+
+    def _circle(self, key, radius, group, **options):
+        cx, cy, scale_px, _ = self._geometry
+        r = radius * scale_px
+        return self._item(key, 'oval', (cx - r, cy - r, cx + r, cy + r), group, **options)
+
+    def _photo(self, point_name, size_px):
+        """Imagem do símbolo redimensionada para `size_px`, guardada em cache por tamanho."""
+        key = (point_name, size_px)
+        if key not in self._photo_cache:
+            image = Image.open(ALL_POINT_SYMBOLS_PATHS[point_name]).convert('RGBA')
+            self._photo_cache[key] = ImageTk.PhotoImage(image.resize((size_px, size_px), Image.LANCZOS),
+                                                        master=self.canvas)
+        return self._photo_cache[key]
+
+    # --- Elementos do mapa ---
+
+    def _draw_title(self, chart_data):
+        chart_title_type = CHART_TYPE_TITLES.get(chart_data['chart_type'], "Mapa Astral")
+        title = (f"{chart_title_type} ({chart_data['house_system']} Casas) para {chart_data['birth_date'].strftime('%Y-%m-%d %H:%M')}\n"
+                 f"{chart_data['latitude']:.2f}, {chart_data['longitude']:.2f} ({chart_data['timezone_id']})")
+        cx = self._geometry[0]
+        self._item('title', 'text', (cx, 4), 'title', text=title, anchor=tk.N, justify=tk.CENTER,
+                   font=("Arial", TK_TITLE_FONTSIZE))
+
+    def _draw_house_cusps(self, houses):
+        """Desenha as linhas das cúspides das casas."""
+        for i, cusp_lon in enumerate(houses[:12]):
+            self._radial_line(f'cusp:{i}', cusp_lon, 0.55, 1.0, 'cusp', fill='gray', width=1.5)
+
+    def _draw_circles(self):
+        """Desenha os círculos principais do mapa."""
+        self._circle('circle:outer', 1.0, 'wheel', outline='black', width=1.5)
+        self._circle('circle:inner', 0.55, 'wheel', outline='gray', width=1.5)
+        self._circle('circle:inner_outer', 0.65, 'wheel', outline='gray', width=1.5)
+
+    def _draw_house_numbers(self, houses):
+        """Desenha os números das casas no meio de cada casa."""
+        for i in range(12):
+            cusp_start = houses[i]
+            cusp_end = houses[(i + 1) % 12]
+            if cusp_end < cusp_start:
+                cusp_end += 360
+            x, y = self.to_canvas((cusp_start + cusp_end) / 2 % 360, HOUSE_NUMBER_R)
+            self._item(f'house_number:{i}', 'text', (x, y), 'house_number', text=str(i + 1),
+                       font=self._font(14, 'bold'))
+
+    def _draw_sign_divisions(self):
+        """Desenha as divisões dos signos e seus símbolos."""
+        for i, sign_name in enumerate(SIGNS):
+            self._radial_line(f'sign_line:{i}', i * 30, SIGN_LINE_R_INNER, SIGN_LINE_R_OUTER, 'sign', fill='black')
+            x, y = self.to_canvas(i * 30 + 15, 1.040)
+            color = ELEMENT_COLORS.get(SIGN_ELEMENTS.get(sign_name), 'black')
+            self._item(f'sign_glyph:{i}', 'text', (x, y), 'sign', text=SIGN_UNICODE_SYMBOLS.get(sign_name, '?'),
+                       fill=color, font=self._font(18, 'bold'))
+
+    def _draw_points(self, point_positions):
+        """Desenha símbolos, marcas, graus, minutos e o 'R' de retrógrado de cada ponto."""
+        glyph_px = max(int(round(TK_GLYPH_SIZE_PX * self._scale)), 8)
+        drawn_points = spread_point_positions(point_positions)
+        for p_info in drawn_points:
+            name = p_info['name']
+            original_lon = p_info['original_lon']
+            adjusted_lon = p_info['adjusted_lon']
+            point_tag = f'point:{name}'
+
+            self._radial_line(f'tick_outer:{name}', original_lon, POINT_TICK_R_INNER, POINT_TICK_R_OUTER,
+                              'tick', fill='black', width=POINT_TICK_LINEWIDTH)
+            self._radial_line(f'tick_inner:{name}', original_lon, POINT_TICK_R_INNER_CIRCLE,
+                              POINT_TICK_R_OUTER_INNER_CIRCLE, 'tick', fill='black', width=POINT_TICK_LINEWIDTH)
+
+            x, y = self.to_canvas(adjusted_lon, IMAGE_CENTER_R)
+            if ALL_POINT_IMAGES.get(name) is not None:
+                self._item(f'glyph:{name}', 'image', (x, y), 'point', image=self._photo(name, glyph_px))
+            else:
+                self._item(f'glyph:{name}', 'text', (x, y), 'point', text=PLANET_UNICODE_SYMBOLS.get(name, '?'),
+                           font=self._font(16, 'bold'))
+            self.canvas.addtag_withtag(point_tag, self._items[f'glyph:{name}'])
+
+            degree_decimal = original_lon % 30
+            degrees = int(degree_decimal)
+            minutes = int((degree_decimal - degrees) * 60)
+            x, y = self.to_canvas(adjusted_lon, DEGREE_TEXT_R)
+            self._item(f'degree:{name}', 'text', (x, y), 'point', text=f"{degrees}°",
+                       font=self._font(DEGREE_TEXT_FONTSIZE))
+            x, y = self.to_canvas(adjusted_lon, MINUTES_TEXT_R)
+            self._item(f'minutes:{name}', 'text', (x, y), 'point', text=f"{minutes:02d}'",
+                       font=self._font(MINUTES_TEXT_FONTSIZE))
+
+            if p_info['retrograde']:
+                x, y = self.to_canvas(adjusted_lon, RETROGRADE_TEXT_R)
+                self._item(f'retrograde:{name}', 'text', (x, y), 'point', text="R", fill='red',
+                           font=self._font(RETROGRADE_TEXT_FONTSIZE, 'bold'))
+        return drawn_points
+
+    def _draw_aspect_lines(self, aspects_data, all_point_positions):
+        """Desenha as linhas dos aspectos, reaproveitando as linhas do desenho anterior."""
+        point_lon_map = {p['name']: p['lon'] for p in all_point_positions}
+        index = 0
+        for aspect_info in aspects_data:
+            lon1 = point_lon_map.get(aspect_info['point1'])
+            lon2 = point_lon_map.get(aspect_info['point2'])
+            if lon1 is None or lon2 is None:
+                continue
+            key = f'aspect:{index}'
+            x0, y0 = self.to_canvas(lon1, ASPECT_RADIAL_POS)
+            x1, y1 = self.to_canvas(lon2, ASPECT_RADIAL_POS)
+            self._item(key, 'line', (x0, y0, x1, y1), 'aspect', fill=aspect_info['color'], width=1.5)
+            self._retag(key, f"pair:{aspect_info['point1']}|{aspect_info['point2']}")
+            index += 1
@@ -0,0 +1,148 @@
+import os
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .constants import (
+    ASPECTS, ASPECT_POINTS, TRANSIT_FORECAST_ORB_DEGREES, TRANSIT_FORECAST_SHARD_SIZE,
+    TRANSIT_FORECAST_MAX_CELLS, TRANSIT_NATAL_POINTS
+)
+from .angular_math import signed_difference, match_aspects
+from .ephemeris import sample_positions
+from .lunations import natal_matrix
+
+_ASPECT_NAMES = list(ASPECTS)
+_ASPECT_ANGLES = np.array([angle for angle, _ in ASPECTS.values()], dtype=float)
+_SORTED_ANGLES = np.sort(_ASPECT_ANGLES)
+
+
+def _near_any_aspect(separations, orb):
+    """
+    Pré-filtro: separações a até `orb` de algum ângulo de aspecto. Compara
+    só com os dois ângulos vizinhos (searchsorted), sem o array (..., aspectos)
+    de match_aspects, que fica restrito aos poucos candidatos.
+    """
+    upper = np.searchsorted(_SORTED_ANGLES, separations).clip(1, len(_SORTED_ANGLES) - 1)
+    return ((separations - _SORTED_ANGLES[upper - 1] <= orb) |
+            (_SORTED_ANGLES[upper] - separations <= orb))
+
+
+def _forecast_shard(args):
+    """
+    Tarefa de um processo: compara as efemérides de trânsito (D, T) com as
+    longitudes natais de um lote de clientes (N, P) num único broadcast
+    (D, T, N, P), em blocos de no máximo `max_cells` células.
+    Devolve arrays paralelos dos contatos, com o cliente indexado no lote.
+    """
+    transit_lons, transit_speeds, natal_lons, orb, max_cells = args
+    days, transiting = transit_lons.shape
+    n_points = natal_lons.shape[1]
+    block_size = max(1, max_cells // (days * transiting * n_points))
+
+    found = {key: [] for key in ('day', 'transiting', 'client', 'point', 'aspect', 'orb', 'applying')}
+    for start in range(0, len(natal_lons), block_size):
+        block = natal_lons[start:start + block_size]
+        diff = signed_difference(transit_lons[:, :, None, None], block[None, None, :, :]) # (D, T, n, P)
+        d, t, c, p = np.nonzero(_near_any_aspect(np.abs(diff), orb)) # NaN (ponto ausente) nunca passa
+        hit_diff = diff[d, t, c, p]
+        aspects, orbs = match_aspects(np.abs(hit_diff), orb)
+        matched = aspects >= 0
+        d, t, c, p, hit_diff, aspects, orbs = (a[matched] for a in (d, t, c, p, hit_diff, aspects, orbs))
+
+        # Aplicativo: a separação caminha na direção do ângulo exato do aspecto
+        separation_rate = transit_speeds[d, t] * np.sign(hit_diff)
+        applying = (np.abs(hit_diff) - _ASPECT_ANGLES[aspects]) * separation_rate < 0
+
+        found['day'].append(d)
+        found['transiting'].append(t)
+        found['client'].append(c + start)
+        found['point'].append(p)
+        found['aspect'].append(aspects)
+        found['orb'].append(orbs)
+        found['applying'].append(applying)
+    return {key: (np.concatenate(values) if values else np.array([], dtype=int)) for key, values in found.items()}
+
+
+class TransitForecast:
+    """
+    Previsão diária de trânsitos para uma carteira inteira de clientes.
+    As posições dos planetas em trânsito são as mesmas para todos, então as
+    efemérides do período são calculadas uma única vez (no construtor) e
+    comparadas com as longitudes natais de lotes de clientes por broadcast
+    NumPy (dias × trânsitos × clientes × pontos). Os lotes rodam em processos
+    paralelos e no máximo `2 * workers` ficam em trânsito ao mesmo tempo,
+    então a memória não depende do tamanho da carteira.
+    """
+
+    def __init__(self, jd_start, days, transiting=ASPECT_POINTS, natal_points=TRANSIT_NATAL_POINTS,
+                 orb=TRANSIT_FORECAST_ORB_DEGREES, shard_size=TRANSIT_FORECAST_SHARD_SIZE,
+                 max_cells=TRANSIT_FORECAST_MAX_CELLS, workers=None):
+        self.jds = jd_start + np.arange(days, dtype=float)
+        self.transiting = list(transiting)
+        self.natal_points = list(natal_points)
+        self.orb = orb
+        self.shard_size = shard_size
+        self.max_cells = max_cells
+        self.workers = workers or os.cpu_count()
+        self.transit_lons, self.transit_speeds = sample_positions(self.jds, self.transiting)
+
+    def _iter_shards(self, roster):
+        """
+        Agrupa a carteira em lotes (ids, matriz (N, P)) sem materializar a entrada.
+        Cada item de `roster` é (id do cliente, mapa) ou (id, longitudes na ordem de `natal_points`).
+        """
+        iterator = iter(roster)
+        while True:
+            shard = list(itertools.islice(iterator, self.shard_size))
+            if not shard:
+                return
+            ids = [client_id for client_id, _ in shard]
+            rows = [natal_matrix([natal], self.natal_points)[0] if isinstance(natal, dict) else natal
+                    for _, natal in shard]
+            yield ids, np.asarray(rows, dtype=float).reshape(len(shard), len(self.natal_points))
+
+    def _client_hits(self, ids, found):
+        """Separa os contatos de um lote em listas por cliente, em ordem de dia e orbe."""
+        order = np.lexsort((found['orb'], found['day'], found['client']))
+        found = {key: values[order] for key, values in found.items()}
+        bounds = np.searchsorted(found['client'], np.arange(len(ids) + 1))
+        for c, client_id in enumerate(ids):
+            yield client_id, [{
+                'jd': float(self.jds[found['day'][k]]),
+                'transiting': self.transiting[found['transiting'][k]],
+                'natal': self.natal_points[found['point'][k]],
+                'aspect': _ASPECT_NAMES[found['aspect'][k]],
+                'orb': float(found['orb'][k]),
+                'applying': bool(found['applying'][k]),
+            } for k in range(bounds[c], bounds[c + 1])]
+
+    def iter_reports(self, roster):
+        """
+        Gera (id do cliente, lista de contatos) para cada cliente da carteira,
+        na ordem da entrada. Cada contato tem 'jd', 'transiting', 'natal',
+        'aspect', 'orb' e 'applying'.
+        """
+        tasks = ((ids, (self.transit_lons, self.transit_speeds, natal_lons, self.orb, self.max_cells))
+                 for ids, natal_lons in self._iter_shards(roster))
+
+        if self.workers == 1:
+            for ids, task in tasks:
+                yield from self._client_hits(ids, _forecast_shard(task))
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            in_flight = deque()
+            for ids, task in tasks:
+                in_flight.append((ids, executor.submit(_forecast_shard, task)))
+                if len(in_flight) >= 2 * self.workers:
+                    ids, future = in_flight.popleft()
+                    yield from self._client_hits(ids, future.result())
+            while in_flight:
+                ids, future = in_flight.popleft()
+                yield from self._client_hits(ids, future.result())
+
+    def run(self, roster):
+        """Contatos de todos os clientes num dicionário {id: lista de contatos}."""
+        return dict(self.iter_reports(roster))
@@ -0,0 +1,239 @@
+import threading
+
+import swisseph as swe
+import numpy as np
+
+from .constants import (
+    ASPECTS, TRADITIONAL_PLANETS, MAX_DAILY_SPEEDS,
+    VOID_OF_COURSE_STEP_DAYS, VOID_OF_COURSE_MARGIN_DAYS
+)
+from .angular_math import signed_difference
+from .ephemeris import EphemerisSampler
+
+# Planetas com que a Lua faz aspectos no julgamento horário
+MOON_ASPECT_PLANETS = [p for p in TRADITIONAL_PLANETS if p != 'Moon']
+
+
+def _aspect_offsets(aspects=ASPECTS):
+    """Ângulos Lua-planeta (0 a 360) que perfazem cada aspecto e o nome do aspecto de cada um."""
+    offsets, names = [], []
+    for name, (angle, _) in aspects.items():
+        for offset in sorted({angle % 360, (-angle) % 360}):
+            offsets.append(offset)
+            names.append(name)
+    return np.array(offsets, dtype=float), names
+
+
+def moon_void_of_course(samples, planets=TRADITIONAL_PLANETS, aspects=ASPECTS):
+    """
+    Estimativa vetorizada de Lua fora de curso em cada amostra: verdadeiro se,
+    mantidas as velocidades atuais, a Lua não aperfeiçoa nenhum aspecto com os
+    planetas tradicionais antes de sair do signo. O estado muda numa
+    perfeição, numa mudança de signo ou quando um alvo de aspecto (ou o
+    ponto de encontro previsto com a Lua) cruza o fim do signo da Lua, então
+    os dias seguros vêm da menor dessas distâncias, cada uma dividida pela
+    velocidade máxima de quem a percorre.
+    Retorna (fora de curso (T,) bool, dias seguros (T,)).
+    """
+    moon = samples['lons']['Moon']
+    moon_speed = samples['speeds']['Moon']
+    remaining = 30 - moon % 30
+    sign_end = (moon + remaining) % 360
+    offsets, _ = _aspect_offsets(aspects)
+
+    perfects = np.zeros(len(moon), dtype=bool)
+    nearest_event = np.minimum(moon % 30, remaining) / MAX_DAILY_SPEEDS['Moon']
+    for planet in planets:
+        if planet == 'Moon':
+            continue
+        targets = (samples['lons'][planet][:, None] + offsets[None, :]) % 360
+        ahead = (targets - moon[:, None]) % 360
+        relative_speed = (moon_speed - samples['speeds'][planet])[:, None]
+        moon_travel = moon_speed[:, None] * ahead / relative_speed
+        perfects |= ((relative_speed > 0) & (moon_travel < remaining[:, None])).any(axis=1)
+
+        distance = np.minimum(ahead, 360 - ahead).min(axis=1)
+        rate = MAX_DAILY_SPEEDS['Moon'] + MAX_DAILY_SPEEDS[planet]
+        nearest_event = np.minimum(nearest_event, distance / rate)
+
+        # `moon_travel < remaining` também vira sem perfeição nem ingresso quando
+        # o alvo, ou o ponto de encontro, atravessa o fim do signo
+        target_to_end = np.abs(signed_difference(targets, sign_end[:, None])).min(axis=1)
+        meeting_to_end = np.where(relative_speed > 0, np.abs(remaining[:, None] - moon_travel), np.inf).min(axis=1)
+        nearest_event = np.minimum(nearest_event, np.minimum(target_to_end, meeting_to_end) / MAX_DAILY_SPEEDS[planet])
+    return ~perfects, nearest_event
+
+
+def moon_events(jd_start, jd_end, planets=MOON_ASPECT_PLANETS, step=VOID_OF_COURSE_STEP_DAYS):
+    """
+    Todas as perfeições de aspecto da Lua com `planets` e todos os ingressos
+    da Lua em signos entre `jd_start` e `jd_end`.
+    Cruzamentos são detectados numa grade horária vetorizada e refinados por
+    duas iterações de Newton sobre as efemérides interpoladas.
+    Retorna arrays ordenados por tempo: 'perfection_jds', 'perfection_planets',
+    'perfection_aspects' (índices) e 'ingress_jds', 'ingress_signs'.
+    """
+    sampler = EphemerisSampler(jd_start, jd_end, ['Moon'] + list(planets))
+    grid = np.append(np.arange(jd_start, jd_end, step), jd_end)
+    samples = sampler.sample(grid, with_angles=False)
+    moon = samples['lons']['Moon']
+    offsets, offset_names = _aspect_offsets()
+    aspect_names = list(ASPECTS)
+
+    # --- Perfeições: g = (Lua - planeta - ângulo) cruza zero subindo (a Lua é sempre mais rápida)
+    planet_lons = np.stack([samples['lons'][p] for p in planets], axis=1) # (T, P)
+    g = signed_difference(moon[:, None, None] - planet_lons[:, :, None], offsets[None, None, :]) # (T, P, O)
+    crossing = (g[:-1] < 0) & (g[1:] >= 0) & (g[1:] - g[:-1] < 90)
+    t, planet_idx, offset_idx = np.nonzero(crossing)
+    jds = grid[t] + (-g[t, planet_idx, offset_idx]) / (g[t + 1, planet_idx, offset_idx] - g[t, planet_idx, offset_idx]) * step
+
+    for _ in range(2):
+        refined = sampler.sample(jds, with_angles=False)
+        moon_now = refined['lons']['Moon']
+        planet_now = np.array([refined['lons'][planets[p]][k] for k, p in enumerate(planet_idx)])
+        planet_speed = np.array([refined['speeds'][planets[p]][k] for k, p in enumerate(planet_idx)])
+        residual = signed_difference(moon_now - planet_now, offsets[offset_idx])
+        jds = jds - residual / (refined['speeds']['Moon'] - planet_speed)
+
+    order = np.argsort(jds)
+    perfection_jds = jds[order]
+    perfection_planets = planet_idx[order]
+    perfection_aspects = np.array([aspect_names.index(offset_names[o]) for o in offset_idx[order]], dtype=int)
+
+    # --- Ingressos: mudança do índice do signo entre amostras consecutivas
+    signs = (moon // 30).astype(int) % 12
+    t = np.nonzero(signs[1:] != signs[:-1])[0]
+    new_signs = signs[t + 1]
+    boundary = new_signs * 30.0
+    ingress_jds = grid[t] + (-signed_difference(moon[t], boundary)) / (
+        signed_difference(moon[t + 1], boundary) - signed_difference(moon[t], boundary)) * step
+    for _ in range(2):
+        refined = sampler.sample(ingress_jds, with_angles=False)
+        ingress_jds = ingress_jds - signed_difference(refined['lons']['Moon'], boundary) / refined['speeds']['Moon']
+
+    return {
+        'perfection_jds': perfection_jds,
+        'perfection_planets': perfection_planets,
+        'perfection_aspects': perfection_aspects,
+        'ingress_jds': ingress_jds,
+        'ingress_signs': new_signs,
+        'planets': list(planets),
+        'aspect_names': aspect_names,
+    }
+
+
+class VoidOfCourseCalendar:
+    """
+    Lua fora de curso para horária. Os eventos (perfeições e ingressos) e os
+    períodos fora de curso são calculados por mês civil (UT) e guardados em
+    cache, de modo que a consulta na visão horária ao vivo só filtra arrays
+    já prontos.
+    """
+
+    def __init__(self):
+        self._months = {}
+        self._lock = threading.Lock()
+
+    # --- Tabelas mensais ---
+
+    def month_table(self, year, month):
+        """Eventos e períodos fora de curso do mês (calculados uma única vez)."""
+        key = (year, month)
+        with self._lock:
+            table = self._months.get(key)
+        if table is None:
+            table = self._compute_month(year, month)
+            with self._lock:
+                self._months[key] = table
+        return table
+
+    def precompute(self, year, month, months_ahead=1):
+        """Calcula em segundo plano o mês indicado e os seguintes."""
+        def worker():
+            y, m = year, month
+            for _ in range(months_ahead + 1):
+                self.month_table(y, m)
+                y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        return thread
+
+    def _compute_month(self, year, month):
+        jd_start = swe.julday(year, month, 1, 0.0)
+        next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        jd_end = swe.julday(next_year, next_month, 1, 0.0)
+
+        # Margem antes do mês: o signo em curso no dia 1º começou até ~2,5 dias antes
+        events = moon_events(jd_start - VOID_OF_COURSE_MARGIN_DAYS, jd_end)
+        ingresses = events['ingress_jds']
+        perfections = events['perfection_jds']
+
+        # Para cada ingresso no mês, o período vai do último aspecto no signo anterior até o ingresso
+        void_starts, void_ends = [], []
+        for i in np.nonzero(ingresses >= jd_start)[0]:
+            sign_start = ingresses[i - 1] if i > 0 else jd_start - VOID_OF_COURSE_MARGIN_DAYS
+            in_sign = perfections[(perfections >= sign_start) & (perfections < ingresses[i])]
+            void_starts.append(in_sign[-1] if len(in_sign) else sign_start)
+            void_ends.append(ingresses[i])
+
+        return {**events, 'jd_start': jd_start, 'jd_end': jd_end,
+                'void_starts': np.array(void_starts), 'void_ends': np.array(void_ends)}
+
+    def _tables_around(self, jd):
+        """Tabelas do mês de `jd` e dos meses vizinhos (para eventos perto da virada do mês)."""
+        year, month, _, _ = swe.revjul(jd)
+        previous = (year - 1, 12) if month == 1 else (year, month - 1)
+        following = (year + 1, 1) if month == 12 else (year, month + 1)
+        return [self.month_table(*ym) for ym in (previous, (year, month), following)]
+
+    # --- Consultas ---
+
+    def void_periods(self, jd_start, jd_end):
+        """Períodos (início, fim) fora de curso que intersectam o intervalo, em ordem."""
+        periods = []
+        year, month, _, _ = swe.revjul(jd_start)
+        while swe.julday(year, month, 1, 0.0) < jd_end:
+            table = self.month_table(year, month)
+            for start, end in zip(table['void_starts'], table['void_ends']):
+                if end > jd_start and start < jd_end:
+                    periods.append((float(start), float(end)))
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return periods
+
+    def moon_report(self, jd):
+        """
+        Situação da Lua no instante `jd` (ex.: o de um mapa horário):
+        último e próximo aspecto perfeito com cada planeta tradicional, saída
+        do signo atual e se a Lua está fora de curso (com o período).
+        """
+        tables = self._tables_around(jd)
+        perfection_jds = np.concatenate([t['perfection_jds'] for t in tables])
+        perfection_planets = np.concatenate([t['perfection_planets'] for t in tables])
+        perfection_aspects = np.concatenate([t['perfection_aspects'] for t in tables])
+        ingress_jds = np.concatenate([t['ingress_jds'] for t in tables])
+        void_starts = np.concatenate([t['void_starts'] for t in tables])
+        void_ends = np.concatenate([t['void_ends'] for t in tables])
+        planets, aspect_names = tables[0]['planets'], tables[0]['aspect_names']
+
+        last_aspects, next_aspects = {}, {}
+        for p, planet in enumerate(planets):
+            mask = perfection_planets == p
+            jds, aspects = perfection_jds[mask], perfection_aspects[mask]
+            before, after = jds < jd, jds >= jd
+            if before.any():
+                k = np.nonzero(before)[0][-1]
+                last_aspects[planet] = {'aspect': aspect_names[aspects[k]], 'jd': float(jds[k])}
+            if after.any():
+                k = np.nonzero(after)[0][0]
+                next_aspects[planet] = {'aspect': aspect_names[aspects[k]], 'jd': float(jds[k])}
+
+        sign_exit = ingress_jds[ingress_jds > jd]
+        current = np.nonzero((void_starts <= jd) & (void_ends > jd))[0]
+        return {
+            'last_aspects': last_aspects,
+            'next_aspects': next_aspects,
+            'sign_exit_jd': float(sign_exit[0]) if len(sign_exit) else None,
+            'is_void': bool(len(current)),
+            'void_start_jd': float(void_starts[current[0]]) if len(current) else None,
+            'void_end_jd': float(void_ends[current[0]]) if len(current) else None,
+        }
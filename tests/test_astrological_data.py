@@ -0,0 +1,33 @@
+import pytest
+
+from main_app.astrological_data import AstrologicalData
+
+SPECS = [
+    ('natal', 'Placidus', '1990-03-10', '08:00', -23.55, -46.63, 'America/Sao_Paulo'),
+    ('natal', 'Koch', '1985-11-02', '23:40', 38.72, -9.14, 'Europe/Lisbon'),
+    ('natal', 'Regiomontanus', '2001-07-21', '12:05', 51.51, -0.13, 'Europe/London'),
+]
+
+
+def test_charts_batch_matches_single_charts():
+    """O lote do painel dá os mesmos mapas que o cálculo um a um."""
+    calculator = AstrologicalData()
+    charts, error = calculator.calculate_charts_batch(SPECS)
+    assert error is None
+
+    for spec, chart in zip(SPECS, charts):
+        single, error = calculator.calculate_chart_data(*spec)
+        assert error is None
+        assert chart['house_system'] == spec[1]
+        assert chart['houses'] == pytest.approx(single['houses'])
+        single_lons = {p['name']: p['lon'] for p in single['point_positions']}
+        for point in chart['point_positions']:
+            assert point['lon'] == pytest.approx(single_lons[point['name']], abs=1e-6)
+        assert [(a['point1'], a['point2'], a['aspect']) for a in chart['aspects_data']] == \
+            [(a['point1'], a['point2'], a['aspect']) for a in single['aspects_data']]
+
+
+def test_charts_batch_reports_bad_dates():
+    charts, error = AstrologicalData().calculate_charts_batch([('natal', 'Placidus', '1990-13-40', '08:00',
+                                                                0.0, 0.0, 'UTC')])
+    assert charts == [] and error.startswith("Erro no formato de data/hora")
@@ -0,0 +1,49 @@
+import pytest
+
+from main_app.astrological_data import AstrologicalData
+from main_app.chart_export import ChartWriter, export_charts, iter_records
+
+
+def _chart():
+    chart_data, error = AstrologicalData().calculate_chart_data(
+        'natal', 'Placidus', '1990-03-10', '08:00', -23.55, -46.63, 'America/Sao_Paulo'
+    )
+    assert error is None
+    return chart_data
+
+
+def test_writer_without_close_cannot_be_instantiated():
+    class Incomplete(ChartWriter):
+        def write_record(self, record):
+            self.count += 1
+
+    with pytest.raises(TypeError):
+        Incomplete('unused.jsonl')
+
+
+@pytest.mark.parametrize('extension', ['jsonl', 'csv'])
+def test_export_round_trip(tmp_path, extension):
+    chart_data = _chart()
+    path = tmp_path / f"charts.{extension}"
+    assert export_charts(str(path), [chart_data, chart_data], labels=['a', 'b']) == 2
+
+    records = list(iter_records(str(path)))
+    assert [r['label'] for r in records] == ['a', 'b']
+    assert records[0]['jd'] == pytest.approx(chart_data['jd'])
+    assert [p['lon'] for p in records[0]['points']] == \
+        pytest.approx([p['lon'] for p in chart_data['point_positions']])
+
+
+@pytest.mark.parametrize('extension', ['arrow', 'arrows'])
+def test_arrow_round_trip(tmp_path, extension):
+    pytest.importorskip('pyarrow') # Formato opcional
+    from main_app.chart_export import load_point_matrix
+
+    chart_data = _chart()
+    path = tmp_path / f"charts.{extension}"
+    export_charts(str(path), [chart_data] * 3, batch_size=2)
+
+    assert len(list(iter_records(str(path)))) == 3
+    jds, matrix = load_point_matrix(str(path))
+    assert jds == pytest.approx([chart_data['jd']] * 3)
+    assert matrix.shape[0] == 3
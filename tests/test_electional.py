@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+import swisseph as swe
+
+from main_app.constants import ASPECTS, MAX_DAILY_SPEEDS, NATAL_POINTS_CALCULABLE, ELECTIONAL_RESOLUTION_DAYS
+from main_app.electional import Criterion, ElectionalSearch, MoonNotVoid, MoonWaxing
+from main_app.ephemeris import EphemerisSampler
+from main_app.void_of_course import moon_void_of_course
+
+LATITUDE, LONGITUDE = -23.55, -46.63
+FINE_STEP_DAYS = 2 / 1440
+
+
+def _inside(jds, windows):
+    inside = np.zeros(len(jds), dtype=bool)
+    for start, end in windows:
+        inside |= (jds >= start) & (jds < end)
+    return inside
+
+
+def _near_edge(jds, windows, tolerance):
+    edges = np.array([edge for window in windows for edge in window])
+    if not len(edges):
+        return np.zeros(len(jds), dtype=bool)
+    return np.abs(jds[:, None] - edges[None, :]).min(axis=1) <= tolerance
+
+
+def test_moon_not_void_search_matches_fine_grid():
+    """A poda por dias seguros não pode pular nenhuma transição que uma grade fina enxerga."""
+    criterion = MoonNotVoid()
+    jd_start = swe.julday(2024, 1, 1, 0.0)
+    jd_end = jd_start + 60
+    windows = ElectionalSearch(LATITUDE, LONGITUDE).search(criterion, jd_start, jd_end, workers=1)
+
+    fine = np.arange(jd_start, jd_end, FINE_STEP_DAYS)
+    sampler = EphemerisSampler(jd_start, jd_end, NATAL_POINTS_CALCULABLE, LATITUDE, LONGITUDE)
+    expected, _ = criterion.evaluate(sampler.sample(fine))
+
+    comparable = ~_near_edge(fine, windows, ELECTIONAL_RESOLUTION_DAYS)
+    mismatches = fine[comparable & (expected != _inside(fine, windows))]
+    assert len(mismatches) == 0, f"{len(mismatches)} instantes divergentes, o primeiro em JD {mismatches[:1]}"
+
+
+def test_void_safe_days_stop_before_a_target_reaches_the_sign_end():
+    """Alvo de aspecto logo antes do fim do signo da Lua: o estado pode virar sem perfeição nem ingresso."""
+    planets = ['Moon', 'Mercury']
+    mercury_lon = 29.95 # Conjunção com Mercúrio a 0,05° do fim de Áries
+    samples = {
+        'lons': {'Moon': np.array([10.0]), 'Mercury': np.array([mercury_lon])},
+        'speeds': {'Moon': np.array([13.0]), 'Mercury': np.array([2.0])},
+    }
+    _, safe = moon_void_of_course(samples, planets, {'Conjunção': ASPECTS['Conjunção']})
+    assert safe[0] <= (30 - mercury_lon) / MAX_DAILY_SPEEDS['Mercury'] + 1e-9
+
+
+def test_criterion_without_evaluate_cannot_be_instantiated():
+    class Incomplete(Criterion):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_combined_criteria_still_evaluate():
+    """Os combinadores (&, |, ~) seguem instanciáveis: (A e B) ou não-A cobre tudo que não-A ou B cobre."""
+    criteria = MoonWaxing() & MoonNotVoid() | ~MoonWaxing()
+    jd_start = swe.julday(2024, 1, 1, 0.0)
+    windows = ElectionalSearch(LATITUDE, LONGITUDE).search(criteria, jd_start, jd_start + 3, workers=1)
+    expected = ElectionalSearch(LATITUDE, LONGITUDE).search(~MoonWaxing() | MoonNotVoid(), jd_start,
+                                                            jd_start + 3, workers=1)
+    assert windows == expected
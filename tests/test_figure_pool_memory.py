@@ -0,0 +1,47 @@
+import resource
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from main_app.astrological_data import AstrologicalData
+from main_app.chart_renderer import ChartRenderer, FigurePool
+
+WARMUP_CHARTS = 50
+RENDERED_CHARTS = 400
+DRAW_EVERY = 10 # Rasteriza no Agg a cada N mapas
+MAX_RSS_GROWTH_KB = 30 * 1024 # Pico de memória residente tolerado acima do aquecimento
+
+
+def _peak_rss_kb():
+    """Pico de memória residente do processo (ru_maxrss, em KB no Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _render(renderer, chart_data, count):
+    for i in range(count):
+        fig = renderer.create_chart_plot(chart_data)
+        if i % DRAW_EVERY == 0:
+            FigureCanvasAgg(fig).draw()
+        renderer.release()
+
+
+def test_figure_pool_memory_is_bounded():
+    """Centenas de mapas pelo mesmo pool não acumulam figuras nem memória."""
+    chart_data, error = AstrologicalData().calculate_chart_data(
+        'natal', 'Placidus', '1990-03-10', '08:00', -23.55, -46.63, 'America/Sao_Paulo'
+    )
+    assert error is None
+
+    pool = FigurePool(max_idle=2)
+    renderer = ChartRenderer(pool)
+    _render(renderer, chart_data, WARMUP_CHARTS) # Caches de fontes, imagens e do próprio pool
+    baseline = _peak_rss_kb()
+
+    _render(renderer, chart_data, RENDERED_CHARTS)
+
+    growth = _peak_rss_kb() - baseline
+    assert growth < MAX_RSS_GROWTH_KB, f"Pico de RSS cresceu {growth / 1024:.1f} MB em {RENDERED_CHARTS} mapas"
+    assert pool.idle_count() <= pool.max_idle
+    assert plt.get_fignums() == [] # As figuras do pool nunca passam pelo pyplot
@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+from geopy.exc import GeocoderServiceError
+
+from main_app.geocoder import GeocoderClient
+from main_app.geocoder_stub import StubNominatimServer
+
+SPACING_JITTER = 0.05 # Folga entre a saída da ficha no cliente e o registro no servidor (s)
+
+
+def _gaps(requests_log):
+    times = sorted(entry[0] for entry in requests_log)
+    return [later - earlier for earlier, later in zip(times, times[1:])]
+
+
+def _geocode_concurrently(client, queries):
+    """Dispara todas as consultas ao mesmo tempo, uma thread cada. Retorna {índice: resultado}."""
+    barrier = threading.Barrier(len(queries))
+    results = {}
+
+    def worker(index, query):
+        barrier.wait()
+        results[index] = client.geocode(query)
+
+    threads = [threading.Thread(target=worker, args=item) for item in enumerate(queries)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_queries_are_coalesced_and_rate_limited():
+    queries = ['Lisboa', ' lisboa', 'LISBOA', 'London', 'london ', 'São Paulo', 'Atlântida'] * 3
+    with StubNominatimServer(delay=0.3) as stub:
+        client = GeocoderClient(domain=stub.domain, scheme='http')
+        results = _geocode_concurrently(client, queries)
+        cached = client.geocode('lisboa')
+
+    # Uma requisição por consulta normalizada distinta, e nenhuma para o cache
+    assert len(stub.requests_log) == 4
+    assert client.requests_sent == 4
+    assert sorted({entry[1].casefold().strip() for entry in stub.requests_log}) == \
+        ['atlântida', 'lisboa', 'london', 'são paulo']
+    assert all(gap >= 1.0 - SPACING_JITTER for gap in _gaps(stub.requests_log))
+
+    for index, query in enumerate(queries):
+        if query == 'Atlântida':
+            assert results[index] is None
+        else:
+            assert results[index] is not None
+    assert results[0].address == "Lisboa, Portugal"
+    assert cached is results[0]
+
+
+def test_retries_pass_through_the_token_bucket():
+    with StubNominatimServer(failures=2) as stub:
+        client = GeocoderClient(domain=stub.domain, scheme='http', backoff=0.01)
+        location = client.geocode('Rio de Janeiro')
+
+    assert location.latitude == pytest.approx(-22.9110137)
+    assert [entry[2] for entry in stub.requests_log] == [503, 503, 200]
+    assert client.requests_sent == 3
+    assert all(gap >= 1.0 - SPACING_JITTER for gap in _gaps(stub.requests_log))
+
+
+def test_retries_give_up_after_max_retries():
+    with StubNominatimServer(failures=5) as stub:
+        client = GeocoderClient(domain=stub.domain, scheme='http', rate=50, max_retries=1, backoff=0.01)
+        with pytest.raises(GeocoderServiceError):
+            client.geocode('London')
+        # O erro não fica no cache: a próxima chamada tenta de novo
+        with pytest.raises(GeocoderServiceError):
+            client.geocode('London')
+
+    assert [entry[2] for entry in stub.requests_log] == [503] * 4
+
+
+@pytest.mark.parametrize('status', [404, 410])
+def test_client_errors_are_not_retried(status):
+    with StubNominatimServer(failures=1, failure_status=status) as stub:
+        client = GeocoderClient(domain=stub.domain, scheme='http', rate=50, backoff=0.01)
+        with pytest.raises(GeocoderServiceError):
+            client.geocode('Lisboa')
+
+    assert [entry[2] for entry in stub.requests_log] == [status]
+
+
+def test_rate_limited_responses_are_retried():
+    with StubNominatimServer(failures=1, failure_status=429) as stub:
+        client = GeocoderClient(domain=stub.domain, scheme='http', rate=50, backoff=0.01)
+        location = client.geocode('Lisboa')
+
+    assert location.address == "Lisboa, Portugal"
+    assert [entry[2] for entry in stub.requests_log] == [429, 200]
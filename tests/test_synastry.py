@@ -0,0 +1,28 @@
+import numpy as np
+
+from main_app.synastry import SynastryCalculator
+
+
+def _chart(lons):
+    return {'point_positions': [{'name': name, 'lon': lon} for name, lon in lons.items()]}
+
+
+def test_score_batch_ignores_missing_points():
+    calculator = SynastryCalculator()
+    # Referência de horária: sem Urano, Netuno e Plutão
+    reference = _chart({'Sun': 10.0, 'Moon': 100.0, 'Mercury': 20.0, 'Venus': 40.0,
+                        'Mars': 190.0, 'Jupiter': 250.0, 'Saturn': 300.0})
+    complete = calculator.longitudes_matrix([_chart({name: (37.0 * k) % 360 for k, name in
+                                                     enumerate(calculator.points)})])
+    partial = complete.copy()
+    partial[0, calculator.points.index('Moon')] = np.nan
+    exact = np.full_like(complete, np.nan)
+    exact[0, calculator.points.index('Sun')] = 10.0 # Conjunção exata Sol-Sol
+
+    scores = calculator.score_batch(reference, np.vstack([complete, partial, exact]))
+
+    assert np.all(np.isfinite(scores))
+    assert scores[2] > 0
+    best, best_scores = calculator.best_matches(reference, np.vstack([complete, partial, exact]), top_n=3)
+    assert np.all(np.isfinite(best_scores))
+    assert list(best_scores) == sorted(best_scores, reverse=True)